@@ -0,0 +1,35 @@
+"""add change log
+
+Revision ID: 5f2b8d1a7e36
+Revises: c3d81f0e6a95
+Create Date: 2026-10-16 23:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f2b8d1a7e36'
+down_revision = 'c3d81f0e6a95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the table may already have been created by a newer nbgrader
+    if 'change_log' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'change_log',
+        sa.Column('seq', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('table_name', sa.String(32), nullable=False),
+        sa.Column('row_id', sa.String(32), nullable=False),
+        sa.Column('operation', sa.Enum('insert', 'update', 'delete', name='change_operation'), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sqlite_autoincrement=True)
+
+
+def downgrade():
+    op.drop_table('change_log')
@@ -0,0 +1,43 @@
+"""add indexes for gradebook lookups
+
+Revision ID: 9e1a7c5b2d04
+Revises: e43177bfe90b
+Create Date: 2026-10-16 21:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e1a7c5b2d04'
+down_revision = 'e43177bfe90b'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns). Columns that already lead one of the unique
+# constraints (e.g. grade.cell_id) are indexed by that constraint.
+indexes = [
+    ('ix_notebook_assignment_id_name', 'notebook', ['assignment_id', 'name']),
+    ('ix_base_cell_notebook_id_name', 'base_cell', ['notebook_id', 'name']),
+    ('ix_submitted_assignment_student_id_assignment_id', 'submitted_assignment', ['student_id', 'assignment_id']),
+    ('ix_submitted_notebook_assignment_id', 'submitted_notebook', ['assignment_id']),
+    ('ix_grade_notebook_id', 'grade', ['notebook_id']),
+    ('ix_comment_notebook_id', 'comment', ['notebook_id']),
+]
+
+
+def upgrade():
+    # tables that were created by a newer nbgrader (e.g. by running a command
+    # before upgrading the database) already have their indexes
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in indexes:
+        existing = [index['name'] for index in inspector.get_indexes(table)]
+        if name not in existing:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(indexes):
+        op.drop_index(name, table_name=table)
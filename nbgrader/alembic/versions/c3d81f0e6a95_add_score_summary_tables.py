@@ -0,0 +1,59 @@
+"""add score summary tables
+
+Revision ID: c3d81f0e6a95
+Revises: 9e1a7c5b2d04
+Create Date: 2026-10-16 21:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d81f0e6a95'
+down_revision = '9e1a7c5b2d04'
+branch_labels = None
+depends_on = None
+
+
+score_columns = [
+    'score', 'max_score', 'code_score', 'max_code_score',
+    'written_score', 'max_written_score', 'task_score', 'max_task_score']
+
+
+def _create_table(name, *columns):
+    # the tables may already have been created by a newer nbgrader
+    if name not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(name, *columns)
+
+
+def upgrade():
+    _create_table(
+        'summary_status',
+        sa.Column('enabled', sa.Boolean(), primary_key=True))
+
+    _create_table(
+        'submitted_notebook_summary',
+        sa.Column('id', sa.String(32), primary_key=True),
+        *[sa.Column(name, sa.Float(), nullable=False) for name in score_columns],
+        sa.Column('needs_manual_grade', sa.Boolean(), nullable=False),
+        sa.Column('failed_tests', sa.Boolean(), nullable=False))
+
+    _create_table(
+        'submitted_assignment_summary',
+        sa.Column('id', sa.String(32), primary_key=True),
+        *[sa.Column(name, sa.Float(), nullable=False) for name in score_columns],
+        sa.Column('needs_manual_grade', sa.Boolean(), nullable=False))
+
+    _create_table(
+        'student_summary',
+        sa.Column('id', sa.String(128), primary_key=True),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('max_score', sa.Float(), nullable=False))
+
+
+def downgrade():
+    op.drop_table('student_summary')
+    op.drop_table('submitted_assignment_summary')
+    op.drop_table('submitted_notebook_summary')
+    op.drop_table('summary_status')
@@ -3,24 +3,29 @@ from __future__ import division
 from . import utils
 
 import datetime
+import os
+import sqlite3
+import threading
+import time
 import subprocess as sp
 
 from sqlalchemy import (create_engine, ForeignKey, Column, String, Text,
                         DateTime, Interval, Float, Enum, UniqueConstraint,
-                        Boolean)
+                        Boolean, Integer, Index, Table, event)
 from sqlalchemy.orm import (sessionmaker, scoped_session, relationship,
-                            column_property, aliased)
+                            column_property, aliased, object_session)
 from sqlalchemy.orm.exc import NoResultFound, FlushError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.sql import and_, or_
-from sqlalchemy import select, func, exists, case, literal_column, union_all
+from sqlalchemy import select, func, exists, case, literal, literal_column, union_all, bindparam, inspect, text
 from sqlalchemy.ext.declarative import declared_attr
 from uuid import uuid4
 from .dbutil import _temp_alembic_ini
 from typing import List, Any, Optional, Union
 from .auth import Authenticator
+from .querystats import instrument_gradebook
 
 Base = declarative_base()
 
@@ -116,7 +121,9 @@ class Notebook(Base):
     """Database representation of the master/source version of a notebook."""
 
     __tablename__ = "notebook"
-    __table_args__ = (UniqueConstraint('name', 'assignment_id'),)
+    __table_args__ = (
+        UniqueConstraint('name', 'assignment_id'),
+        Index('ix_notebook_assignment_id_name', 'assignment_id', 'name'))
 
     #: Unique id of the notebook (automatically generated)
     id = Column(String(32), primary_key=True, default=new_uuid)
@@ -204,7 +211,9 @@ class BaseCell(Base):
     """Database representation of a cell. It is meant as a base class for cells where additional behavior is added through mixin classes."""
 
     __tablename__ = "base_cell"
-    __table_args__ = (UniqueConstraint('name', 'notebook_id', 'type'),)
+    __table_args__ = (
+        UniqueConstraint('name', 'notebook_id', 'type'),
+        Index('ix_base_cell_notebook_id_name', 'notebook_id', 'name'))
 
     #: Unique id of the grade cell (automatically generated)
     id = Column(String(32), primary_key=True, default=new_uuid)
@@ -474,13 +483,17 @@ class Student(Base):
         representation.
 
         """
+        summary = _load_summary(self, student_summary) or {
+            "score": self.score,
+            "max_score": self.max_score
+        }
         return {
             "id": self.id,
             "first_name": self.first_name,
             "last_name": self.last_name,
             "email": self.email,
-            "score": self.score,
-            "max_score": self.max_score,
+            "score": summary["score"],
+            "max_score": summary["max_score"],
             "lms_user_id": self.lms_user_id
         }
 
@@ -492,7 +505,9 @@ class SubmittedAssignment(Base):
     """Database representation of an assignment submitted by a student."""
 
     __tablename__ = "submitted_assignment"
-    __table_args__ = (UniqueConstraint('assignment_id', 'student_id'),)
+    __table_args__ = (
+        UniqueConstraint('assignment_id', 'student_id'),
+        Index('ix_submitted_assignment_student_id_assignment_id', 'student_id', 'assignment_id'))
 
     #: Unique id of the submitted assignment (automatically generated)
     id = Column(String(32), primary_key=True, default=new_uuid)
@@ -603,6 +618,8 @@ class SubmittedAssignment(Base):
         unique id of the student, not the object itself.
 
         """
+        summary = _load_summary(self, submitted_assignment_summary) or {
+            field: getattr(self, field) for field in ASSIGNMENT_SUMMARY_FIELDS}
         return {
             "id": self.id,
             "name": self.name,
@@ -610,15 +627,15 @@ class SubmittedAssignment(Base):
             "first_name": self.student.first_name,
             "last_name": self.student.last_name,
             "timestamp": self.timestamp.isoformat() if self.timestamp is not None else None,
-            "score": self.score,
-            "max_score": self.max_score,
-            "code_score": self.code_score,
-            "max_code_score": self.max_code_score,
-            "written_score": self.written_score,
-            "max_written_score": self.max_written_score,
-            "task_score": self.task_score,
-            "max_task_score": self.max_task_score,
-            "needs_manual_grade": self.needs_manual_grade
+            "score": summary["score"],
+            "max_score": summary["max_score"],
+            "code_score": summary["code_score"],
+            "max_code_score": summary["max_code_score"],
+            "written_score": summary["written_score"],
+            "max_written_score": summary["max_written_score"],
+            "task_score": summary["task_score"],
+            "max_task_score": summary["max_task_score"],
+            "needs_manual_grade": summary["needs_manual_grade"]
         }
 
     def __repr__(self) -> str:
@@ -629,7 +646,9 @@ class SubmittedNotebook(Base):
     """Database representation of a notebook submitted by a student."""
 
     __tablename__ = "submitted_notebook"
-    __table_args__ = (UniqueConstraint('notebook_id', 'assignment_id'),)
+    __table_args__ = (
+        UniqueConstraint('notebook_id', 'assignment_id'),
+        Index('ix_submitted_notebook_assignment_id', 'assignment_id'))
 
     #: Unique id of the submitted notebook (automatically generated)
     id = Column(String(32), primary_key=True, default=new_uuid)
@@ -713,22 +732,24 @@ class SubmittedNotebook(Base):
         the unique id of the student, not the actual student object.
 
         """
+        summary = _load_summary(self, submitted_notebook_summary) or {
+            field: getattr(self, field) for field in NOTEBOOK_SUMMARY_FIELDS}
         return {
             "id": self.id,
             "name": self.name,
             "student": self.student.id,
             "last_name": self.student.last_name,
             "first_name": self.student.first_name,
-            "score": self.score,
-            "max_score": self.max_score,
-            "code_score": self.code_score,
-            "max_code_score": self.max_code_score,
-            "written_score": self.written_score,
-            "max_written_score": self.max_written_score,
-            "task_score": self.task_score,
-            "max_task_score": self.max_task_score,
-            "needs_manual_grade": self.needs_manual_grade,
-            "failed_tests": self.failed_tests,
+            "score": summary["score"],
+            "max_score": summary["max_score"],
+            "code_score": summary["code_score"],
+            "max_code_score": summary["max_code_score"],
+            "written_score": summary["written_score"],
+            "max_written_score": summary["max_written_score"],
+            "task_score": summary["task_score"],
+            "max_task_score": summary["max_task_score"],
+            "needs_manual_grade": summary["needs_manual_grade"],
+            "failed_tests": summary["failed_tests"],
             "flagged": self.flagged,
         }
 
@@ -744,7 +765,9 @@ class Grade(Base):
     """
 
     __tablename__ = "grade"
-    __table_args__ = (UniqueConstraint('cell_id', 'notebook_id'),)
+    __table_args__ = (
+        UniqueConstraint('cell_id', 'notebook_id'),
+        Index('ix_grade_notebook_id', 'notebook_id'))
 
     #: Unique id of the grade (automatically generated)
     id = Column(String(32), primary_key=True, default=new_uuid)
@@ -879,7 +902,9 @@ class Comment(Base):
     """Database representation of a comment on a cell in a submitted notebook."""
 
     __tablename__ = "comment"
-    __table_args__ = (UniqueConstraint('cell_id', 'notebook_id'),)
+    __table_args__ = (
+        UniqueConstraint('cell_id', 'notebook_id'),
+        Index('ix_comment_notebook_id', 'notebook_id'))
 
     #: Unique id of the comment (automatically generated)
     id = Column(String(32), primary_key=True, default=new_uuid)
@@ -1268,7 +1293,8 @@ Assignment.max_task_score = column_property(
 
 SubmittedAssignment.max_task_score = column_property(
     select([func.coalesce(Assignment.max_task_score, 0.0)])
-)
+    .where(Assignment.id == SubmittedAssignment.assignment_id)
+    .correlate_except(Assignment), deferred=True)
 
 # Number of submissions
 
@@ -1319,6 +1345,542 @@ SubmittedAssignment.late_submission_penalty = column_property(
     .correlate_except(SubmittedNotebook), deferred=True)
 
 
+## Score summaries
+#
+# The scores above are recomputed by the database every time they are
+# loaded. Once summaries have been enabled for a database (see
+# :func:`~nbgrader.api.Gradebook.rebuild_summaries`), copies of them are
+# stored in the tables below, kept up to date whenever grades, cells or
+# submissions are written, and used by the read paths instead.
+
+NOTEBOOK_SUMMARY_FIELDS = [
+    "score", "max_score", "code_score", "max_code_score",
+    "written_score", "max_written_score", "task_score", "max_task_score",
+    "needs_manual_grade", "failed_tests"]
+
+ASSIGNMENT_SUMMARY_FIELDS = NOTEBOOK_SUMMARY_FIELDS[:-1]
+
+STUDENT_SUMMARY_FIELDS = ["score", "max_score"]
+
+
+def _summary_table(name: str, id_column: Column, fields: List[str]) -> Table:
+    columns = [id_column]
+    for field in fields:
+        if field in ("needs_manual_grade", "failed_tests"):
+            columns.append(Column(field, Boolean, nullable=False))
+        else:
+            columns.append(Column(field, Float, nullable=False))
+    return Table(name, Base.metadata, *columns)
+
+
+#: Whether summaries are enabled for the database (a single row if they are)
+summary_status = Table(
+    "summary_status", Base.metadata,
+    Column("enabled", Boolean, primary_key=True))
+
+submitted_notebook_summary = _summary_table(
+    "submitted_notebook_summary", Column("id", String(32), primary_key=True),
+    NOTEBOOK_SUMMARY_FIELDS)
+
+submitted_assignment_summary = _summary_table(
+    "submitted_assignment_summary", Column("id", String(32), primary_key=True),
+    ASSIGNMENT_SUMMARY_FIELDS)
+
+student_summary = _summary_table(
+    "student_summary", Column("id", String(128), primary_key=True),
+    STUDENT_SUMMARY_FIELDS)
+
+_summaries = [
+    (SubmittedNotebook, submitted_notebook_summary, NOTEBOOK_SUMMARY_FIELDS),
+    (SubmittedAssignment, submitted_assignment_summary, ASSIGNMENT_SUMMARY_FIELDS),
+    (Student, student_summary, STUDENT_SUMMARY_FIELDS),
+]
+
+
+def _submitted_max_score(cell: Any, cell_type: str) -> Any:
+    return (
+        select([func.coalesce(func.sum(cell.max_score), 0.0)])
+        .where(and_(
+            SubmittedNotebook.assignment_id == SubmittedAssignment.id,
+            Grade.notebook_id == SubmittedNotebook.id,
+            cell.id == Grade.cell_id,
+            cell.cell_type == cell_type))
+        .correlate_except(Grade, SubmittedNotebook, cell)
+        .as_scalar())
+
+
+# The max scores of a submitted assignment are stored like
+# :func:`~nbgrader.api.Gradebook.submission_dicts` computes them, i.e. from
+# the grades of the notebooks that were submitted, rather than from every
+# notebook of the assignment like the column properties.
+_max_code_score = _submitted_max_score(GradeCell, "code")
+_max_written_score = _submitted_max_score(GradeCell, "markdown")
+_max_task_score = _submitted_max_score(TaskCell, "markdown")
+
+_summary_columns = {
+    SubmittedAssignment: {
+        "max_score": _max_code_score + _max_written_score + _max_task_score,
+        "max_code_score": _max_code_score,
+        "max_written_score": _max_written_score,
+        "max_task_score": _max_task_score,
+    },
+}
+
+# keep IN (...) clauses below sqlite's limit on query parameters
+_SUMMARY_CHUNK_SIZE = 500
+
+
+def _chunks(ids: list) -> Any:
+    for i in range(0, len(ids), _SUMMARY_CHUNK_SIZE):
+        yield ids[i:i + _SUMMARY_CHUNK_SIZE]
+
+
+def _refresh_summary_rows(session: Any, model: Any, table: Table, fields: List[str], ids: Optional[set]) -> None:
+    overrides = _summary_columns.get(model, {})
+    columns = [model.id] + [overrides.get(field, getattr(model, field)) for field in fields]
+    if ids is None:
+        session.execute(table.delete())
+        rows = session.query(*columns).all()
+    else:
+        rows = []
+        for chunk in _chunks(sorted(ids)):
+            session.execute(table.delete().where(table.c.id.in_(chunk)))
+            rows.extend(session.query(*columns).filter(model.id.in_(chunk)).all())
+
+    if len(rows) > 0:
+        keys = ["id"] + fields
+        session.execute(table.insert(), [dict(zip(keys, row)) for row in rows])
+
+
+def _refresh_summaries(session: Any, changes: Optional[dict] = None) -> None:
+    """Recompute the summaries touched by ``changes`` (as collected by
+    :func:`_collect_summary_changes`), or all of them if ``changes`` is
+    None.
+
+    """
+    if changes is None:
+        for model, table, fields in _summaries:
+            _refresh_summary_rows(session, model, table, fields, None)
+        return
+
+    notebooks = set(changes["notebooks"])
+    assignments = set(changes["assignments"])
+    students = set(changes["students"])
+
+    # a change to a master cell changes the max scores of every submission
+    # of its notebook
+    for chunk in _chunks(sorted(changes["master_notebooks"])):
+        notebooks.update(id for id, in session.query(SubmittedNotebook.id)
+                         .filter(SubmittedNotebook.notebook_id.in_(chunk)))
+
+    # changes to a submitted notebook propagate to its assignment, and from
+    # there to the student
+    for chunk in _chunks(sorted(notebooks)):
+        assignments.update(id for id, in session.query(SubmittedNotebook.assignment_id)
+                           .filter(SubmittedNotebook.id.in_(chunk)))
+    for chunk in _chunks(sorted(assignments)):
+        students.update(id for id, in session.query(SubmittedAssignment.student_id)
+                        .filter(SubmittedAssignment.id.in_(chunk)))
+
+    _refresh_summary_rows(session, SubmittedNotebook, submitted_notebook_summary, NOTEBOOK_SUMMARY_FIELDS, notebooks)
+    _refresh_summary_rows(session, SubmittedAssignment, submitted_assignment_summary, ASSIGNMENT_SUMMARY_FIELDS, assignments)
+    if changes["all_students"]:
+        _refresh_summary_rows(session, Student, student_summary, STUDENT_SUMMARY_FIELDS, None)
+    else:
+        _refresh_summary_rows(session, Student, student_summary, STUDENT_SUMMARY_FIELDS, students)
+
+    if changes["deleted"]:
+        for model, table, _ in _summaries:
+            session.execute(table.delete().where(
+                ~table.c.id.in_(select([model.__table__.c.id]))))
+
+
+def _summary_changes(**changes: Any) -> dict:
+    """The changes to refresh the summaries of, see :func:`_refresh_summaries`."""
+    summary_changes = {
+        "notebooks": set(), "assignments": set(), "students": set(),
+        "master_notebooks": set(), "all_students": False, "deleted": False}
+    summary_changes.update(changes)
+    return summary_changes
+
+
+def _summaries_enabled(session: Any) -> bool:
+    gradebook = session.info.get("gradebook", None)
+    return gradebook is not None and gradebook.use_summaries
+
+
+def _collect_summary_changes(session: Any, flush_context: Any) -> None:
+    if not _summaries_enabled(session):
+        return
+
+    if "summary_changes" not in session.info:
+        session.info["summary_changes"] = _summary_changes()
+    changes = session.info["summary_changes"]
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Grade):
+            changes["notebooks"].add(obj.notebook_id)
+        elif isinstance(obj, SubmittedNotebook):
+            changes["notebooks"].add(obj.id)
+            changes["assignments"].add(obj.assignment_id)
+        elif isinstance(obj, SubmittedAssignment):
+            changes["assignments"].add(obj.id)
+            changes["students"].add(obj.student_id)
+        elif isinstance(obj, Student):
+            changes["students"].add(obj.id)
+        elif isinstance(obj, (GradeCell, TaskCell)):
+            changes["master_notebooks"].add(obj.notebook_id)
+            changes["all_students"] = True
+        elif isinstance(obj, (Notebook, Assignment)) and obj not in session.dirty:
+            changes["all_students"] = True
+
+    if len(session.deleted) > 0:
+        changes["deleted"] = True
+
+
+def _flush_summary_changes(session: Any, flush_context: Any) -> None:
+    changes = session.info.pop("summary_changes", None)
+    if changes is not None:
+        _refresh_summaries(session, changes)
+
+
+def _load_summary(obj: Any, table: Table) -> Optional[dict]:
+    """Get the stored summary of a submitted notebook, submitted assignment
+    or student, if it was prefetched (see
+    :func:`~nbgrader.api.Gradebook.prefetch_summaries`), or None.
+
+    """
+    session = object_session(obj)
+    if session is None:
+        return None
+    return session.info.get("summaries", {}).get((table.name, obj.id), None)
+
+
+def _forget_summaries(session: Any, *args: Any) -> None:
+    # prefetched summaries are only valid until the next write, or the end
+    # of the transaction
+    session.info.pop("summaries", None)
+
+
+## Change log
+#
+# Every write of a grade, comment, submitted notebook or submitted assignment
+# is recorded in the table below, with an increasing sequence number, so that
+# other systems can be kept in sync incrementally (see
+# :func:`~nbgrader.api.Gradebook.changes_since`).
+
+change_log = Table(
+    "change_log", Base.metadata,
+    Column("seq", Integer, primary_key=True, autoincrement=True),
+    Column("table_name", String(32), nullable=False),
+    Column("row_id", String(32), nullable=False),
+    Column("operation", Enum("insert", "update", "delete", name="change_operation"), nullable=False),
+    Column("timestamp", DateTime(), nullable=False),
+    # never reuse the sequence numbers of discarded changes
+    sqlite_autoincrement=True)
+
+
+#: The models whose changes are recorded in the change log
+_CHANGE_LOG_MODELS = (Grade, Comment, SubmittedNotebook, SubmittedAssignment)
+
+
+def _changed_rows(session: Any) -> List[dict]:
+    changes = []
+    timestamp = datetime.datetime.utcnow()
+    for objects, operation in [(session.new, "insert"),
+                               (session.dirty, "update"),
+                               (session.deleted, "delete")]:
+        for obj in objects:
+            if not isinstance(obj, _CHANGE_LOG_MODELS):
+                continue
+            if operation == "update" and not session.is_modified(obj, include_collections=False):
+                continue
+            changes.append({
+                "table_name": obj.__tablename__,
+                "row_id": obj.id,
+                "operation": operation,
+                "timestamp": timestamp})
+    return changes
+
+
+def _collect_changes(session: Any, flush_context: Any) -> None:
+    session.info.setdefault("changes", []).extend(_changed_rows(session))
+
+
+def _flush_changes(session: Any, flush_context: Any) -> None:
+    changes = session.info.pop("changes", None)
+    if changes:
+        session.execute(change_log.insert(), changes)
+
+
+# Engines are expensive to create, so they are shared by every gradebook in
+# the process that uses the same database url. Engines are keyed by pid as
+# well so that forked processes (e.g. ``nbgrader autograde --jobs``) never
+# reuse connections inherited from their parent.
+_engines = {}  # type: dict
+_verified_schemas = {}  # type: dict
+_engines_lock = threading.Lock()
+
+
+def _is_memory_db(db_url: str) -> bool:
+    # each in-memory sqlite engine is its own database, so these are never
+    # shared
+    return db_url.startswith("sqlite") and (":memory:" in db_url or db_url.rstrip("/") == "sqlite:")
+
+
+def _sqlite_file_id(db_url: str) -> Optional[tuple]:
+    # identifies the database file behind a sqlite url, so that a schema
+    # check is redone if the file is deleted or replaced
+    if not db_url.startswith("sqlite:///"):
+        return None
+    try:
+        st = os.stat(db_url[len("sqlite:///"):])
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+# how long to wait between retries of a statement that failed because the
+# sqlite database was locked; doubled after every attempt
+_SQLITE_RETRY_DELAY = 0.05
+_SQLITE_MAX_RETRY_DELAY = 2.0
+
+
+def _is_locked_error(e: Exception) -> bool:
+    return "database is locked" in str(e) or "database table is locked" in str(e)
+
+
+def _retry_locked(retries: int, func: Any, *args: Any, rollback: Optional[Any] = None) -> Any:
+    delay = _SQLITE_RETRY_DELAY
+    for attempt in range(retries + 1):
+        try:
+            return func(*args)
+        except sqlite3.OperationalError as e:
+            if attempt == retries or not _is_locked_error(e):
+                raise
+        if rollback is not None:
+            rollback()
+        time.sleep(delay)
+        delay = min(2 * delay, _SQLITE_MAX_RETRY_DELAY)
+
+
+class _RetryingCursor(sqlite3.Cursor):
+    """A sqlite cursor that retries statements failing with "database is
+    locked", as happens when another process holds the write lock for longer
+    than the busy timeout.
+
+    Only statements that start a new transaction (or run outside of one, like
+    the sqlite3 module's reads) are retried, after rolling back the
+    transaction they started: that retries the whole transaction. A
+    statement in the middle of a transaction is not retried, as the
+    transaction's earlier statements may have read data that is out of date
+    by the time the lock is free (and retrying it can deadlock with the other
+    writer), so the error is raised and the whole transaction has to be
+    rolled back and redone by the caller.
+
+    """
+
+    def execute(self, *args: Any) -> Any:
+        return self._retry(super(_RetryingCursor, self).execute, *args)
+
+    def executemany(self, *args: Any) -> Any:
+        return self._retry(super(_RetryingCursor, self).executemany, *args)
+
+    def _retry(self, func: Any, *args: Any) -> Any:
+        connection = self.connection
+        if connection.in_transaction:
+            return func(*args)
+
+        def rollback() -> None:
+            if connection.in_transaction:
+                connection.rollback()
+
+        return _retry_locked(connection.write_retries, func, *args, rollback=rollback)
+
+
+class _RetryingConnection(sqlite3.Connection):
+    """A sqlite connection that retries commits failing with "database is
+    locked". Unlike other statements, a failed commit leaves the transaction
+    open and unchanged, and sqlite documents retrying it as the way to wait
+    for readers to finish (see :class:`_RetryingCursor`).
+
+    """
+
+    write_retries = 0
+
+    def cursor(self, factory: Any = _RetryingCursor) -> Any:
+        return super(_RetryingConnection, self).cursor(factory)
+
+    def commit(self) -> None:
+        _retry_locked(self.write_retries, super(_RetryingConnection, self).commit)
+
+
+def _configure_sqlite(engine: Any, wal: bool, busy_timeout: Optional[int], write_retries: int) -> None:
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection: Any, connection_record: Any) -> None:
+        dbapi_connection.write_retries = write_retries
+        cursor = dbapi_connection.cursor()
+        if busy_timeout is not None:
+            cursor.execute("PRAGMA busy_timeout = {:d}".format(busy_timeout))
+        if wal:
+            cursor.execute("PRAGMA journal_mode = WAL")
+            cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.close()
+
+
+def _get_engine(db_url: str,
+                engine_kwargs: Optional[dict] = None,
+                sqlite_wal: bool = False,
+                busy_timeout: Optional[int] = None,
+                write_retries: int = 0,
+                profile_queries: bool = False) -> Any:
+    engine_kwargs = dict(engine_kwargs or {})
+    engine_kwargs.setdefault("echo", False)
+    # gradebooks with different pool options don't share an engine
+    options = repr(sorted(engine_kwargs.items()))
+    is_sqlite = db_url.startswith("sqlite")
+    if is_sqlite:
+        connect_args = dict(engine_kwargs.get("connect_args", {}))
+        connect_args.setdefault("factory", _RetryingConnection)
+        engine_kwargs["connect_args"] = connect_args
+
+    if _is_memory_db(db_url):
+        engine = create_engine(db_url, **engine_kwargs)
+        _configure_sqlite(engine, False, busy_timeout, write_retries)
+        return engine
+
+    # profiled gradebooks get an engine of their own, so that the
+    # statements of the others are not counted
+    key = (os.getpid(), db_url, options, sqlite_wal, busy_timeout, write_retries, profile_queries)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = create_engine(db_url, **engine_kwargs)
+            if is_sqlite:
+                _configure_sqlite(engine, sqlite_wal, busy_timeout, write_retries)
+    return engine
+
+
+def _schema_verified(db_url: str, engine: Any) -> bool:
+    if _is_memory_db(db_url):
+        return False
+    key = (os.getpid(), db_url)
+    if key not in _verified_schemas:
+        return False
+    file_id = _verified_schemas[key]
+    if file_id is not None and file_id != _sqlite_file_id(db_url):
+        # don't hand out pooled connections to the old file either
+        del _verified_schemas[key]
+        engine.dispose()
+        return False
+    return True
+
+
+def _mark_schema_verified(db_url: str) -> None:
+    if not _is_memory_db(db_url):
+        _verified_schemas[(os.getpid(), db_url)] = _sqlite_file_id(db_url)
+
+
+def dispose_engines() -> None:
+    """Dispose of all the database engines shared between gradebooks in
+    this process, and forget which database schemas have been checked.
+
+    """
+    with _engines_lock:
+        for key, engine in list(_engines.items()):
+            if key[0] == os.getpid():
+                engine.dispose()
+        _engines.clear()
+        _verified_schemas.clear()
+
+
+# the keys that the listings of the gradebook (e.g. Gradebook.student_dicts)
+# can be filtered on by a name prefix, and the sort keys that may be NULL
+_STUDENT_NAME_KEYS = ["id", "first_name", "last_name"]
+_SUBMISSION_NAME_KEYS = ["student", "first_name", "last_name"]
+_NULLABLE_SORT_KEYS = {"first_name", "last_name", "email", "lms_user_id", "timestamp"}
+
+
+class GradeMatrix(object):
+    """The scores of every student in every graded cell, as a dense
+    student x cell matrix. This is created by
+    :func:`~nbgrader.api.Gradebook.grade_matrix` and requires numpy.
+
+    """
+
+    def __init__(self, students: Any, assignments: Any, notebooks: Any,
+                 cells: Any, max_scores: Any, scores: Any) -> None:
+        #: The ids of the students, one per row
+        self.students = students
+
+        #: The names of the assignment, notebook and cell of each column
+        self.assignments = assignments
+        self.notebooks = notebooks
+        self.cells = cells
+
+        #: The maximum score of each column
+        self.max_scores = max_scores
+
+        #: The scores, with NaN where the student did not submit the
+        #: notebook of the cell
+        self.scores = scores
+
+    def __repr__(self) -> str:
+        return "GradeMatrix<{} students x {} cells>".format(*self.scores.shape)
+
+    def column_names(self) -> List[str]:
+        """The names of the columns, as ``assignment/notebook/cell``."""
+        return ["/".join(x) for x in zip(self.assignments, self.notebooks, self.cells)]
+
+    def totals(self) -> Any:
+        """The total score of each student, or NaN for students who did not
+        submit anything."""
+        import numpy as np
+        submitted = ~np.isnan(self.scores).all(axis=1)
+        totals = np.full(len(self.students), np.nan)
+        totals[submitted] = np.nansum(self.scores[submitted], axis=1)
+        return totals
+
+    def percentiles(self, q: Any) -> Any:
+        """The percentiles ``q`` (between 0 and 100) of the total scores of
+        the students who submitted something."""
+        import numpy as np
+        totals = self.totals()
+        return np.percentile(totals[~np.isnan(totals)], q)
+
+    def histogram(self, bins: Any = 10) -> Any:
+        """The histogram of the total scores of the students who submitted
+        something, as returned by ``numpy.histogram``."""
+        import numpy as np
+        totals = self.totals()
+        return np.histogram(totals[~np.isnan(totals)], bins=bins)
+
+    def zscores(self) -> Any:
+        """The z-score of the total score of each student, or NaN for
+        students who did not submit anything."""
+        import numpy as np
+        totals = self.totals()
+        if np.isnan(totals).all():
+            return totals
+        std = np.nanstd(totals)
+        if std == 0:
+            return np.where(np.isnan(totals), np.nan, 0.0)
+        return (totals - np.nanmean(totals)) / std
+
+    def to_arrow(self) -> Any:
+        """Convert the matrix to a ``pyarrow.Table`` with a ``student``
+        column and one column per cell. Requires pyarrow."""
+        import pyarrow as pa
+        columns = [pa.array(self.students, type=pa.string())]
+        columns.extend(pa.array(self.scores[:, i], from_pandas=True) for i in range(len(self.cells)))
+        return pa.Table.from_arrays(columns, names=["student"] + self.column_names())
+
+    def write_parquet(self, path: str) -> None:
+        """Write the matrix to a Parquet file. Requires pyarrow."""
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(), path)
+
+
 class Gradebook(object):
     """The gradebook object to interface with the database holding
     nbgrader grades.
@@ -1328,7 +1890,12 @@ class Gradebook(object):
     def __init__(self,
                  db_url: str,
                  course_id: str = "default_course",
-                 authenticator: Optional[Authenticator] = None):
+                 authenticator: Optional[Authenticator] = None,
+                 engine_kwargs: Optional[dict] = None,
+                 sqlite_wal: bool = False,
+                 busy_timeout: Optional[int] = None,
+                 write_retries: int = 0,
+                 profile_queries: bool = False):
         """Initialize the connection to the database.
 
         Parameters
@@ -1341,33 +1908,75 @@ class Gradebook(object):
         authenticator:
             An authenticator instance for communicating with an external
             database.
+        engine_kwargs:
+            Extra keyword arguments (e.g. pool options such as ``pool_size``)
+            passed to :func:`sqlalchemy.create_engine`. Engines are shared by
+            all gradebooks in a process that use the same ``db_url`` and
+            options.
+        sqlite_wal:
+            For sqlite databases, use write-ahead logging (with
+            ``synchronous=NORMAL``), so that readers do not block the writer
+            and vice versa.
+        busy_timeout:
+            For sqlite databases, how long (in milliseconds) to wait for a
+            lock held by another connection before failing.
+        write_retries:
+            For sqlite databases, how many times to retry (with increasing
+            delays) a statement that still failed because the database was
+            locked.
+        profile_queries:
+            Count and time the statements issued by each method of the
+            gradebook, see :mod:`nbgrader.querystats`.
 
         """
-        # create the connection to the database
-        self.engine = create_engine(db_url, echo=False)
-        self.db = scoped_session(sessionmaker(autoflush=True, bind=self.engine))
-
-        # this creates all the tables in the database if they don't already exist
-        db_exists = len(self.engine.table_names()) > 0
-        Base.metadata.create_all(bind=self.engine)
+        self.engine = _get_engine(db_url, engine_kwargs, sqlite_wal, busy_timeout, write_retries, profile_queries)
+        session_factory = sessionmaker(autoflush=True, bind=self.engine, info={"gradebook": self})
+        event.listen(session_factory, "after_flush", _collect_summary_changes)
+        event.listen(session_factory, "after_flush_postexec", _flush_summary_changes)
+        event.listen(session_factory, "after_flush", _collect_changes)
+        event.listen(session_factory, "after_flush_postexec", _flush_changes)
+        for name in ("after_flush_postexec", "after_commit", "after_soft_rollback"):
+            event.listen(session_factory, name, _forget_summaries)
+        self.db = scoped_session(session_factory)
+        self.use_summaries = False
+
+        # the schema only needs to be checked once per process and database
+        if not _schema_verified(db_url, self.engine):
+            # this creates all the tables in the database if they don't already exist
+            db_exists = len(self.engine.table_names()) > 0
+            Base.metadata.create_all(bind=self.engine)
+
+            # set the alembic version if it doesn't exist
+            if not db_exists:
+                alembic_version = get_alembic_version()
+                self.db.execute("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL);")
+                self.db.execute("INSERT INTO alembic_version (version_num) VALUES ('{}');".format(alembic_version))
+                self.db.commit()
 
-        # set the alembic version if it doesn't exist
-        if not db_exists:
-            alembic_version = get_alembic_version()
-            self.db.execute("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL);")
-            self.db.execute("INSERT INTO alembic_version (version_num) VALUES ('{}');".format(alembic_version))
-            self.db.commit()
+            _mark_schema_verified(db_url)
 
         self.check_course(course_id=course_id)
         self.course_id = course_id
         self.authenticator = authenticator
 
+        #: Whether score summaries are stored in (and read from) the database,
+        #: see :func:`~nbgrader.api.Gradebook.rebuild_summaries`
+        self.use_summaries = self.db.query(summary_status).first() is not None
+
+        if profile_queries:
+            instrument_gradebook(self)
+
     def __enter__(self) -> 'Gradebook':
         return self
 
     def __exit__(self, exc_type: Optional[Any], exc_value: Optional[Any], traceback: Optional[Any]) -> None:
         self.close()
 
+    def __deepcopy__(self, memo: dict) -> 'Gradebook':
+        # a gradebook is a handle on a database session, so copies of
+        # e.g. notebook resources holding one should share it
+        return self
+
     def close(self):
         """Close the connection to the database.
 
@@ -1376,9 +1985,11 @@ class Gradebook(object):
         gradebook without closing them, you may run into errors where there
         are too many open connections to the database.
 
+        The underlying engine is shared with other gradebooks using the same
+        database and is kept open; see :func:`dispose_engines`.
+
         """
         self.db.remove()
-        self.engine.dispose()
 
     def check_course(self, course_id: str = "default_course", **kwargs: dict) -> Course:
         """Set the course id
@@ -1418,9 +2029,9 @@ class Gradebook(object):
     @property
     def students(self) -> List[Student]:
         """A list of all students in the database."""
-        return self.db.query(Student)\
-            .order_by(Student.last_name, Student.first_name)\
-            .all()
+        return self.prefetch_summaries(self.db.query(Student)
+            .order_by(Student.last_name, Student.first_name)
+            .all())
 
     def add_student(self, student_id: str, **kwargs: dict) -> Student:
         """Add a new student to the database.
@@ -1437,11 +2048,7 @@ class Gradebook(object):
         student
 
         """
-        if self.authenticator:
-            self.authenticator.add_student_to_course(student_id, self.course_id)
-
-        student = Student(id=student_id, **kwargs)
-        self.db.add(student)
+        student = self._new_student(student_id, **kwargs)
         try:
             self.db.commit()
         except (IntegrityError, FlushError) as e:
@@ -1450,6 +2057,15 @@ class Gradebook(object):
 
         return student
 
+    def _new_student(self, student_id: str, **kwargs: dict) -> Student:
+        # add a student to the session, without committing
+        if self.authenticator:
+            self.authenticator.add_student_to_course(student_id, self.course_id)
+
+        student = Student(id=student_id, **kwargs)
+        self.db.add(student)
+        return student
+
     def find_student(self, student_id: str) -> Student:
         """Find a student.
 
@@ -1510,6 +2126,91 @@ class Gradebook(object):
 
         return student
 
+    def bulk_update_or_create_students(self, students: List[dict]) -> dict:
+        """Update existing students, or create them if they don't exist, in
+        a single transaction. This is much faster than calling
+        :func:`~nbgrader.api.Gradebook.update_or_create_student` for each
+        student, as the students are looked up with one query and written
+        with one statement per kind of change.
+
+        Parameters
+        ----------
+        students:
+            One dictionary per student, with the unique ``id`` of the
+            student and (optionally) other attributes of the
+            :class:`~nbgrader.api.Student` object
+
+        Returns
+        -------
+        counts
+            The number of students that were ``"inserted"``, ``"updated"``
+            or ``"unchanged"``
+
+        """
+        if self.authenticator:
+            for student in students:
+                self.authenticator.add_student_to_course(student["id"], self.course_id)
+
+        counts = self._bulk_update_or_create(Student.__table__, "id", students)
+        if self.use_summaries and counts["inserted"] > 0:
+            _refresh_summaries(self.db, _summary_changes(
+                students=set(student["id"] for student in students)))
+            self.db.commit()
+        return counts
+
+    def _bulk_update_or_create(self, table: Table, key: str, rows: List[dict],
+                               defaults: Optional[dict] = None) -> dict:
+        # rows later in the list take precedence
+        rows_by_key = {}  # type: dict
+        for row in rows:
+            rows_by_key.setdefault(row[key], {}).update(row)
+
+        # look up the existing rows
+        existing = {}
+        key_column = table.c[key]
+        for chunk in _chunks(sorted(rows_by_key.keys())):
+            for row in self.db.execute(select([table]).where(key_column.in_(chunk))):
+                existing[row[key]] = dict(row)
+
+        inserts = []
+        updates = {}  # type: dict
+        unchanged = 0
+        for row_key, row in rows_by_key.items():
+            if row_key not in existing:
+                inserts.append(dict(defaults or {}, **row))
+                continue
+            changed = dict((k, v) for k, v in row.items() if existing[row_key].get(k) != v)
+            if len(changed) == 0:
+                unchanged += 1
+                continue
+            # rows changing the same columns are updated with one statement
+            params = dict(("new_" + k, v) for k, v in changed.items())
+            params["old_key"] = row_key
+            updates.setdefault(tuple(sorted(changed.keys())), []).append(params)
+
+        try:
+            if len(inserts) > 0:
+                # fill in the columns that some of the rows leave out
+                columns = set(k for row in inserts for k in row.keys())
+                self.db.execute(table.insert(), [
+                    dict(((k, None) for k in columns), **row) for row in inserts])
+            for columns, params in updates.items():
+                self.db.execute(
+                    table.update()
+                    .where(key_column == bindparam("old_key"))
+                    .values(**{k: bindparam("new_" + k) for k in columns}),
+                    params)
+            self.db.commit()
+        except (IntegrityError, FlushError) as e:
+            self.db.rollback()
+            raise InvalidEntry(*e.args)
+
+        return {
+            "inserted": len(inserts),
+            "updated": sum(len(x) for x in updates.values()),
+            "unchanged": unchanged,
+        }
+
     def remove_student(self, student_id):
         """Deletes an existing student from the gradebook, including any
         submissions the might be associated with that student.
@@ -1526,16 +2227,12 @@ class Gradebook(object):
 
         student = self.find_student(student_id)
 
-        for submission in student.submissions:
-            self.remove_submission(submission.assignment.name, student_id)
-
-        self.db.delete(student)
+        def delete() -> None:
+            sa = SubmittedAssignment.__table__
+            self._delete_submissions(sa.c.student_id == student.id)
+            self._delete(Student, Student.__table__.c.id == student.id)
 
-        try:
-            self.db.commit()
-        except (IntegrityError, FlushError) as e:
-            self.db.rollback()
-            raise InvalidEntry(*e.args)
+        self._bulk_remove(delete)
 
     # Assignments
 
@@ -1631,6 +2328,39 @@ class Gradebook(object):
 
         return assignment
 
+    def bulk_update_or_create_assignments(self, assignments: List[dict]) -> dict:
+        """Update existing assignments, or create them if they don't exist,
+        in a single transaction. See
+        :func:`~nbgrader.api.Gradebook.bulk_update_or_create_students`.
+
+        Parameters
+        ----------
+        assignments:
+            One dictionary per assignment, with the unique ``name`` of the
+            assignment and (optionally) other attributes of the
+            :class:`~nbgrader.api.Assignment` object
+
+        Returns
+        -------
+        counts
+            The number of assignments that were ``"inserted"``,
+            ``"updated"`` or ``"unchanged"``
+
+        """
+        rows = []
+        for assignment in assignments:
+            row = dict(assignment)
+            if row.get("duedate", None) is not None:
+                row["duedate"] = utils.parse_utc(row["duedate"])
+            rows.append(row)
+
+        counts = self._bulk_update_or_create(
+            Assignment.__table__, "name", rows, defaults={"course_id": self.course_id})
+        if self.use_summaries and counts["inserted"] > 0:
+            _refresh_summaries(self.db, _summary_changes(all_students=True))
+            self.db.commit()
+        return counts
+
     def remove_assignment(self, name):
         """Deletes an existing assignment from the gradebook, including any
         submissions the might be associated with that assignment.
@@ -1643,19 +2373,13 @@ class Gradebook(object):
         """
         assignment = self.find_assignment(name)
 
-        for submission in assignment.submissions:
-            self.remove_submission(name, submission.student.id)
-
-        for notebook in assignment.notebooks:
-            self.remove_notebook(notebook.name, name)
+        def delete() -> None:
+            sa = SubmittedAssignment.__table__
+            self._delete_submissions(sa.c.assignment_id == assignment.id)
+            self._delete_notebooks(Notebook.__table__.c.assignment_id == assignment.id)
+            self._delete(Assignment, Assignment.__table__.c.id == assignment.id)
 
-        self.db.delete(assignment)
-
-        try:
-            self.db.commit()
-        except (IntegrityError, FlushError) as e:
-            self.db.rollback()
-            raise InvalidEntry(*e.args)
+        self._bulk_remove(delete, all_students=True)
 
     # Notebooks
 
@@ -1760,24 +2484,14 @@ class Gradebook(object):
         """
         notebook = self.find_notebook(name, assignment)
 
-        for submission in notebook.submissions:
-            self.remove_submission_notebook(name, assignment, submission.student.id)
+        # the scores of every submission of the assignment change
+        submissions = set(id for id, in self.db.query(SubmittedAssignment.id)
+                          .filter(SubmittedAssignment.assignment_id == notebook.assignment_id))
 
-        for grade_cell in notebook.grade_cells:
-            self.db.delete(grade_cell)
-        for solution_cell in notebook.solution_cells:
-            self.db.delete(solution_cell)
-        for source_cell in notebook.source_cells:
-            self.db.delete(source_cell)
-        for task_cell in notebook.task_cells:
-            self.db.delete(task_cell)
-        self.db.delete(notebook)
+        def delete() -> None:
+            self._delete_notebooks(Notebook.__table__.c.id == notebook.id)
 
-        try:
-            self.db.commit()
-        except (IntegrityError, FlushError) as e:
-            self.db.rollback()
-            raise InvalidEntry(*e.args)
+        self._bulk_remove(delete, assignments=submissions, all_students=True)
 
     # Grade cells
 
@@ -2243,35 +2957,41 @@ class Gradebook(object):
 
         """
 
-        if 'timestamp' in kwargs:
-            kwargs['timestamp'] = utils.parse_utc(kwargs['timestamp'])
-
         try:
-            submission = SubmittedAssignment(
-                assignment=self.find_assignment(assignment),
-                student=self.find_student(student),
-                **kwargs)
+            submission = self._new_submission(assignment, student, **kwargs)
+            self.db.commit()
 
-            for notebook in submission.assignment.notebooks:
-                nb = SubmittedNotebook(notebook=notebook, assignment=submission)
+        except (IntegrityError, FlushError) as e:
+            self.db.rollback()
+            raise InvalidEntry(*e.args)
 
-                for grade_cell in notebook.grade_cells:
-                    Grade(cell_id=grade_cell.id, notebook=nb)
+        return submission
 
-                for solution_cell in notebook.solution_cells:
-                    Comment(cell_id=solution_cell.id, notebook=nb)
+    def _new_submission(self, assignment: str, student: str, **kwargs: dict) -> SubmittedAssignment:
+        # add a submission and its notebooks, grades and comments to the
+        # session, without committing
+        if 'timestamp' in kwargs:
+            kwargs['timestamp'] = utils.parse_utc(kwargs['timestamp'])
 
-                for task_cell in notebook.task_cells:
-                    Comment(cell_id=task_cell.id, notebook=nb)
-                    Grade(cell_id=task_cell.id, notebook=nb)
+        submission = SubmittedAssignment(
+            assignment=self.find_assignment(assignment),
+            student=self.find_student(student),
+            **kwargs)
 
-            self.db.add(submission)
-            self.db.commit()
+        for notebook in submission.assignment.notebooks:
+            nb = SubmittedNotebook(notebook=notebook, assignment=submission)
 
-        except (IntegrityError, FlushError) as e:
-            self.db.rollback()
-            raise InvalidEntry(*e.args)
+            for grade_cell in notebook.grade_cells:
+                Grade(cell_id=grade_cell.id, notebook=nb)
 
+            for solution_cell in notebook.solution_cells:
+                Comment(cell_id=solution_cell.id, notebook=nb)
+
+            for task_cell in notebook.task_cells:
+                Comment(cell_id=task_cell.id, notebook=nb)
+                Grade(cell_id=task_cell.id, notebook=nb)
+
+        self.db.add(submission)
         return submission
 
     def find_submission(self, assignment: str, student: str) -> SubmittedAssignment:
@@ -2395,16 +3115,10 @@ class Gradebook(object):
         """
         submission = self.find_submission(assignment, student)
 
-        for notebook in submission.notebooks:
-            self.remove_submission_notebook(notebook.name, assignment, student)
+        def delete() -> None:
+            self._delete_submissions(SubmittedAssignment.__table__.c.id == submission.id)
 
-        self.db.delete(submission)
-
-        try:
-            self.db.commit()
-        except (IntegrityError, FlushError) as e:
-            self.db.rollback()
-            raise InvalidEntry(*e.args)
+        self._bulk_remove(delete, students={submission.student_id})
 
     def remove_submission_notebook(self, notebook, assignment, student):
         """Removes a submitted notebook from the database.
@@ -2421,13 +3135,82 @@ class Gradebook(object):
         """
         submission = self.find_submission_notebook(notebook, assignment, student)
 
-        for grade in submission.grades:
-            self.db.delete(grade)
-        for comment in submission.comments:
-            self.db.delete(comment)
-        self.db.delete(submission)
+        def delete() -> None:
+            self._delete_submitted_notebooks(SubmittedNotebook.__table__.c.id == submission.id)
+
+        self._bulk_remove(delete, assignments={submission.assignment_id})
+
+    # The remove_* methods delete a student, assignment or notebook and
+    # everything that belongs to it with a few DELETE statements, rather than
+    # by loading and deleting every object through the session. These
+    # statements bypass the session events, so they take care of the change
+    # log and the summaries themselves.
+
+    def _delete(self, model: Any, where: Any) -> None:
+        """Delete the rows of ``model`` matching ``where``, an expression on
+        the columns of its table."""
+        table = model.__table__
+        if model in _CHANGE_LOG_MODELS:
+            timestamp = datetime.datetime.utcnow()
+            self.db.execute(change_log.insert().from_select(
+                ["table_name", "row_id", "operation", "timestamp"],
+                select([
+                    literal(table.name, change_log.c.table_name.type),
+                    table.c.id,
+                    literal("delete", change_log.c.operation.type),
+                    literal(timestamp, change_log.c.timestamp.type)
+                ]).where(where)))
+        self.db.execute(table.delete().where(where))
+
+    def _delete_submitted_notebooks(self, where: Any) -> None:
+        ids = select([SubmittedNotebook.__table__.c.id]).where(where)
+        self._delete(Grade, Grade.__table__.c.notebook_id.in_(ids))
+        self._delete(Comment, Comment.__table__.c.notebook_id.in_(ids))
+        self._delete(SubmittedNotebook, where)
+
+    def _delete_submissions(self, where: Any) -> None:
+        ids = select([SubmittedAssignment.__table__.c.id]).where(where)
+        self._delete_submitted_notebooks(SubmittedNotebook.__table__.c.assignment_id.in_(ids))
+        self._delete(SubmittedAssignment, where)
+
+    def _delete_notebooks(self, where: Any) -> None:
+        ids = select([Notebook.__table__.c.id]).where(where)
+        self._delete_submitted_notebooks(SubmittedNotebook.__table__.c.notebook_id.in_(ids))
+        cells = select([BaseCell.__table__.c.id]).where(BaseCell.__table__.c.notebook_id.in_(ids))
+        for model in (GradeCell, SolutionCell, TaskCell):
+            self._delete(model, model.__table__.c.id.in_(cells))
+        self._delete(BaseCell, BaseCell.__table__.c.notebook_id.in_(ids))
+        self._delete(SourceCell, SourceCell.__table__.c.notebook_id.in_(ids))
+        self._delete(Notebook, where)
+
+    def _expunge_deleted(self) -> None:
+        """Remove the objects whose rows were deleted from the session, so
+        that (like objects deleted through the session) they keep their
+        loaded attributes rather than failing to refresh after the commit.
+
+        """
+        loaded = {}  # type: dict
+        for obj in list(self.db.identity_map.values()):
+            loaded.setdefault(type(obj), {})[inspect(obj).identity[0]] = obj
+
+        for model, objects in loaded.items():
+            for chunk in _chunks(sorted(objects)):
+                existing = set(id for id, in self.db.query(model.id).filter(model.id.in_(chunk)))
+                for id in set(chunk) - existing:
+                    self.db.expunge(objects[id])
+
+    def _bulk_remove(self, delete: Any, **changes: Any) -> None:
+        """Run ``delete`` (which issues DELETE statements), refresh the
+        summaries that are affected according to ``changes`` (see
+        :func:`_refresh_summaries`), and commit.
 
+        """
         try:
+            self.db.flush()
+            delete()
+            if self.use_summaries:
+                _refresh_summaries(self.db, _summary_changes(deleted=True, **changes))
+            self._expunge_deleted()
             self.db.commit()
         except (IntegrityError, FlushError) as e:
             self.db.rollback()
@@ -2448,10 +3231,10 @@ class Gradebook(object):
 
         """
 
-        return self.db.query(SubmittedAssignment)\
-            .join(Assignment, Assignment.id == SubmittedAssignment.assignment_id)\
-            .filter(Assignment.name == assignment)\
-            .all()
+        return self.prefetch_summaries(self.db.query(SubmittedAssignment)
+            .join(Assignment, Assignment.id == SubmittedAssignment.assignment_id)
+            .filter(Assignment.name == assignment)
+            .all())
 
     def notebook_submissions(self, notebook, assignment):
         """Find all submissions of a given notebook in a given assignment.
@@ -2470,12 +3253,12 @@ class Gradebook(object):
 
         """
 
-        return self.db.query(SubmittedNotebook)\
-            .join(Notebook, Notebook.id == SubmittedNotebook.notebook_id)\
-            .join(SubmittedAssignment, SubmittedAssignment.id == SubmittedNotebook.assignment_id)\
-            .join(Assignment, Assignment.id == SubmittedAssignment.assignment_id)\
-            .filter(Notebook.name == notebook, Assignment.name == assignment)\
-            .all()
+        return self.prefetch_summaries(self.db.query(SubmittedNotebook)
+            .join(Notebook, Notebook.id == SubmittedNotebook.notebook_id)
+            .join(SubmittedAssignment, SubmittedAssignment.id == SubmittedNotebook.assignment_id)
+            .join(Assignment, Assignment.id == SubmittedAssignment.assignment_id)
+            .filter(Notebook.name == notebook, Assignment.name == assignment)
+            .all())
 
     def student_submissions(self, student):
         """Find all submissions by a given student.
@@ -2492,10 +3275,43 @@ class Gradebook(object):
 
         """
 
-        return self.db.query(SubmittedAssignment)\
-            .join(Student, Student.id == SubmittedAssignment.student_id)\
-            .filter(Student.id == student)\
-            .all()
+        return self.prefetch_summaries(self.db.query(SubmittedAssignment)
+            .join(Student, Student.id == SubmittedAssignment.student_id)
+            .filter(Student.id == student)
+            .all())
+
+    def prefetch_summaries(self, objects: List[Any]) -> List[Any]:
+        """Load the stored summaries (see
+        :func:`~nbgrader.api.Gradebook.rebuild_summaries`) of a list of
+        submitted notebooks, submitted assignments or students at once, so
+        that their ``to_dict()`` does not compute their scores one by one.
+        The summaries are used until the next write or the end of the
+        transaction. Does nothing if summaries are not in use.
+
+        Parameters
+        ----------
+        objects : list
+            :class:`~nbgrader.api.SubmittedNotebook`,
+            :class:`~nbgrader.api.SubmittedAssignment` or
+            :class:`~nbgrader.api.Student` objects
+
+        Returns
+        -------
+        objects : list
+            The same list
+
+        """
+        if not self.use_summaries or len(objects) == 0:
+            return objects
+
+        self.db.flush()
+        summaries = self.db.info.setdefault("summaries", {})
+        for model, table, _ in _summaries:
+            ids = set(x.id for x in objects if isinstance(x, model))
+            for chunk in _chunks(sorted(ids)):
+                for row in self.db.execute(select([table]).where(table.c.id.in_(chunk))):
+                    summaries[(table.name, row.id)] = dict(row)
+        return objects
 
     def find_submission_notebook(self, notebook: str, assignment: str, student: str) -> SubmittedNotebook:
         """Find a particular notebook in a student's submission for a given
@@ -2951,18 +3767,487 @@ class Gradebook(object):
                 TaskCell.cell_type == "markdown")).scalar()
         return score_sum / notebook.num_submissions
 
-    def student_dicts(self):
+    def score_statistics(self, level: str = "assignment",
+                         assignment_id: Optional[str] = None) -> dict:
+        """Compute statistics of the scores of the submissions of every
+        assignment or notebook, in one query. For each of the ``"score"``,
+        ``"code_score"``, ``"written_score"`` and ``"task_score"``
+        categories, the ``"mean"``, ``"min"``, ``"max"``, ``"stddev"``
+        (population standard deviation) and ``"count"`` of the submissions'
+        scores are computed. The means are the same as those computed by
+        e.g. :func:`~nbgrader.api.Gradebook.average_assignment_score`.
+
+        Parameters
+        ----------
+        level:
+            either ``"assignment"`` or ``"notebook"``
+        assignment_id:
+            (Optional) only compute the statistics of this assignment
+
+        Returns
+        -------
+        statistics:
+            A dictionary of the statistics of each category, keyed by
+            assignment name, or by ``(assignment name, notebook name)`` for
+            notebooks. Assignments and notebooks without submissions are
+            left out.
+
+        """
+        grade_cells = GradeCell.__table__
+        task_cells = TaskCell.__table__
+
+        def category_score(condition: Any) -> Any:
+            return func.coalesce(func.sum(case([(condition, Grade.score)], else_=0.0)), 0.0)
+
+        # the scores of each submission, one column per category
+        categories = ["score", "code_score", "written_score", "task_score"]
+        if level == "assignment":
+            submission = SubmittedAssignment.id
+            keys = [Assignment.name]
+        elif level == "notebook":
+            submission = SubmittedNotebook.id
+            keys = [Assignment.name, Notebook.name]
+        else:
+            raise ValueError("Invalid level: {}".format(level))
+
+        scores = self.db.query(
+            *[key.label("key{}".format(i)) for i, key in enumerate(keys)],
+            category_score(Grade.id != None).label("score"),
+            category_score(grade_cells.c.cell_type == "code").label("code_score"),
+            category_score(grade_cells.c.cell_type == "markdown").label("written_score"),
+            category_score(task_cells.c.cell_type == "markdown").label("task_score"))
+        if level == "assignment":
+            scores = scores.select_from(SubmittedAssignment)\
+                .join(Assignment, Assignment.id == SubmittedAssignment.assignment_id)\
+                .outerjoin(SubmittedNotebook, SubmittedNotebook.assignment_id == SubmittedAssignment.id)
+        else:
+            scores = scores.select_from(SubmittedNotebook)\
+                .join(Notebook, Notebook.id == SubmittedNotebook.notebook_id)\
+                .join(Assignment, Assignment.id == Notebook.assignment_id)
+        scores = scores\
+            .outerjoin(Grade, Grade.notebook_id == SubmittedNotebook.id)\
+            .outerjoin(grade_cells, grade_cells.c.id == Grade.cell_id)\
+            .outerjoin(task_cells, task_cells.c.id == Grade.cell_id)
+        if assignment_id is not None:
+            scores = scores.filter(Assignment.name == assignment_id)
+        scores = scores.group_by(submission, *keys).subquery()
+
+        # sqlite has no standard deviation, so it is computed from the mean
+        # of the squares instead
+        key_columns = [scores.c["key{}".format(i)] for i in range(len(keys))]
+        aggregates = []
+        for category in categories:
+            column = scores.c[category]
+            aggregates.extend([
+                func.avg(column), func.min(column), func.max(column),
+                func.avg(column * column)])
+        rows = self.db.query(*key_columns, func.count(), *aggregates)\
+            .group_by(*key_columns)\
+            .all()
+
+        statistics = {}
+        for row in rows:
+            key = row[0] if level == "assignment" else tuple(row[:2])
+            count = row[len(keys)]
+            values = row[len(keys) + 1:]
+            statistics[key] = {}
+            for i, category in enumerate(categories):
+                mean, minimum, maximum, mean_square = values[4 * i:4 * i + 4]
+                statistics[key][category] = {
+                    "mean": mean,
+                    "min": minimum,
+                    "max": maximum,
+                    "stddev": max(mean_square - mean * mean, 0.0) ** 0.5,
+                    "count": count,
+                }
+        return statistics
+
+    def grade_matrix(self, assignment_id: Optional[str] = None) -> GradeMatrix:
+        """Get the scores of every student in every graded cell (of one
+        assignment, or of all of them) as a dense student x cell matrix.
+        The scores are streamed from a single query. Requires numpy.
+
+        Parameters
+        ----------
+        assignment_id:
+            (Optional) only include the cells of this assignment
+
+        Returns
+        -------
+        matrix:
+            The students are sorted by id, and the cells by assignment,
+            notebook and cell name
+
+        """
+        import numpy as np
+
+        grade_cells = GradeCell.__table__
+        task_cells = TaskCell.__table__
+        max_score = func.coalesce(grade_cells.c.max_score, task_cells.c.max_score)
+
+        # the graded cells, which are the columns of the matrix
+        cells = self.db.query(BaseCell.id, Assignment.name, Notebook.name, BaseCell.name, max_score)\
+            .join(Notebook, Notebook.id == BaseCell.notebook_id)\
+            .join(Assignment, Assignment.id == Notebook.assignment_id)\
+            .outerjoin(grade_cells, grade_cells.c.id == BaseCell.id)\
+            .outerjoin(task_cells, task_cells.c.id == BaseCell.id)\
+            .filter(or_(grade_cells.c.id != None, task_cells.c.id != None))
+        if assignment_id is not None:
+            cells = cells.filter(Assignment.name == assignment_id)
+        cells = cells.order_by(Assignment.name, Notebook.name, BaseCell.name).all()
+        columns = {cell[0]: i for i, cell in enumerate(cells)}
+
+        students = [x for x, in self.db.query(Student.id).order_by(Student.id)]
+        rows = {student_id: i for i, student_id in enumerate(students)}
+
+        scores = np.full((len(students), len(cells)), np.nan)
+        grades = self.db.query(SubmittedAssignment.student_id, Grade.cell_id, Grade.score)\
+            .join(SubmittedNotebook, SubmittedNotebook.id == Grade.notebook_id)\
+            .join(SubmittedAssignment, SubmittedAssignment.id == SubmittedNotebook.assignment_id)
+        if assignment_id is not None:
+            grades = grades\
+                .join(Assignment, Assignment.id == SubmittedAssignment.assignment_id)\
+                .filter(Assignment.name == assignment_id)
+        for student_id, cell_id, score in grades.yield_per(1000):
+            scores[rows[student_id], columns[cell_id]] = score
+
+        return GradeMatrix(
+            students=np.array(students, dtype=object),
+            assignments=np.array([cell[1] for cell in cells], dtype=object),
+            notebooks=np.array([cell[2] for cell in cells], dtype=object),
+            cells=np.array([cell[3] for cell in cells], dtype=object),
+            max_scores=np.array([cell[4] for cell in cells], dtype=float),
+            scores=scores)
+
+    def score_percentiles(self, q: Any, assignment_id: Optional[str] = None) -> Any:
+        """Compute percentiles of the students' total scores (of one
+        assignment, or of all of them). Students who did not submit anything
+        are left out. See :func:`~nbgrader.api.Gradebook.grade_matrix`.
+
+        Parameters
+        ----------
+        q:
+            the percentile or sequence of percentiles, between 0 and 100
+        assignment_id:
+            (Optional) the name of the assignment
+
+        """
+        return self.grade_matrix(assignment_id).percentiles(q)
+
+    def score_histogram(self, bins: Any = 10, assignment_id: Optional[str] = None) -> Any:
+        """Compute the histogram of the students' total scores (of one
+        assignment, or of all of them), as returned by ``numpy.histogram``.
+        Students who did not submit anything are left out.
+
+        Parameters
+        ----------
+        bins:
+            the number of bins, or the bin edges
+        assignment_id:
+            (Optional) the name of the assignment
+
+        """
+        return self.grade_matrix(assignment_id).histogram(bins)
+
+    def score_zscores(self, assignment_id: Optional[str] = None) -> dict:
+        """Compute the z-score of each student's total score (of one
+        assignment, or of all of them).
+
+        Parameters
+        ----------
+        assignment_id:
+            (Optional) the name of the assignment
+
+        Returns
+        -------
+        zscores:
+            The z-scores, keyed by student id. Students who did not submit
+            anything are left out.
+
+        """
+        import numpy as np
+        matrix = self.grade_matrix(assignment_id)
+        return {
+            student_id: float(zscore)
+            for student_id, zscore in zip(matrix.students, matrix.zscores())
+            if not np.isnan(zscore)}
+
+    def rebuild_summaries(self) -> None:
+        """Recompute the stored score summaries of every submitted notebook,
+        submitted assignment and student, and enable summaries for this
+        database if they were not already enabled.
+
+        Once enabled, summaries are kept up to date by every gradebook that
+        writes to the database, and are used by
+        :func:`~nbgrader.api.Gradebook.student_dicts`,
+        :func:`~nbgrader.api.Gradebook.submission_dicts`,
+        :func:`~nbgrader.api.Gradebook.notebook_submission_dicts` and the
+        ``to_dict`` methods. They need to be rebuilt if the database was
+        changed by an older version of nbgrader.
+
+        """
+        self.db.flush()
+        _refresh_summaries(self.db)
+        if self.db.query(summary_status).first() is None:
+            self.db.execute(summary_status.insert(), {"enabled": True})
+        self.db.commit()
+        self.use_summaries = True
+
+    def changes_since(self, cursor: int = 0, limit: Optional[int] = 1000,
+                      include_data: bool = True) -> List[dict]:
+        """Get the changes made to grades, comments, submitted notebooks and
+        submitted assignments after a given point, oldest first.
+
+        To keep another system in sync, start with a cursor of 0, and then
+        pass the ``seq`` of the last change returned as the next cursor.
+
+        Parameters
+        ----------
+        cursor:
+            only return changes with a sequence number greater than this
+        limit:
+            (Optional) the maximum number of changes to return
+        include_data:
+            whether to include the current state of each changed row
+
+        Returns
+        -------
+        changes:
+            One dictionary per change, with the keys ``seq``, ``table``,
+            ``id``, ``operation`` (``"insert"``, ``"update"`` or
+            ``"delete"``) and ``timestamp``. If ``include_data`` is True, the
+            ``data`` key holds the ``to_dict()`` of the row, or None if it
+            has been deleted since.
+
+        """
+        self.db.flush()
+        query = select([change_log])\
+            .where(change_log.c.seq > cursor)\
+            .order_by(change_log.c.seq)
+        if limit is not None:
+            query = query.limit(limit)
+        changes = [{
+            "seq": row.seq,
+            "table": row.table_name,
+            "id": row.row_id,
+            "operation": row.operation,
+            "timestamp": row.timestamp
+        } for row in self.db.execute(query)]
+
+        if include_data:
+            # load the changed rows of each table at once
+            models = [Grade, Comment, SubmittedNotebook, SubmittedAssignment]
+            data = {}
+            for model in models:
+                ids = set(x["id"] for x in changes if x["table"] == model.__tablename__)
+                for chunk in _chunks(sorted(ids)):
+                    objs = self.prefetch_summaries(self.db.query(model).filter(model.id.in_(chunk)).all())
+                    for obj in objs:
+                        data[(model.__tablename__, obj.id)] = obj.to_dict()
+            for change in changes:
+                change["data"] = data.get((change["table"], change["id"]), None)
+
+        return changes
+
+    def last_change(self) -> int:
+        """Get the sequence number of the latest change recorded in the
+        database, or 0 if there have never been any. Discarding changes does
+        not lower it. See :func:`~nbgrader.api.Gradebook.changes_since`.
+
+        """
+        self.db.flush()
+        seq = self.db.execute(select([func.coalesce(func.max(change_log.c.seq), 0)])).scalar()
+        if self.engine.dialect.name == "sqlite":
+            # the high-water mark of the AUTOINCREMENT column survives
+            # discard_changes emptying the table
+            high = self.db.execute(
+                text("SELECT seq FROM sqlite_sequence WHERE name = :name"),
+                {"name": change_log.name}).scalar()
+            seq = max(seq, high or 0)
+        return seq
+
+    def discard_changes(self, cursor: int) -> None:
+        """Delete the recorded changes up to (and including) a sequence
+        number, e.g. once every system that is kept in sync has seen them.
+        The sequence numbers of discarded changes are never reused, so the
+        cursors of these systems stay valid.
+
+        Parameters
+        ----------
+        cursor:
+            the sequence number of the last change to delete
+
+        """
+        self.db.execute(change_log.delete().where(change_log.c.seq <= cursor))
+        self.db.commit()
+
+    def _paginate(self, query: Any, keys: List[str], name_keys: List[str],
+                  limit: Optional[int] = None, after: Optional[tuple] = None,
+                  sort: Optional[str] = None, needs_manual_grade: Optional[bool] = None,
+                  name_prefix: Optional[str] = None) -> List[tuple]:
+        """Runs one of the queries behind :func:`student_dicts`,
+        :func:`submission_dicts` and :func:`notebook_submission_dicts`, and
+        filters, sorts and pages its rows in SQL. ``keys`` names the columns
+        of the query, which must include ``"id"``.
+
+        Pages are selected with a keyset rather than an offset: ``after`` is
+        the ``(sort value, id)`` pair of the last row of the previous page,
+        and the page starts right after that row. ``sort`` is the name of a
+        column, prefixed with ``"-"`` to sort in descending order. Rows with
+        the same sort value are sorted by id.
+
+        """
+        if limit is None and after is None and sort is None \
+                and needs_manual_grade is None and not name_prefix:
+            return query.all()
+
+        subquery = query.subquery(with_labels=True)
+        columns = dict(zip(keys, subquery.c))
+        query = self.db.query(*[columns[key] for key in keys])
+
+        if needs_manual_grade is not None:
+            query = query.filter(columns["needs_manual_grade"] == bool(needs_manual_grade))
+        if name_prefix:
+            query = query.filter(or_(*[
+                columns[key].startswith(name_prefix, autoescape=True)
+                for key in name_keys]))
+
+        sort = sort or "id"
+        descending = sort.startswith("-")
+        sort = sort.lstrip("-")
+        if sort not in columns or sort.startswith("_"):
+            raise ValueError("Cannot sort by: {}".format(sort))
+        sort_column = columns[sort]
+        null_value = None
+        if sort in _NULLABLE_SORT_KEYS:
+            # so that rows without a value can be paged through as well, they
+            # are sorted as the smallest value (also in the ``after`` cursor)
+            if isinstance(sort_column.type, DateTime):
+                null_value = datetime.datetime.min
+            else:
+                null_value = ""
+            sort_column = func.coalesce(sort_column, null_value)
+        id_column = columns["id"]
+
+        if after is not None:
+            value, last_id = after
+            if isinstance(value, str) and isinstance(columns[sort].type, DateTime):
+                value = utils.parse_utc(value)
+            if value is None:
+                value = null_value
+            if descending:
+                query = query.filter(or_(
+                    sort_column < value,
+                    and_(sort_column == value, id_column < last_id)))
+            else:
+                query = query.filter(or_(
+                    sort_column > value,
+                    and_(sort_column == value, id_column > last_id)))
+
+        if descending:
+            query = query.order_by(sort_column.desc(), id_column.desc())
+        else:
+            query = query.order_by(sort_column, id_column)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def _summary_dicts(self, query: Any, keys: List[str], name_keys: List[str],
+                       **page: Any) -> Optional[List[dict]]:
+        # the stored summaries are only used if every row has one, otherwise
+        # the caller computes the scores from the grades instead
+        self.db.flush()
+        rows = self._paginate(query, keys + ["_summary"], name_keys, **page)
+        if any(row[-1] is None for row in rows):
+            return None
+        return [dict(zip(keys, row[:-1])) for row in rows]
+
+    def _summary_student_dicts(self, **page: Any) -> Optional[List[dict]]:
+        s = student_summary
+        query = self.db.query(
+            Student.id, Student.first_name, Student.last_name, Student.email,
+            s.c.score, s.c.max_score, Student.lms_user_id, s.c.id
+        ).outerjoin(s, s.c.id == Student.id)
+        keys = ["id", "first_name", "last_name", "email", "score", "max_score", "lms_user_id"]
+        return self._summary_dicts(query, keys, _STUDENT_NAME_KEYS, **page)
+
+    def _summary_submission_dicts(self, assignment_id: str, **page: Any) -> Optional[List[dict]]:
+        s = submitted_assignment_summary
+        query = self.db.query(
+            SubmittedAssignment.id, Assignment.name,
+            SubmittedAssignment.timestamp, Student.first_name, Student.last_name,
+            Student.id,
+            *[s.c[field] for field in ASSIGNMENT_SUMMARY_FIELDS],
+            s.c.id
+        ).select_from(SubmittedAssignment)\
+         .join(Assignment, Assignment.id == SubmittedAssignment.assignment_id)\
+         .join(Student, Student.id == SubmittedAssignment.student_id)\
+         .outerjoin(s, s.c.id == SubmittedAssignment.id)\
+         .filter(
+             Assignment.name == assignment_id,
+             exists().where(and_(
+                 SubmittedNotebook.assignment_id == SubmittedAssignment.id,
+                 Grade.notebook_id == SubmittedNotebook.id)))
+        keys = ["id", "name", "timestamp", "first_name", "last_name", "student"] + ASSIGNMENT_SUMMARY_FIELDS
+        return self._summary_dicts(query, keys, _SUBMISSION_NAME_KEYS, **page)
+
+    def _summary_notebook_submission_dicts(self, notebook_id: str, assignment_id: str,
+                                           **page: Any) -> Optional[List[dict]]:
+        s = submitted_notebook_summary
+        query = self.db.query(
+            SubmittedNotebook.id, Notebook.name,
+            Student.id, Student.first_name, Student.last_name,
+            *[s.c[field] for field in NOTEBOOK_SUMMARY_FIELDS],
+            SubmittedNotebook.flagged,
+            s.c.id
+        ).select_from(SubmittedNotebook)\
+         .join(Notebook, Notebook.id == SubmittedNotebook.notebook_id)\
+         .join(SubmittedAssignment, SubmittedAssignment.id == SubmittedNotebook.assignment_id)\
+         .join(Assignment, Assignment.id == SubmittedAssignment.assignment_id)\
+         .join(Student, Student.id == SubmittedAssignment.student_id)\
+         .outerjoin(s, s.c.id == SubmittedNotebook.id)\
+         .filter(
+             Notebook.name == notebook_id,
+             Assignment.name == assignment_id,
+             exists().where(Grade.notebook_id == SubmittedNotebook.id))
+        keys = ["id", "name", "student", "first_name", "last_name"] + NOTEBOOK_SUMMARY_FIELDS + ["flagged"]
+        return self._summary_dicts(query, keys, _SUBMISSION_NAME_KEYS, **page)
+
+    def student_dicts(self, limit=None, after=None, sort=None, name_prefix=None):
         """Returns a list of dictionaries containing student data. Equivalent
         to calling :func:`~nbgrader.api.Student.to_dict` for each student,
         except that this method is implemented using proper SQL joins and is
         much faster.
 
+        If none of the optional arguments are given, all students are
+        returned in no particular order.
+
+        Parameters
+        ----------
+        limit : int, optional
+            the maximum number of students to return
+        after : tuple, optional
+            the ``(sort value, id)`` of the last student of the previous page;
+            only the students sorted after it are returned
+        sort : string, optional
+            the key to sort by, prefixed with ``"-"`` for descending order
+            (defaults to ``"id"``)
+        name_prefix : string, optional
+            only return the students of students whose id, first name or last
+            name start with this prefix
+
         Returns
         -------
         students : list
             A list of dictionaries, one per student
 
         """
+        page = dict(limit=limit, after=after, sort=sort, name_prefix=name_prefix)
+        if self.use_summaries:
+            students = self._summary_student_dicts(**page)
+            if students is not None:
+                return students
+
         max_scores = self.db.query(
             Assignment.id,
             func.sum(Assignment.max_score).label("max_score")
@@ -2988,26 +4273,45 @@ class Gradebook(object):
             ).outerjoin(scores, Student.id == scores.c.id)\
              .group_by(
                  Student.id, Student.first_name, Student.last_name,
-                 Student.email, _scores, Student.lms_user_id)\
-             .all()
-
-            keys = ["id", "first_name", "last_name", "email", "score", "max_score", "lms_user_id"]
-            return [dict(zip(keys, x)) for x in students]
+                 Student.email, _scores, Student.lms_user_id)
 
         else:
-            students = [s.to_dict() for s in self.students]
-            return students
+            students = self.db.query(
+                Student.id, Student.first_name, Student.last_name,
+                Student.email, Student.score, Student.max_score,
+                Student.lms_user_id)
+
+        keys = ["id", "first_name", "last_name", "email", "score", "max_score", "lms_user_id"]
+        students = self._paginate(students, keys, _STUDENT_NAME_KEYS, **page)
+        return [dict(zip(keys, x)) for x in students]
 
-    def submission_dicts(self, assignment_id):
+    def submission_dicts(self, assignment_id, limit=None, after=None, sort=None,
+                         needs_manual_grade=None, name_prefix=None):
         """Returns a list of dictionaries containing submission data. Equivalent
         to calling :func:`~nbgrader.api.SubmittedAssignment.to_dict` for each
         submission, except that this method is implemented using proper SQL
         joins and is much faster.
 
+        If none of the optional arguments are given, all submissions are
+        returned in no particular order.
+
         Parameters
         ----------
         assignment_id : string
             the name of the assignment
+        limit : int, optional
+            the maximum number of submissions to return
+        after : tuple, optional
+            the ``(sort value, id)`` of the last submission of the previous page;
+            only the submissions sorted after it are returned
+        sort : string, optional
+            the key to sort by, prefixed with ``"-"`` for descending order
+            (defaults to ``"id"``)
+        needs_manual_grade : bool, optional
+            only return the submissions that do (or do not) need manual grading
+        name_prefix : string, optional
+            only return the submissions of students whose id, first name or last
+            name start with this prefix
 
         Returns
         -------
@@ -3015,6 +4319,14 @@ class Gradebook(object):
             A list of dictionaries, one per submitted assignment
 
         """
+        page = dict(
+            limit=limit, after=after, sort=sort,
+            needs_manual_grade=needs_manual_grade, name_prefix=name_prefix)
+        if self.use_summaries:
+            submissions = self._summary_submission_dicts(assignment_id, **page)
+            if submissions is not None:
+                return submissions
+
         # subquery the code scores
         code_scores = self.db.query(
             SubmittedAssignment.id.label("id"),
@@ -3132,8 +4444,7 @@ class Gradebook(object):
              written_scores.c.written_score, written_scores.c.max_written_score,
              task_scores.c.task_score, task_scores.c.max_task_score,
              total_scores.c.score, total_scores.c.max_score,
-             _manual_grade)\
-         .all()
+             _manual_grade)
 
         keys = [
             "id", "name", "timestamp", "first_name", "last_name", "student",
@@ -3142,20 +4453,39 @@ class Gradebook(object):
             "task_score", "max_task_score",
             "needs_manual_grade"
         ]
+        assignments = self._paginate(assignments, keys, _SUBMISSION_NAME_KEYS, **page)
         return [dict(zip(keys, x)) for x in assignments]
 
-    def notebook_submission_dicts(self, notebook_id, assignment_id):
+    def notebook_submission_dicts(self, notebook_id, assignment_id, limit=None,
+                                  after=None, sort=None, needs_manual_grade=None,
+                                  name_prefix=None):
         """Returns a list of dictionaries containing submission data. Equivalent
         to calling :func:`~nbgrader.api.SubmittedNotebook.to_dict` for each
         submission, except that this method is implemented using proper SQL
         joins and is much faster.
 
+        If none of the optional arguments are given, all submissions are
+        returned in no particular order.
+
         Parameters
         ----------
         notebook_id : string
             the name of the notebook
         assignment_id : string
             the name of the assignment
+        limit : int, optional
+            the maximum number of submissions to return
+        after : tuple, optional
+            the ``(sort value, id)`` of the last submission of the previous page;
+            only the submissions sorted after it are returned
+        sort : string, optional
+            the key to sort by, prefixed with ``"-"`` for descending order
+            (defaults to ``"id"``)
+        needs_manual_grade : bool, optional
+            only return the submissions that do (or do not) need manual grading
+        name_prefix : string, optional
+            only return the submissions of students whose id, first name or last
+            name start with this prefix
 
         Returns
         -------
@@ -3163,6 +4493,14 @@ class Gradebook(object):
             A list of dictionaries, one per submitted notebook
 
         """
+        page = dict(
+            limit=limit, after=after, sort=sort,
+            needs_manual_grade=needs_manual_grade, name_prefix=name_prefix)
+        if self.use_summaries:
+            submissions = self._summary_notebook_submission_dicts(notebook_id, assignment_id, **page)
+            if submissions is not None:
+                return submissions
+
         # subquery the code scores
         code_scores = self.db.query(
             SubmittedNotebook.id,
@@ -3303,8 +4641,7 @@ class Gradebook(object):
              written_scores.c.written_score, written_scores.c.max_written_score,
              task_scores.c.task_score, task_scores.c.max_task_score,
              total_scores.c.score, total_scores.c.max_score,
-             _manual_grade, _failed_tests, SubmittedNotebook.flagged)\
-         .all()
+             _manual_grade, _failed_tests, SubmittedNotebook.flagged)
 
         keys = [
             "id", "name", "student", "first_name", "last_name",
@@ -3315,4 +4652,5 @@ class Gradebook(object):
             "needs_manual_grade",
             "failed_tests", "flagged"
         ]
+        submissions = self._paginate(submissions, keys, _SUBMISSION_NAME_KEYS, **page)
         return [dict(zip(keys, x)) for x in submissions]
@@ -1,21 +1,65 @@
-import glob
-import re
 import sys
 import os
 import logging
+import time
 import warnings
+import datetime
 
 from traitlets.config import LoggingConfigurable, Config, get_config
-from traitlets import Instance, Enum, Unicode, observe
+from traitlets import Instance, Enum, Unicode, Float, observe
 
 from ..coursedir import CourseDirectory
 from ..converters import GenerateAssignment, Autograde, GenerateFeedback
 from ..exchange import ExchangeFactory, ExchangeError
 from ..api import MissingEntry, Gradebook, Student, SubmittedAssignment
-from ..utils import parse_utc, temp_attrs, capture_log, as_timezone, to_numeric_tz
+from ..utils import temp_attrs, capture_log, as_timezone, to_numeric_tz
 from ..auth import Authenticator
 
 
+def _average_scores(statistics):
+    """Get the average scores of an assignment or notebook from its score
+    statistics, which are None if there are no submissions."""
+    averages = {}
+    for category in ("score", "code_score", "written_score", "task_score"):
+        if statistics is None:
+            averages["average_" + category] = 0.0
+        else:
+            averages["average_" + category] = statistics[category]["mean"]
+    return averages
+
+
+def _set_next_page(next_page, rows, limit, sort):
+    """Set ``next_page["after"]`` to the ``after`` argument for the page
+    following ``rows`` (the rows of a page, as returned by the gradebook), or
+    to None if there are no more pages."""
+    if next_page is None:
+        return
+    if limit is None or len(rows) < limit:
+        next_page["after"] = None
+        return
+    value = rows[-1][(sort or "id").lstrip("-")]
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+    next_page["after"] = (value, rows[-1]["id"])
+
+
+class _SharedGradebook(object):
+    """A gradebook shared by the calls of an API, which stays open at the end
+    of the ``with`` statements using it."""
+
+    def __init__(self, gradebook):
+        self.gradebook = gradebook
+
+    def __enter__(self):
+        return self.gradebook
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def close(self):
+        pass
+
+
 class NbGraderAPI(LoggingConfigurable):
     """A high-level API for using nbgrader."""
 
@@ -40,6 +84,11 @@ class NbGraderAPI(LoggingConfigurable):
         help="Format string for displaying timestamps"
     ).tag(config=True)
 
+    exchange_check_interval = Float(
+        60,
+        help="How long (in seconds) to remember whether the exchange is missing"
+    ).tag(config=True)
+
     @observe('log_level')
     def _log_level_changed(self, change):
         """Adjust the log level when log_level is set."""
@@ -49,7 +98,7 @@ class NbGraderAPI(LoggingConfigurable):
             self.log_level = new
         self.log.setLevel(new)
 
-    def __init__(self, coursedir=None, authenticator=None, exchange=None, **kwargs):
+    def __init__(self, coursedir=None, authenticator=None, exchange=None, gradebook=None, **kwargs):
         """Initialize the API.
 
         Arguments
@@ -62,6 +111,9 @@ class NbGraderAPI(LoggingConfigurable):
         exchange : :class:~`nbgrader.exchange.ExchangeFactory`
             (Optional) A factory for creating the exchange classes used
             for distributing assignments and feedback.
+        gradebook : :class:`~nbgrader.api.Gradebook`
+            (Optional) A gradebook to use for every call, rather than opening
+            a new one each time. The gradebook is not closed by the API.
         kwargs:
             Additional keyword arguments (e.g. ``parent``, ``config``)
 
@@ -84,6 +136,9 @@ class NbGraderAPI(LoggingConfigurable):
         else:
             self.exchange = exchange
 
+        self._shared_gradebook = gradebook
+        self._exchange_checked = None
+
         if sys.platform != 'win32':
             lister = self.exchange.List(
                 coursedir=self.coursedir,
@@ -96,17 +151,33 @@ class NbGraderAPI(LoggingConfigurable):
                 # For non-fs based exchanges
                 self.exchange_root = ''
 
+        else:
+            self.course_id = ''
+            self.exchange_root = ''
+
+    @property
+    def exchange_missing(self):
+        """Whether the exchange is missing (or listing it fails). This is
+        checked when first needed, and then at most every
+        ``exchange_check_interval`` seconds."""
+        if sys.platform == 'win32':
+            return True
+
+        now = time.time()
+        if self._exchange_checked is None or now - self._exchange_checked >= self.exchange_check_interval:
+            lister = self.exchange.List(
+                coursedir=self.coursedir,
+                authenticator=self.authenticator,
+                parent=self)
             try:
                 lister.start()
             except ExchangeError:
-                self.exchange_missing = True
+                self._exchange_missing = True
             else:
-                self.exchange_missing = False
+                self._exchange_missing = False
+            self._exchange_checked = now
 
-        else:
-            self.course_id = ''
-            self.exchange_root = ''
-            self.exchange_missing = True
+        return self._exchange_missing
 
     @property
     def exchange_is_functional(self):
@@ -117,11 +188,15 @@ class NbGraderAPI(LoggingConfigurable):
         """An instance of :class:`nbgrader.api.Gradebook`.
 
         Note that each time this property is accessed, a new gradebook is
-        created. The user is responsible for destroying the gradebook through
-        :func:`~nbgrader.api.Gradebook.close`.
+        created (unless the API was given one to share). The user is
+        responsible for destroying the gradebook through
+        :func:`~nbgrader.api.Gradebook.close`, e.g. by using it in a
+        ``with`` statement.
 
         """
-        return Gradebook(self.coursedir.db_url, self.course_id)
+        if self._shared_gradebook is not None:
+            return _SharedGradebook(self._shared_gradebook)
+        return Gradebook(self.coursedir.db_url, self.course_id, **self.coursedir.db_options)
 
     def get_source_assignments(self):
         """Get the names of all assignments in the `source` directory.
@@ -132,29 +207,8 @@ class NbGraderAPI(LoggingConfigurable):
             A set of assignment names
 
         """
-        filenames = glob.glob(self.coursedir.format_path(
-            self.coursedir.source_directory,
-            student_id='.',
-            assignment_id='*'))
-
-        assignments = set([])
-        for filename in filenames:
-            # skip files that aren't directories
-            if not os.path.isdir(filename):
-                continue
-
-            # parse out the assignment name
-            regex = self.coursedir.format_path(
-                self.coursedir.source_directory,
-                student_id='.',
-                assignment_id='(?P<assignment_id>.*)',
-                escape=True)
-
-            matches = re.match(regex, filename)
-            if matches:
-                assignments.add(matches.groupdict()['assignment_id'])
-
-        return assignments
+        entries = self.coursedir.snapshot.find("source")
+        return set([assignment_id for _, assignment_id in entries])
 
     def get_released_assignments(self):
         """Get the names of all assignments that have been released to the
@@ -194,32 +248,8 @@ class NbGraderAPI(LoggingConfigurable):
             A set of student ids
 
         """
-        # get the names of all student submissions in the `submitted` directory
-        filenames = glob.glob(self.coursedir.format_path(
-            self.coursedir.submitted_directory,
-            student_id='*',
-            assignment_id=assignment_id))
-
-        students = set([])
-        for filename in filenames:
-            # skip files that aren't directories
-            if not os.path.isdir(filename):
-                continue
-
-            # parse out the student id
-            if assignment_id == "*":
-                assignment_id = ".*"
-            regex = self.coursedir.format_path(
-                self.coursedir.submitted_directory,
-                student_id='(?P<student_id>.*)',
-                assignment_id=assignment_id,
-                escape=True)
-
-            matches = re.match(regex, filename)
-            if matches:
-                students.add(matches.groupdict()['student_id'])
-
-        return students
+        entries = self.coursedir.snapshot.find("submitted", assignment_id=assignment_id)
+        return set([student_id for student_id, _ in entries])
 
     def get_submitted_timestamp(self, assignment_id, student_id):
         """Gets the timestamp of a submitted assignment.
@@ -238,15 +268,9 @@ class NbGraderAPI(LoggingConfigurable):
             not exist
 
         """
-        assignment_dir = os.path.abspath(self.coursedir.format_path(
-            self.coursedir.submitted_directory,
-            student_id,
-            assignment_id))
-
-        timestamp_pth = os.path.join(assignment_dir, 'timestamp.txt')
-        if os.path.exists(timestamp_pth):
-            with open(timestamp_pth, 'r') as fh:
-                return parse_utc(fh.read().strip())
+        entry = self.coursedir.snapshot.get("submitted", student_id, assignment_id)
+        if entry is not None:
+            return entry.timestamp
 
     def get_autograded_students(self, assignment_id):
         """Get the ids of students whose submission for a given assignment
@@ -273,19 +297,19 @@ class NbGraderAPI(LoggingConfigurable):
                 .all())
             ag_students = set(ag_timestamps.keys())
 
+        submitted = self.coursedir.snapshot.find("submitted", assignment_id=assignment_id)
+        autograded = self.coursedir.snapshot.find("autograded", assignment_id=assignment_id)
+
         students = set([])
         for student_id in ag_students:
-            # skip files that aren't directories
-            filename = self.coursedir.format_path(
-                self.coursedir.autograded_directory,
-                student_id=student_id,
-                assignment_id=assignment_id)
-            if not os.path.isdir(filename):
+            # skip submissions without an autograded directory
+            if (student_id, assignment_id) not in autograded:
                 continue
 
             # get the timestamps and check whether the submitted timestamp is
             # newer than the autograded timestamp
-            submitted_timestamp = self.get_submitted_timestamp(assignment_id, student_id)
+            submission = submitted.get((student_id, assignment_id), None)
+            submitted_timestamp = submission.timestamp if submission is not None else None
             autograded_timestamp = ag_timestamps[student_id]
             if submitted_timestamp != autograded_timestamp:
                 continue
@@ -294,7 +318,7 @@ class NbGraderAPI(LoggingConfigurable):
 
         return students
 
-    def get_assignment(self, assignment_id, released=None):
+    def get_assignment(self, assignment_id, released=None, statistics=None):
         """Get information about an assignment given its name.
 
         Arguments
@@ -304,6 +328,9 @@ class NbGraderAPI(LoggingConfigurable):
         released: list
             (Optional) A set of names of released assignments, obtained via
             self.get_released_assignments().
+        statistics: dict
+            (Optional) The score statistics of the assignments, obtained via
+            :func:`~nbgrader.api.Gradebook.score_statistics`.
 
         Returns
         -------
@@ -316,11 +343,8 @@ class NbGraderAPI(LoggingConfigurable):
             released = self.get_released_assignments()
 
         # check whether there is a source version of the assignment
-        sourcedir = os.path.abspath(self.coursedir.format_path(
-            self.coursedir.source_directory,
-            student_id='.',
-            assignment_id=assignment_id))
-        if not os.path.isdir(sourcedir):
+        source = self.coursedir.snapshot.get("source", ".", assignment_id)
+        if source is None:
             return
 
         # see if there is information about the assignment in the database
@@ -336,10 +360,9 @@ class NbGraderAPI(LoggingConfigurable):
                     assignment["display_duedate"] = None
                     assignment["duedate_notimezone"] = None
                 assignment["duedate_timezone"] = to_numeric_tz(self.timezone)
-                assignment["average_score"] = gb.average_assignment_score(assignment_id)
-                assignment["average_code_score"] = gb.average_assignment_code_score(assignment_id)
-                assignment["average_written_score"] = gb.average_assignment_written_score(assignment_id)
-                assignment["average_task_score"] = gb.average_assignment_task_score(assignment_id)
+                if statistics is None:
+                    statistics = gb.score_statistics("assignment", assignment_id=assignment_id)
+                assignment.update(_average_scores(statistics.get(assignment_id)))
 
         except MissingEntry:
             assignment = {
@@ -371,15 +394,12 @@ class NbGraderAPI(LoggingConfigurable):
                 assignment["status"] = "draft"
 
         # get source directory
-        assignment["source_path"] = os.path.relpath(sourcedir, self.coursedir.root)
+        assignment["source_path"] = os.path.relpath(source.path, self.coursedir.root)
 
         # get release directory
-        releasedir = os.path.abspath(self.coursedir.format_path(
-            self.coursedir.release_directory,
-            student_id='.',
-            assignment_id=assignment_id))
-        if os.path.exists(releasedir):
-            assignment["release_path"] = os.path.relpath(releasedir, self.coursedir.root)
+        release = self.coursedir.snapshot.get("release", ".", assignment_id)
+        if release is not None:
+            assignment["release_path"] = os.path.relpath(release.path, self.coursedir.root)
         else:
             assignment["release_path"] = None
 
@@ -398,10 +418,12 @@ class NbGraderAPI(LoggingConfigurable):
 
         """
         released = self.get_released_assignments()
+        with self.gradebook as gb:
+            statistics = gb.score_statistics("assignment")
 
         assignments = []
         for x in self.get_source_assignments():
-            assignments.append(self.get_assignment(x, released=released))
+            assignments.append(self.get_assignment(x, released=released, statistics=statistics))
 
         assignments.sort(key=lambda x: (x["duedate"] if x["duedate"] is not None else "None", x["name"]))
         return assignments
@@ -428,32 +450,23 @@ class NbGraderAPI(LoggingConfigurable):
 
             # if the assignment exists in the database
             if assignment and assignment.notebooks:
+                statistics = gb.score_statistics("notebook", assignment_id=assignment_id)
                 notebooks = []
                 for notebook in assignment.notebooks:
                     x = notebook.to_dict()
-                    x["average_score"] = gb.average_notebook_score(notebook.name, assignment.name)
-                    x["average_code_score"] = gb.average_notebook_code_score(notebook.name, assignment.name)
-                    x["average_written_score"] = gb.average_notebook_written_score(notebook.name, assignment.name)
-                    x["average_task_score"] = gb.average_notebook_task_score(notebook.name, assignment.name)
+                    x.update(_average_scores(statistics.get((assignment.name, notebook.name))))
                     notebooks.append(x)
 
             # if it doesn't exist in the database
             else:
-                sourcedir = self.coursedir.format_path(
-                    self.coursedir.source_directory,
-                    student_id='.',
-                    assignment_id=assignment_id)
-                escaped_sourcedir = self.coursedir.format_path(
-                    self.coursedir.source_directory,
-                    student_id='.',
-                    assignment_id=assignment_id,
-                    escape=True)
+                source = self.coursedir.snapshot.get("source", ".", assignment_id)
+                notebook_ids = source.notebooks if source is not None else []
 
                 notebooks = []
-                for filename in glob.glob(os.path.join(sourcedir, "*.ipynb")):
-                    regex = re.escape(os.path.sep).join([escaped_sourcedir, "(?P<notebook_id>.*).ipynb"])
-                    matches = re.match(regex, filename)
-                    notebook_id = matches.groupdict()['notebook_id']
+                for notebook_id in sorted(notebook_ids):
+                    # skip hidden notebooks, like glob
+                    if notebook_id.startswith("."):
+                        continue
                     notebooks.append({
                         "name": notebook_id,
                         "id": None,
@@ -580,14 +593,40 @@ class NbGraderAPI(LoggingConfigurable):
 
         return submission
 
-    def get_submissions(self, assignment_id):
+    def get_submissions(self, assignment_id, limit=None, after=None, sort=None,
+                        needs_manual_grade=None, name_prefix=None, next_page=None):
         """Get a list of submissions of an assignment. Each submission
         corresponds to a student.
 
+        Without any of the optional arguments, all submissions are returned,
+        sorted by student. Otherwise, only a page of the autograded
+        submissions is returned, filtered and sorted by the database. The
+        submissions which have not been autograded yet are added to the last
+        page (the first one with less than ``limit`` autograded submissions),
+        and have no id.
+
         Arguments
         ---------
         assignment_id: string
             The name of the assignment
+        limit: int
+            (Optional) The maximum number of submissions to return
+        after: tuple
+            (Optional) The ``(sort value, id)`` of the last autograded submission of the
+            previous page; only the submissions sorted after it are returned
+        sort: string
+            (Optional) The key to sort by, prefixed with ``"-"`` for
+            descending order
+        needs_manual_grade: bool
+            (Optional) Only return the submissions that do (or do not) need
+            manual grading
+        name_prefix: string
+            (Optional) Only return the submissions of students whose id, first
+            name or last name start with this prefix
+        next_page: dict
+            (Optional) A dictionary in which ``"after"`` is set to the
+            ``after`` argument of the next page, or to None if this is the
+            last page
 
         Returns
         -------
@@ -595,11 +634,20 @@ class NbGraderAPI(LoggingConfigurable):
             A list of dictionaries containing information about each submission
 
         """
+        page = dict(
+            limit=limit, after=after, sort=sort,
+            needs_manual_grade=needs_manual_grade, name_prefix=name_prefix)
+        paged = any(value is not None for value in page.values())
         with self.gradebook as gb:
-            db_submissions = gb.submission_dicts(assignment_id)
+            db_submissions = gb.submission_dicts(assignment_id, **page)
+        _set_next_page(next_page, db_submissions, limit, sort)
 
         ungraded = self.get_submitted_students(assignment_id) - self.get_autograded_students(assignment_id)
-        students = {x['id']: x for x in self.get_students()}
+        if paged and (needs_manual_grade or (limit is not None and len(db_submissions) >= limit)):
+            ungraded_page = set()
+        else:
+            ungraded_page = ungraded
+        students = {x['id']: x for x in self.get_students()} if ungraded_page else {}
         submissions = []
         for submission in db_submissions:
             if submission["student"] in ungraded:
@@ -616,11 +664,21 @@ class NbGraderAPI(LoggingConfigurable):
             submission["submitted"] = True
             submissions.append(submission)
 
-        for student_id in ungraded:
+        ungraded_submissions = []
+        for student_id in ungraded_page:
             submission = self.get_submission(
                 assignment_id, student_id, ungraded=ungraded, students=students)
-            submissions.append(submission)
+            if name_prefix and not any(
+                    (submission[key] or "").startswith(name_prefix)
+                    for key in ("student", "first_name", "last_name")):
+                continue
+            ungraded_submissions.append(submission)
+
+        if paged:
+            ungraded_submissions.sort(key=lambda x: x["student"])
+            return submissions + ungraded_submissions
 
+        submissions.extend(ungraded_submissions)
         submissions.sort(key=lambda x: x["student"])
         return submissions
 
@@ -660,16 +718,11 @@ class NbGraderAPI(LoggingConfigurable):
             if app.strict:
                 return sorted(notebooks, key=lambda x: x.id)
 
+        autograded = self.coursedir.snapshot.find("autograded", assignment_id=assignment_id)
         submissions = list()
         for nb in notebooks:
-            filename = os.path.join(
-                os.path.abspath(self.coursedir.format_path(
-                    self.coursedir.autograded_directory,
-                    student_id=nb.student.id,
-                    assignment_id=assignment_id)),
-                "{}.ipynb".format(nb.name))
-
-            if os.path.exists(filename):
+            entry = autograded.get((nb.student.id, assignment_id), None)
+            if entry is not None and nb.name in entry.notebooks:
                 submissions.append(nb)
 
         return sorted(submissions, key=lambda x: x.id)
@@ -694,17 +747,47 @@ class NbGraderAPI(LoggingConfigurable):
         with self.gradebook as gb:
             notebooks = gb.notebook_submissions(notebook_id, assignment_id)
             submissions = self._filter_existing_notebooks(assignment_id, notebooks)
+        submissions.sort(key=lambda x: x.id)
         return dict([(x.id, i) for i, x in enumerate(submissions)])
 
-    def get_notebook_submissions(self, assignment_id, notebook_id):
+    def get_notebook_submissions(self, assignment_id, notebook_id, limit=None,
+                                 after=None, sort=None, needs_manual_grade=None,
+                                 name_prefix=None, next_page=None, order=None):
         """Get a list of submissions for a particular notebook in an assignment.
 
+        Without any of the optional arguments, all submissions are returned,
+        sorted by id. Otherwise, only a page of the submissions is returned,
+        filtered and sorted by the database.
+
         Arguments
         ---------
         assignment_id: string
             The name of the assignment
         notebook_id: string
             The name of the notebook
+        limit: int
+            (Optional) The maximum number of submissions to return
+        after: tuple
+            (Optional) The ``(sort value, id)`` of the last submission of the
+            previous page; only the submissions sorted after it are returned
+        sort: string
+            (Optional) The key to sort by, prefixed with ``"-"`` for
+            descending order
+        needs_manual_grade: bool
+            (Optional) Only return the submissions that do (or do not) need
+            manual grading
+        name_prefix: string
+            (Optional) Only return the submissions of students whose id, first
+            name or last name start with this prefix
+        next_page: dict
+            (Optional) A dictionary in which ``"after"`` is set to the
+            ``after`` argument of the next page, or to None if this is the
+            last page
+        order: :class:`~nbgrader.server_extensions.formgrader.submissionorder.SubmissionOrder`
+            (Optional) The order of the notebook's submissions, to take the
+            ``index`` of each submission from (see
+            :func:`~nbgrader.apps.api.NbGraderAPI.get_notebook_submission_indices`,
+            which is called otherwise)
 
         Returns
         -------
@@ -718,14 +801,24 @@ class NbGraderAPI(LoggingConfigurable):
             except MissingEntry:
                 return []
 
-            submissions = gb.notebook_submission_dicts(notebook_id, assignment_id)
+            page = dict(
+                limit=limit, after=after, sort=sort,
+                needs_manual_grade=needs_manual_grade, name_prefix=name_prefix)
+            submissions = gb.notebook_submission_dicts(notebook_id, assignment_id, **page)
+        # the submissions whose notebook is missing are removed from the page
+        # below, but still count towards the next page
+        _set_next_page(next_page, submissions, limit, sort)
 
-        indices = self.get_notebook_submission_indices(assignment_id, notebook_id)
+        if order is not None:
+            index = order.index
+        else:
+            index = self.get_notebook_submission_indices(assignment_id, notebook_id).get
         for nb in submissions:
-            nb['index'] = indices.get(nb['id'], None)
+            nb['index'] = index(nb['id'])
 
         submissions = [x for x in submissions if x['index'] is not None]
-        submissions.sort(key=lambda x: x["id"])
+        if all(value is None for value in page.values()):
+            submissions.sort(key=lambda x: x["id"])
         return submissions
 
     def get_student(self, student_id, submitted=None):
@@ -769,21 +862,61 @@ class NbGraderAPI(LoggingConfigurable):
 
         return student
 
-    def get_students(self):
+    def get_students(self, limit=None, after=None, sort=None, name_prefix=None,
+                     next_page=None):
         """Get a list containing information about all the students in class.
 
+        Without any of the optional arguments, all students are returned,
+        sorted by name. Otherwise, only a page of the students in the
+        database is returned, filtered and sorted by the database. The
+        students who have submitted an assignment but are not in the
+        database are added to the last page (the first one with less than
+        ``limit`` students in the database).
+
+        Arguments
+        ---------
+        limit: int
+            (Optional) The maximum number of students to return
+        after: tuple
+            (Optional) The ``(sort value, id)`` of the last student of the
+            previous page; only the students sorted after it are returned
+        sort: string
+            (Optional) The key to sort by, prefixed with ``"-"`` for
+            descending order
+        name_prefix: string
+            (Optional) Only return the students of students whose id, first
+            name or last name start with this prefix
+        next_page: dict
+            (Optional) A dictionary in which ``"after"`` is set to the
+            ``after`` argument of the next page, or to None if this is the
+            last page
+
         Returns
         -------
         students: list
             A list of dictionaries containing information about all the students
 
         """
+        page = dict(limit=limit, after=after, sort=sort, name_prefix=name_prefix)
+        paged = any(value is not None for value in page.values())
         with self.gradebook as gb:
-            in_db = set([x.id for x in gb.students])
-            students = gb.student_dicts()
+            in_db = set([x for x, in gb.db.query(Student.id)])
+            students = gb.student_dicts(**page)
+        _set_next_page(next_page, students, limit, sort)
+
+        if paged and limit is not None and len(students) >= limit:
+            not_in_db = set()
+        else:
+            not_in_db = self.get_submitted_students("*") - in_db
+        if name_prefix:
+            not_in_db = set(x for x in not_in_db if x.startswith(name_prefix))
+
+        if paged:
+            return students + [
+                self.get_student(student_id, submitted=not_in_db)
+                for student_id in sorted(not_in_db)]
 
-        submitted = self.get_submitted_students("*")
-        for student_id in (submitted - in_db):
+        for student_id in not_in_db:
             students.append({
                 "id": student_id,
                 "last_name": None,
@@ -844,16 +977,10 @@ class NbGraderAPI(LoggingConfigurable):
             except MissingEntry:
                 return []
 
+            autograded = self.coursedir.snapshot.get("autograded", student_id, assignment_id)
             submissions = []
-            for notebook in assignment.notebooks:
-                filename = os.path.join(
-                    os.path.abspath(self.coursedir.format_path(
-                        self.coursedir.autograded_directory,
-                        student_id=student_id,
-                        assignment_id=assignment_id)),
-                    "{}.ipynb".format(notebook.name))
-
-                if os.path.exists(filename):
+            for notebook in gb.prefetch_summaries(list(assignment.notebooks)):
+                if autograded is not None and notebook.name in autograded.notebooks:
                     submissions.append(notebook.to_dict())
                 else:
                     submissions.append({
@@ -6,6 +6,7 @@ from traitlets import default
 
 from .baseapp import NbGrader, nbgrader_aliases, nbgrader_flags
 from ..converters import BaseConverter, Autograde, NbGraderException
+from ..preprocessors.zygote import ZygoteKernelManager
 from traitlets.traitlets import MetaHasTraits
 from traitlets.config.loader import Config
 from typing import List
@@ -15,6 +16,7 @@ aliases = {
 }
 aliases.update(nbgrader_aliases)
 aliases.update({
+    'jobs': 'BaseConverter.jobs',
 })
 
 flags = {}
@@ -40,6 +42,11 @@ flags.update({
         {'BaseConverter': {'force': True}},
         "Overwrite an assignment/submission if it already exists."
     ),
+    'journal': (
+        {'Autograde': {'use_journal': True}},
+        "Write grades to per-process journal files and merge them into the "
+        "database at the end, rather than writing to the database directly."
+    ),
 })
 
 
@@ -95,12 +102,23 @@ class AutogradeApp(NbGrader):
         check all solutions. For example, if a student saved their notebook with
         all outputs cleared, then using --no-execute would result in them
         receiving full credit on all autograded problems.
+
+        To autograde several submissions at once, using (for example) eight
+        worker processes:
+
+            nbgrader autograde "Problem Set 1" --jobs 8
+
+        With many worker processes, the workers can write their results to
+        journal files that are merged into the database at the end, instead of
+        all writing to the database at once:
+
+            nbgrader autograde "Problem Set 1" --jobs 8 --journal
         """
 
     @default("classes")
     def _classes_default(self) -> List[MetaHasTraits]:
         classes = super(AutogradeApp, self)._classes_default()
-        classes.extend([BaseConverter, Autograde])
+        classes.extend([BaseConverter, Autograde, ZygoteKernelManager])
         return classes
 
     def _load_config(self, cfg: Config, **kwargs: dict) -> None:
@@ -7,11 +7,11 @@ import sys
 import shutil
 
 from textwrap import dedent
-from traitlets import default, Unicode, Bool, List
+from traitlets import default, Unicode, Bool, List, Integer
 from datetime import datetime
 
 from . import NbGrader
-from ..api import Gradebook, MissingEntry, Student, Assignment
+from ..api import Gradebook, MissingEntry, Student, Assignment, SubmittedAssignment
 from .. import dbutil
 
 aliases = {
@@ -89,7 +89,7 @@ class DbStudentAddApp(DbBaseApp):
         }
 
         self.log.info("Creating/updating student with ID '%s': %s", student_id, student)
-        with Gradebook(self.coursedir.db_url, self.course_id, self.authenticator) as gb:
+        with Gradebook(self.coursedir.db_url, self.course_id, self.authenticator, **self.coursedir.db_options) as gb:
             gb.update_or_create_student(student_id, **student)
 
 student_remove_flags = {}
@@ -123,13 +123,14 @@ class DbStudentRemoveApp(DbBaseApp):
 
         student_id = self.extra_args[0]
 
-        with Gradebook(self.coursedir.db_url, self.course_id, self.authenticator) as gb:
+        with Gradebook(self.coursedir.db_url, self.course_id, self.authenticator, **self.coursedir.db_options) as gb:
             try:
                 student = gb.find_student(student_id)
             except MissingEntry:
                 self.fail("No such student: '%s'", student_id)
 
-            if len(student.submissions) > 0:
+            submissions = gb.db.query(SubmittedAssignment.id).filter(SubmittedAssignment.student_id == student.id)
+            if submissions.first() is not None:
                 if self.force:
                     self.log.warning("Removing associated grades")
                 else:
@@ -153,17 +154,19 @@ class DbGenericImportApp(DbBaseApp):
         imported via a csv file.
         """).strip())
 
-    def db_update_method_name(self):
+    chunk_size = Integer(1000, help=dedent(
         """
-        Name of the update method used on the Gradebook for this import app.
-
-        Arguments
-        ---------
-        instance_id: string
-            Identifies which instance you are updating based on self.primary_key
-        instance: dictionary
-            Contents for the update from the parsed csv rows; unpacked as kwargs
+        The number of rows of the CSV file that are imported together, in one
+        transaction.
+        """).strip()).tag(config=True)
 
+    @property
+    def db_bulk_method_name(self):
+        """
+        Name of the Gradebook method used to update or create the instances
+        of one chunk of the csv rows at once. It is passed a list of
+        dictionaries, including the self.primary_key of each instance, and
+        returns the number of instances "inserted", "updated" and "unchanged".
         """
         raise NotImplementedError
 
@@ -217,14 +220,17 @@ class DbGenericImportApp(DbBaseApp):
         self.log.info("Importing from: '%s'", path)
 
 
-        with Gradebook(self.coursedir.db_url, self.course_id, self.authenticator) as gb:
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        with Gradebook(self.coursedir.db_url, self.course_id, self.authenticator, **self.coursedir.db_options) as gb:
+            db_bulk_method = getattr(gb, self.db_bulk_method_name)
             with open(path, 'r') as fh:
                 reader = csv.DictReader(fh)
                 reader.fieldnames = self._preprocess_keys(reader.fieldnames)
-                for row in reader:
-                    if self.primary_key not in row:
-                        self.fail("Malformatted CSV file: must contain a column for '%s'" % self.primary_key)
+                if self.primary_key not in reader.fieldnames:
+                    self.fail("Malformatted CSV file: must contain a column for '%s'" % self.primary_key)
 
+                chunk = []
+                for row in reader:
                     # make sure all the keys are actually allowed in the database,
                     # and that any empty strings are parsed as None
                     instance = {}
@@ -235,17 +241,29 @@ class DbGenericImportApp(DbBaseApp):
                             instance[key] = None
                         else:
                             instance[key] = val
-                    instance_primary_key = instance.pop(self.primary_key)
-
-
-                    self.log.info("Creating/updating %s with %s '%s': %s",
-                                  self.table_class.__name__,
-                                  self.primary_key,
-                                  instance_primary_key,
-                                  instance)
-                    db_update_method = getattr(gb, self.db_update_method_name)
-                    db_update_method(instance_primary_key, **instance)
-
+                    if instance[self.primary_key] is None:
+                        self.fail("Malformatted CSV file: missing '%s' on line %d" % (self.primary_key, reader.line_num))
+
+                    self.log.debug("Creating/updating %s with %s '%s': %s",
+                                   self.table_class.__name__,
+                                   self.primary_key,
+                                   instance[self.primary_key],
+                                   instance)
+                    chunk.append(instance)
+                    if len(chunk) == self.chunk_size:
+                        self._import_chunk(db_bulk_method, chunk, counts)
+                        chunk = []
+
+                if chunk:
+                    self._import_chunk(db_bulk_method, chunk, counts)
+
+        self.log.info("%s: %d inserted, %d updated, %d unchanged",
+                      self.table_class.__name__, counts["inserted"],
+                      counts["updated"], counts["unchanged"])
+
+    def _import_chunk(self, db_bulk_method, chunk, counts):
+        for key, value in db_bulk_method(chunk).items():
+            counts[key] += value
 
     def _preprocess_keys(self, keys):
         """
@@ -275,8 +293,8 @@ class DbStudentImportApp(DbGenericImportApp):
         return "id"
 
     @property
-    def db_update_method_name(self):
-        return "update_or_create_student"
+    def db_bulk_method_name(self):
+        return "bulk_update_or_create_students"
 
 
 class DbStudentListApp(DbBaseApp):
@@ -290,7 +308,7 @@ class DbStudentListApp(DbBaseApp):
     def start(self):
         super(DbStudentListApp, self).start()
 
-        with Gradebook(self.coursedir.db_url, self.course_id, self.authenticator) as gb:
+        with Gradebook(self.coursedir.db_url, self.course_id, self.authenticator, **self.coursedir.db_options) as gb:
             print("There are %d students in the database:" % len(gb.students))
             for student in gb.students:
                 print("%s (%s, %s) -- %s, %s" % (student.id, student.last_name, student.first_name, student.email, student.lms_user_id))
@@ -328,7 +346,7 @@ class DbAssignmentAddApp(DbBaseApp):
         }
 
         self.log.info("Creating/updating assignment with ID '%s': %s", assignment_id, assignment)
-        with Gradebook(self.coursedir.db_url, self.course_id, self.authenticator) as gb:
+        with Gradebook(self.coursedir.db_url, self.course_id, self.authenticator, **self.coursedir.db_options) as gb:
             gb.update_or_create_assignment(assignment_id, **assignment)
 
 
@@ -363,13 +381,14 @@ class DbAssignmentRemoveApp(DbBaseApp):
 
         assignment_id = self.extra_args[0]
 
-        with Gradebook(self.coursedir.db_url, self.course_id, self.authenticator) as gb:
+        with Gradebook(self.coursedir.db_url, self.course_id, self.authenticator, **self.coursedir.db_options) as gb:
             try:
                 assignment = gb.find_assignment(assignment_id)
             except MissingEntry:
                 self.fail("No such assignment: '%s'", assignment_id)
 
-            if len(assignment.submissions) > 0:
+            submissions = gb.db.query(SubmittedAssignment.id).filter(SubmittedAssignment.assignment_id == assignment.id)
+            if submissions.first() is not None:
                 if self.force:
                     self.log.warning("Removing associated grades")
                 else:
@@ -399,8 +418,8 @@ class DbAssignmentImportApp(DbGenericImportApp):
         return "name"
 
     @property
-    def db_update_method_name(self):
-        return "update_or_create_assignment"
+    def db_bulk_method_name(self):
+        return "bulk_update_or_create_assignments"
 
 class DbAssignmentListApp(DbBaseApp):
 
@@ -413,7 +432,7 @@ class DbAssignmentListApp(DbBaseApp):
     def start(self):
         super(DbAssignmentListApp, self).start()
 
-        with Gradebook(self.coursedir.db_url, self.course_id, self.authenticator) as gb:
+        with Gradebook(self.coursedir.db_url, self.course_id, self.authenticator, **self.coursedir.db_options) as gb:
             print("There are %d assignments in the database:" % len(gb.assignments))
             for assignment in gb.assignments:
                 print("%s (due: %s)" % (assignment.name, assignment.duedate))
@@ -517,6 +536,18 @@ class DbUpgradeApp(DbBaseApp):
         dbutil.upgrade(self.coursedir.db_url)
 
 
+class DbRebuildSummariesApp(DbBaseApp):
+
+    name = u'nbgrader-db-rebuild-summaries'
+    description = u'Recompute the stored score summaries in the database'
+
+    def start(self):
+        super(DbRebuildSummariesApp, self).start()
+        self.log.info("Rebuilding score summaries in %s", self.coursedir.db_url)
+        with Gradebook(self.coursedir.db_url, self.course_id, **self.coursedir.db_options) as gb:
+            gb.rebuild_summaries()
+
+
 class DbApp(DbBaseApp):
 
     name = u'nbgrader-db'
@@ -547,6 +578,15 @@ class DbApp(DbBaseApp):
                 """
             ).strip()
         ),
+        **{'rebuild-summaries': (
+            DbRebuildSummariesApp,
+            dedent(
+                """
+                Recompute the stored score summaries, enabling them if they
+                are not already in use.
+                """
+            ).strip()
+        )},
     )
 
     @default("classes")
@@ -12,6 +12,7 @@ aliases = {
     'exporter': 'ExportApp.plugin_class',
     'assignment' : 'ExportPlugin.assignment',
     'student': 'ExportPlugin.student',
+    'since': 'ExportPlugin.since',
     'course': 'CourseDirectory.course_id'
 }
 flags = {}
@@ -45,12 +46,23 @@ class ExportApp(NbGrader):
         assignments. The assignments or studentIDs need to quoted if they 
         contain not only numbers. The square brackets are obligatory.
 
+        To export the score of every student in every graded cell, with one
+        row per student and one column per cell, as CSV or Parquet:
+
+            nbgrader export --exporter=nbgrader.plugins.CellScoresExportPlugin
+                            --to cell_scores.parquet
+
         To change the export type, you will need a class that inherits from
         nbgrader.plugins.ExportPlugin. If your exporter is named
         `MyCustomExporter` and is saved in the file `myexporter.py`, then:
 
             nbgrader export --exporter=myexporter.MyCustomExporter
 
+        To only export the submissions that changed since a previous export,
+        pass the number logged at the end of that export:
+
+            nbgrader export --since 1234
+
         """
 
     plugin_class = Type(
@@ -75,5 +87,9 @@ class ExportApp(NbGrader):
     def start(self):
         super(ExportApp, self).start()
         self.init_plugin()
-        with Gradebook(self.coursedir.db_url, self.coursedir.course_id) as gb:
+        with Gradebook(self.coursedir.db_url, self.coursedir.course_id, **self.coursedir.db_options) as gb:
+            last_change = gb.last_change()
             self.plugin_inst.export(gb)
+        self.log.info(
+            "Exported all changes up to %d, use --since=%d to only export later changes",
+            last_change, last_change)
@@ -16,6 +16,7 @@ aliases = {
 aliases.update(nbgrader_aliases)
 del aliases['student']
 aliases.update({
+    'jobs': 'BaseConverter.jobs',
 })
 
 flags = {}
@@ -10,6 +10,7 @@ from ..converters import BaseConverter, GenerateFeedback, NbGraderException
 aliases = {}
 aliases.update(nbgrader_aliases)
 aliases.update({
+    'jobs': 'BaseConverter.jobs',
 })
 
 flags = {}
@@ -12,6 +12,7 @@ from jupyter_core.application import NoStart
 
 import nbgrader
 from .baseapp import nbgrader_aliases, nbgrader_flags
+from ..querystats import query_stats
 from . import (
     NbGrader,
     AssignApp,
@@ -310,7 +311,19 @@ class NbGraderApp(NbGrader):
             self.print_subcommands()
 
         # This starts subapps
-        super(NbGraderApp, self).start()
+        try:
+            super(NbGraderApp, self).start()
+        finally:
+            self.log_query_stats()
+
+    def log_query_stats(self) -> None:
+        # the options are those of the (sub)command that was run
+        app = self
+        while app.subapp is not None:
+            app = app.subapp
+        coursedir = getattr(app, "coursedir", None)
+        if coursedir is not None and coursedir.db_profile_queries:
+            app.log.info("Database queries by gradebook method:\n%s", query_stats.format_table())
 
     def print_version(self):
         print("Python version {}".format(sys.version))
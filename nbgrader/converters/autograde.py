@@ -1,10 +1,16 @@
+import glob
 import os
 import shutil
+import typing
 
 from textwrap import dedent
-from traitlets import Bool, List, Dict
+from traitlets import Bool, List, Dict, Unicode, default
+from nbconvert.exporters import Exporter
+from nbconvert.exporters.exporter import ResourcesDict
+from nbformat.v4.rwbase import strip_transient
 
 from .base import BaseConverter, NbGraderException
+from .journal import ResultJournal, merge_journal
 from ..preprocessors import (
     AssignLatePenalties, ClearOutput, DeduplicateIds, OverwriteCells, SaveAutoGrades,
     Execute, LimitOutput, OverwriteKernelspec, CheckCellMetadata)
@@ -37,14 +43,37 @@ class Autograde(BaseConverter):
         )
     ).tag(config=True)
 
-    _sanitizing = True
+    use_journal = Bool(
+        False,
+        help=dedent(
+            """
+            Whether to write the grades of each submission to a journal file
+            (one per worker process) rather than to the database, and merge
+            the journals into the database once all the submissions have been
+            autograded. This avoids contention on the database when
+            autograding with many worker processes (see BaseConverter.jobs).
+            Journals left over by an interrupted run are merged the next time
+            autograde is run.
+            """
+        )
+    ).tag(config=True)
+
+    journal_directory = Unicode(
+        help=dedent(
+            """
+            The directory for the journal files, see Autograde.use_journal.
+            Defaults to <root>/.autograde_journal.
+            """
+        )
+    ).tag(config=True)
+
+    @default("journal_directory")
+    def _journal_directory_default(self) -> str:
+        return os.path.join(self.coursedir.root, ".autograde_journal")
 
     @property
     def _input_directory(self) -> str:
-        if self._sanitizing:
-            return self.coursedir.submitted_directory
-        else:
-            return self.coursedir.autograded_directory
+        return self.coursedir.submitted_directory
 
     @property
     def _output_directory(self) -> str:
@@ -67,8 +96,84 @@ class Autograde(BaseConverter):
 
     preprocessors = List([])
 
+    _gradebook = None  # type: typing.Optional[Gradebook]
+    _journal = None  # type: typing.Optional[ResultJournal]
+
+    def _init_journal(self) -> None:
+        # each (forked) worker process writes its own journal
+        if self._journal is None or self._journal.pid != os.getpid():
+            if not os.path.exists(self.journal_directory):
+                os.makedirs(self.journal_directory)
+            path = os.path.join(self.journal_directory, "{}.jsonl".format(os.getpid()))
+            self._journal = ResultJournal(path)
+
+    def _merge_journals(self) -> None:
+        paths = sorted(glob.glob(os.path.join(self.journal_directory, "*.jsonl")))
+        if len(paths) == 0:
+            return
+
+        late_penalties = AssignLatePenalties(parent=self)
+        if late_penalties.enabled:
+            late_penalties.init_plugin()
+        else:
+            late_penalties = None
+
+        with Gradebook(self.coursedir.db_url, self.coursedir.course_id, **self.coursedir.db_options) as gb:
+            for path in paths:
+                try:
+                    num_submissions = merge_journal(path, gb, late_penalties, self.log)
+                except Exception:
+                    # move the journal out of the way, so that it doesn't
+                    # fail every later run too
+                    self.log.error("Failed to merge %s, moving it to %s.failed", path, path, exc_info=True)
+                    os.replace(path, path + ".failed")
+                else:
+                    self.log.info("Merged %d submissions from %s", num_submissions, path)
+
+    def convert_notebooks(self) -> None:
+        if not self.use_journal:
+            super(Autograde, self).convert_notebooks()
+            return
+
+        # merge anything left over from an interrupted run first, so that
+        # the results of this run are applied on top of it
+        self._merge_journals()
+        try:
+            super(Autograde, self).convert_notebooks()
+        finally:
+            self._merge_journals()
+
+    def convert_single_assignment(self, assignment: str, errors: typing.List[typing.Tuple[str, str]]) -> None:
+        if self.use_journal:
+            self._init_journal()
+
+        num_errors = len(errors)
+        completed = False
+        try:
+            super(Autograde, self).convert_single_assignment(assignment, errors)
+            completed = len(errors) == num_errors
+        finally:
+            if self._gradebook is not None:
+                self._gradebook.close()
+                self._gradebook = None
+
+            # only fully autograded submissions make it into the journal
+            if self._journal is not None:
+                if completed:
+                    self._journal.commit()
+                else:
+                    self._journal.discard()
+
     def init_assignment(self, assignment_id: str, student_id: str) -> None:
         super(Autograde, self).init_assignment(assignment_id, student_id)
+
+        # a single gradebook is used for the whole submission, and shared
+        # with the preprocessors through the notebook resources
+        self._gradebook = gb = Gradebook(self.coursedir.db_url, self.coursedir.course_id, **self.coursedir.db_options)
+
+        # in journal mode, nothing is written to the database here
+        journal = self._journal if self.use_journal else None
+
         # try to get the student from the database, and throw an error if it
         # doesn't exist
         student = {}
@@ -77,41 +182,44 @@ class Autograde(BaseConverter):
             if 'id' in student:
                 del student['id']
             self.log.info("Creating/updating student with ID '%s': %s", student_id, student)
-            with Gradebook(self.coursedir.db_url, self.coursedir.course_id) as gb:
+            if journal is not None:
+                journal.record('student', assignment=assignment_id, student=student_id, fields=student)
+            else:
                 gb.update_or_create_student(student_id, **student)
 
         else:
-            with Gradebook(self.coursedir.db_url, self.coursedir.course_id) as gb:
-                try:
-                    gb.find_student(student_id)
-                except MissingEntry:
-                    msg = "No student with ID '%s' exists in the database" % student_id
-                    self.log.error(msg)
-                    raise NbGraderException(msg)
-
-        # make sure the assignment exists
-        with Gradebook(self.coursedir.db_url, self.coursedir.course_id) as gb:
             try:
-                gb.find_assignment(assignment_id)
+                gb.find_student(student_id)
             except MissingEntry:
-                msg = "No assignment with ID '%s' exists in the database" % assignment_id
+                msg = "No student with ID '%s' exists in the database" % student_id
                 self.log.error(msg)
                 raise NbGraderException(msg)
 
+        # make sure the assignment exists
+        try:
+            gb.find_assignment(assignment_id)
+        except MissingEntry:
+            msg = "No assignment with ID '%s' exists in the database" % assignment_id
+            self.log.error(msg)
+            raise NbGraderException(msg)
+
         # try to read in a timestamp from file
         src_path = self._format_source(assignment_id, student_id)
         timestamp = self.coursedir.get_existing_timestamp(src_path)
-        with Gradebook(self.coursedir.db_url, self.coursedir.course_id) as gb:
-            if timestamp:
-                submission = gb.update_or_create_submission(
-                    assignment_id, student_id, timestamp=timestamp)
-                self.log.info("%s submitted at %s", submission, timestamp)
-
-                # if the submission is late, print out how many seconds late it is
-                if timestamp and submission.total_seconds_late > 0:
-                    self.log.warning("%s is %s seconds late", submission, submission.total_seconds_late)
-            else:
-                submission = gb.update_or_create_submission(assignment_id, student_id)
+        if journal is not None:
+            journal.record(
+                'submission', assignment=assignment_id, student=student_id,
+                timestamp=timestamp.isoformat() if timestamp else None)
+        elif timestamp:
+            submission = gb.update_or_create_submission(
+                assignment_id, student_id, timestamp=timestamp)
+            self.log.info("%s submitted at %s", submission, timestamp)
+
+            # if the submission is late, print out how many seconds late it is
+            if timestamp and submission.total_seconds_late > 0:
+                self.log.warning("%s is %s seconds late", submission, submission.total_seconds_late)
+        else:
+            submission = gb.update_or_create_submission(assignment_id, student_id)
 
         # copy files over from the source directory
         self.log.info("Overwriting files with master versions from the source directory")
@@ -133,16 +241,15 @@ class Autograde(BaseConverter):
 
         # ignore notebooks that aren't in the database
         notebooks = []
-        with Gradebook(self.coursedir.db_url, self.coursedir.course_id) as gb:
-            for notebook in self.notebooks:
-                notebook_id = os.path.splitext(os.path.basename(notebook))[0]
-                try:
-                    gb.find_notebook(notebook_id, assignment_id)
-                except MissingEntry:
-                    self.log.warning("Skipping unknown notebook: %s", notebook)
-                    continue
-                else:
-                    notebooks.append(notebook)
+        for notebook in self.notebooks:
+            notebook_id = os.path.splitext(os.path.basename(notebook))[0]
+            try:
+                gb.find_notebook(notebook_id, assignment_id)
+            except MissingEntry:
+                self.log.warning("Skipping unknown notebook: %s", notebook)
+                continue
+            else:
+                notebooks.append(notebook)
         self.notebooks = notebooks
         if len(self.notebooks) == 0:
             msg = "No notebooks found, did you forget to run 'nbgrader generate_assignment'?"
@@ -151,43 +258,59 @@ class Autograde(BaseConverter):
 
         # check for missing notebooks and give them a score of zero if they
         # do not exist
-        with Gradebook(self.coursedir.db_url, self.coursedir.course_id) as gb:
-            assignment = gb.find_assignment(assignment_id)
-            for notebook in assignment.notebooks:
-                path = os.path.join(self.coursedir.format_path(
-                    self.coursedir.submitted_directory,
-                    student_id,
-                    assignment_id), "{}.ipynb".format(notebook.name))
-                if not os.path.exists(path):
-                    self.log.warning("No submitted file: {}".format(path))
-                    submission = gb.find_submission_notebook(
-                        notebook.name, assignment_id, student_id)
-                    for grade in submission.grades:
-                        grade.auto_score = 0
-                        grade.needs_manual_grade = False
-                    gb.db.commit()
-
-    def _init_preprocessors(self) -> None:
-        self.exporter._preprocessors = []
-        if self._sanitizing:
-            preprocessors = self.sanitize_preprocessors
-        else:
-            preprocessors = self.autograde_preprocessors
+        assignment = gb.find_assignment(assignment_id)
+        for notebook in assignment.notebooks:
+            path = os.path.join(self.coursedir.format_path(
+                self.coursedir.submitted_directory,
+                student_id,
+                assignment_id), "{}.ipynb".format(notebook.name))
+            if not os.path.exists(path):
+                self.log.warning("No submitted file: {}".format(path))
+                if journal is not None:
+                    journal.record(
+                        'missing_notebook', assignment=assignment_id,
+                        student=student_id, notebook=notebook.name)
+                    continue
+                submission = gb.find_submission_notebook(
+                    notebook.name, assignment_id, student_id)
+                for grade in submission.grades:
+                    grade.auto_score = 0
+                    grade.needs_manual_grade = False
+                gb.db.commit()
+
+    def start(self) -> None:
+        # the sanitize stage uses a plain Exporter, which returns the
+        # preprocessed notebook node instead of serializing it, so that the
+        # sanitized notebook can be handed to the autograde stage in memory
+        self._sanitize_exporter = Exporter(parent=self, config=self.config)
+        for pp in self.sanitize_preprocessors:
+            self._sanitize_exporter.register_preprocessor(pp)
+        self.preprocessors = self.autograde_preprocessors
+        super(Autograde, self).start()
 
-        for pp in preprocessors:
-            self.exporter.register_preprocessor(pp)
+    def init_single_notebook_resources(self, notebook_filename: str) -> typing.Dict[str, typing.Any]:
+        resources = super(Autograde, self).init_single_notebook_resources(notebook_filename)
+        resources['nbgrader']['gradebook'] = self._gradebook
+        if self.use_journal:
+            resources['nbgrader']['journal'] = self._journal
+        return resources
 
     def convert_single_notebook(self, notebook_filename: str) -> None:
         self.log.info("Sanitizing %s", notebook_filename)
-        self._sanitizing = True
-        self._init_preprocessors()
-        super(Autograde, self).convert_single_notebook(notebook_filename)
-
-        notebook_filename = os.path.join(self.writer.build_directory, os.path.basename(notebook_filename))
-        self.log.info("Autograding %s", notebook_filename)
-        self._sanitizing = False
-        self._init_preprocessors()
-        try:
-            super(Autograde, self).convert_single_notebook(notebook_filename)
-        finally:
-            self._sanitizing = True
+        resources = self.init_single_notebook_resources(notebook_filename)
+        nb, resources = self._sanitize_exporter.from_filename(notebook_filename, resources=resources)
+
+        # the autograde stage sees the same notebook and resources it would
+        # if the sanitized notebook had been written to the autograded
+        # directory and read back from there
+        strip_transient(nb)
+        dest = self._format_dest(resources['nbgrader']['assignment'], resources['nbgrader']['student'])
+        self.log.info("Autograding %s", os.path.join(dest, os.path.basename(notebook_filename)))
+        if not os.path.exists(dest):
+            os.makedirs(dest)
+        autograde_resources = self.init_single_notebook_resources(notebook_filename)
+        autograde_resources['metadata'] = ResourcesDict()
+        autograde_resources['metadata'].update(resources['metadata'])
+        autograde_resources['metadata']['path'] = dest
+        output, autograde_resources = self.exporter.from_notebook_node(nb, resources=autograde_resources)
+        self.write_single_notebook(output, autograde_resources)
@@ -1,5 +1,6 @@
 import os
 import glob
+import multiprocessing
 import re
 import shutil
 import sqlalchemy
@@ -16,6 +17,8 @@ from nbconvert.writers import FilesWriter
 from ..coursedir import CourseDirectory
 from ..utils import find_all_files, rmtree, remove
 from ..preprocessors.execute import UnresponsiveKernelError
+from ..preprocessors.kernelpool import shutdown_kernel_pools
+from ..preprocessors.zygote import shutdown_zygotes
 from ..nbgraderformat import SchemaTooOldError, SchemaTooNewError
 import typing
 from nbconvert.exporters.exporter import ResourcesDict
@@ -25,6 +28,19 @@ class NbGraderException(Exception):
     pass
 
 
+# converter inherited by forked worker processes, see ``BaseConverter.jobs``
+_worker_converter = None  # type: typing.Optional[BaseConverter]
+
+
+def _convert_single_assignment_worker(assignment: str) -> typing.Tuple[typing.List[typing.Tuple[str, str]], typing.Optional[str]]:
+    errors = []  # type: typing.List[typing.Tuple[str, str]]
+    try:
+        _worker_converter.convert_single_assignment(assignment, errors)
+    except NbGraderException as e:
+        return errors, str(e)
+    return errors, None
+
+
 class BaseConverter(LoggingConfigurable):
 
     notebooks = List([])
@@ -51,6 +67,20 @@ class BaseConverter(LoggingConfigurable):
     def _permissions_default(self) -> int:
         return 664 if self.coursedir.groupshared else 444
 
+    jobs = Integer(
+        1,
+        help=dedent(
+            """
+            Number of worker processes used to convert submissions. Each
+            submission (i.e. each student's assignment) is converted in its
+            own worker, so values larger than one only help when several
+            submissions are being processed. Requires a platform that supports
+            forking processes; otherwise submissions are converted one at a
+            time.
+            """
+        )
+    ).tag(config=True)
+
     coursedir = Instance(CourseDirectory, allow_none=True)
 
     def __init__(self, coursedir: CourseDirectory = None, **kwargs: typing.Any) -> None:
@@ -76,6 +106,8 @@ class BaseConverter(LoggingConfigurable):
         try:
             self.convert_notebooks()
         finally:
+            shutdown_kernel_pools()
+            shutdown_zygotes()
             os.chdir(currdir)
 
     @default("classes")
@@ -153,6 +185,7 @@ class BaseConverter(LoggingConfigurable):
         resources['nbgrader']['assignment'] = gd['assignment_id']
         resources['nbgrader']['notebook'] = gd['notebook_id']
         resources['nbgrader']['db_url'] = self.coursedir.db_url
+        resources['nbgrader']['db_options'] = self.coursedir.db_options
 
         return resources
 
@@ -289,107 +322,154 @@ class BaseConverter(LoggingConfigurable):
         output, resources = self.exporter.from_filename(notebook_filename, resources=resources)
         self.write_single_notebook(output, resources)
 
-    def convert_notebooks(self) -> None:
-        errors = []
+    def _handle_failure(self, gd: typing.Dict[str, str]) -> None:
+        dest = os.path.normpath(self._format_dest(gd['assignment_id'], gd['student_id']))
+        if self.coursedir.notebook_id == "*":
+            if os.path.exists(dest):
+                self.log.warning("Removing failed assignment: {}".format(dest))
+                rmtree(dest)
+        else:
+            for notebook in self.notebooks:
+                filename = os.path.splitext(os.path.basename(notebook))[0] + self.exporter.file_extension
+                path = os.path.join(dest, filename)
+                if os.path.exists(path):
+                    self.log.warning("Removing failed notebook: {}".format(path))
+                    remove(path)
 
-        def _handle_failure(gd: typing.Dict[str, str]) -> None:
-            dest = os.path.normpath(self._format_dest(gd['assignment_id'], gd['student_id']))
-            if self.coursedir.notebook_id == "*":
-                if os.path.exists(dest):
-                    self.log.warning("Removing failed assignment: {}".format(dest))
-                    rmtree(dest)
-            else:
-                for notebook in self.notebooks:
-                    filename = os.path.splitext(os.path.basename(notebook))[0] + self.exporter.file_extension
-                    path = os.path.join(dest, filename)
-                    if os.path.exists(path):
-                        self.log.warning("Removing failed notebook: {}".format(path))
-                        remove(path)
+    def convert_single_assignment(self, assignment: str, errors: typing.List[typing.Tuple[str, str]]) -> None:
+        """
+        Convert all the notebooks of a single submission.
+
+        Non-fatal failures are recorded as ``(assignment_id, student_id)``
+        tuples in ``errors``; fatal failures raise a
+        :class:`NbGraderException`.
+        """
+        # initialize the list of notebooks and the exporter
+        self.notebooks = sorted(self.assignments[assignment])
 
-        for assignment in sorted(self.assignments.keys()):
-            # initialize the list of notebooks and the exporter
-            self.notebooks = sorted(self.assignments[assignment])
+        # parse out the assignment and student ids
+        regexp = self._format_source("(?P<assignment_id>.*)", "(?P<student_id>.*)", escape=True)
+        m = re.match(regexp, assignment)
+        if m is None:
+            msg = "Could not match '%s' with regexp '%s'" % (assignment, regexp)
+            self.log.error(msg)
+            raise NbGraderException(msg)
+        gd = m.groupdict()
+
+        try:
+            # determine whether we actually even want to process this submission
+            should_process = self.init_destination(gd['assignment_id'], gd['student_id'])
+            if not should_process:
+                return
+
+            # initialize the destination
+            self.init_assignment(gd['assignment_id'], gd['student_id'])
+
+            # convert all the notebooks
+            for notebook_filename in self.notebooks:
+                self.convert_single_notebook(notebook_filename)
+
+            # set assignment permissions
+            self.set_permissions(gd['assignment_id'], gd['student_id'])
+
+        except UnresponsiveKernelError:
+            self.log.error(
+                "While processing assignment %s, the kernel became "
+                "unresponsive and we could not interrupt it. This probably "
+                "means that the students' code has an infinite loop that "
+                "consumes a lot of memory or something similar. nbgrader "
+                "doesn't know how to deal with this problem, so you will "
+                "have to manually edit the students' code (for example, to "
+                "just throw an error rather than enter an infinite loop). ",
+                assignment)
+            errors.append((gd['assignment_id'], gd['student_id']))
+            self._handle_failure(gd)
+
+        except sqlalchemy.exc.OperationalError as e:
+            if "database is locked" in str(e):
+                # another process (e.g. the formgrader) held on to the
+                # database for too long; only this submission failed
+                self.log.error(
+                    "The database was locked by another process while "
+                    "processing assignment %s. Consider setting "
+                    "CourseDirectory.db_sqlite_wal, db_busy_timeout or "
+                    "db_write_retries.", assignment)
+                errors.append((gd['assignment_id'], gd['student_id']))
+                self._handle_failure(gd)
+                return
+
+            self._handle_failure(gd)
+            self.log.error(traceback.format_exc())
+            msg = (
+                "There was an error accessing the nbgrader database. This "
+                "may occur if you recently upgraded nbgrader. To resolve "
+                "the issue, first BACK UP your database and then run the "
+                "command `nbgrader db upgrade`."
+            )
+            self.log.error(msg)
+            raise NbGraderException(msg)
+
+        except SchemaTooOldError:
+            self._handle_failure(gd)
+            msg = (
+                "One or more notebooks in the assignment use an old version \n"
+                "of the nbgrader metadata format. Please **back up your class files \n"
+                "directory** and then update the metadata using:\n\nnbgrader update .\n"
+            )
+            self.log.error(msg)
+            raise NbGraderException(msg)
 
-            # parse out the assignment and student ids
-            regexp = self._format_source("(?P<assignment_id>.*)", "(?P<student_id>.*)", escape=True)
-            m = re.match(regexp, assignment)
-            if m is None:
-                msg = "Could not match '%s' with regexp '%s'" % (assignment, regexp)
-                self.log.error(msg)
-                raise NbGraderException(msg)
-            gd = m.groupdict()
+        except SchemaTooNewError:
+            self._handle_failure(gd)
+            msg = (
+                "One or more notebooks in the assignment use an newer version \n"
+                "of the nbgrader metadata format. Please update your version of \n"
+                "nbgrader to the latest version to be able to use this notebook.\n"
+            )
+            self.log.error(msg)
+            raise NbGraderException(msg)
 
-            try:
-                # determine whether we actually even want to process this submission
-                should_process = self.init_destination(gd['assignment_id'], gd['student_id'])
-                if not should_process:
-                    continue
+        except KeyboardInterrupt:
+            self._handle_failure(gd)
+            self.log.error("Canceled")
+            raise
 
-                # initialize the destination
-                self.init_assignment(gd['assignment_id'], gd['student_id'])
+        except Exception:
+            self.log.error("There was an error processing assignment: %s", assignment)
+            self.log.error(traceback.format_exc())
+            errors.append((gd['assignment_id'], gd['student_id']))
+            self._handle_failure(gd)
 
-                # convert all the notebooks
-                for notebook_filename in self.notebooks:
-                    self.convert_single_notebook(notebook_filename)
+    def _convert_assignments_parallel(self, errors: typing.List[typing.Tuple[str, str]]) -> None:
+        global _worker_converter
 
-                # set assignment permissions
-                self.set_permissions(gd['assignment_id'], gd['student_id'])
+        self.log.info("Converting %d submissions with %d worker processes", len(self.assignments), self.jobs)
+        _worker_converter = self
+        pool = multiprocessing.get_context("fork").Pool(self.jobs)
+        try:
+            results = pool.imap(_convert_single_assignment_worker, sorted(self.assignments.keys()))
+            for worker_errors, fatal in results:
+                errors.extend(worker_errors)
+                if fatal is not None:
+                    raise NbGraderException(fatal)
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+            _worker_converter = None
 
-            except UnresponsiveKernelError:
-                self.log.error(
-                    "While processing assignment %s, the kernel became "
-                    "unresponsive and we could not interrupt it. This probably "
-                    "means that the students' code has an infinite loop that "
-                    "consumes a lot of memory or something similar. nbgrader "
-                    "doesn't know how to deal with this problem, so you will "
-                    "have to manually edit the students' code (for example, to "
-                    "just throw an error rather than enter an infinite loop). ",
-                    assignment)
-                errors.append((gd['assignment_id'], gd['student_id']))
-                _handle_failure(gd)
+    def convert_notebooks(self) -> None:
+        errors = []  # type: typing.List[typing.Tuple[str, str]]
 
-            except sqlalchemy.exc.OperationalError:
-                _handle_failure(gd)
-                self.log.error(traceback.format_exc())
-                msg = (
-                    "There was an error accessing the nbgrader database. This "
-                    "may occur if you recently upgraded nbgrader. To resolve "
-                    "the issue, first BACK UP your database and then run the "
-                    "command `nbgrader db upgrade`."
-                )
-                self.log.error(msg)
-                raise NbGraderException(msg)
-
-            except SchemaTooOldError:
-                _handle_failure(gd)
-                msg = (
-                    "One or more notebooks in the assignment use an old version \n"
-                    "of the nbgrader metadata format. Please **back up your class files \n"
-                    "directory** and then update the metadata using:\n\nnbgrader update .\n"
-                )
-                self.log.error(msg)
-                raise NbGraderException(msg)
-
-            except SchemaTooNewError:
-                _handle_failure(gd)
-                msg = (
-                    "One or more notebooks in the assignment use an newer version \n"
-                    "of the nbgrader metadata format. Please update your version of \n"
-                    "nbgrader to the latest version to be able to use this notebook.\n"
-                )
-                self.log.error(msg)
-                raise NbGraderException(msg)
-
-            except KeyboardInterrupt:
-                _handle_failure(gd)
-                self.log.error("Canceled")
-                raise
-
-            except Exception:
-                self.log.error("There was an error processing assignment: %s", assignment)
-                self.log.error(traceback.format_exc())
-                errors.append((gd['assignment_id'], gd['student_id']))
-                _handle_failure(gd)
+        if self.jobs > 1 and len(self.assignments) > 1 and "fork" in multiprocessing.get_all_start_methods():
+            self._convert_assignments_parallel(errors)
+        else:
+            if self.jobs > 1 and "fork" not in multiprocessing.get_all_start_methods():
+                self.log.warning("Parallel conversion is not supported on this platform, using a single process")
+            for assignment in sorted(self.assignments.keys()):
+                self.convert_single_assignment(assignment, errors)
 
         if len(errors) > 0:
             for assignment_id, student_id in errors:
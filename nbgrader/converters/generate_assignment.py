@@ -89,7 +89,7 @@ class GenerateAssignment(BaseConverter):
         super(GenerateAssignment, self).__init__(coursedir=coursedir, **kwargs)
 
     def _clean_old_notebooks(self, assignment_id: str, student_id: str) -> None:
-        with Gradebook(self.coursedir.db_url, self.coursedir.course_id) as gb:
+        with Gradebook(self.coursedir.db_url, self.coursedir.course_id, **self.coursedir.db_options) as gb:
             assignment = gb.find_assignment(assignment_id)
             regexp = re.escape(os.path.sep).join([
                 self._format_source("(?P<assignment_id>.*)", "(?P<student_id>.*)", escape=True),
@@ -137,11 +137,11 @@ class GenerateAssignment(BaseConverter):
                 if 'name' in assignment:
                     del assignment['name']
                 self.log.info("Updating/creating assignment '%s': %s", assignment_id, assignment)
-                with Gradebook(self.coursedir.db_url, self.coursedir.course_id) as gb:
+                with Gradebook(self.coursedir.db_url, self.coursedir.course_id, **self.coursedir.db_options) as gb:
                     gb.update_or_create_assignment(assignment_id, **assignment)
 
             else:
-                with Gradebook(self.coursedir.db_url, self.coursedir.course_id) as gb:
+                with Gradebook(self.coursedir.db_url, self.coursedir.course_id, **self.coursedir.db_options) as gb:
                     try:
                         gb.find_assignment(assignment_id)
                     except MissingEntry:
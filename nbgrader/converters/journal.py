@@ -0,0 +1,184 @@
+"""Journals of autograding results.
+
+When autograding in journal mode, the worker processes do not write to the
+gradebook. They append what they would have written to a journal file
+instead, one JSON object per line and one file per process. A single process
+later merges the journals into the gradebook. Only submissions that were
+completely written to a journal are merged, and merging sets values rather
+than accumulating them, so a journal can be merged again after an
+interrupted run.
+
+"""
+
+import json
+import logging
+import os
+import typing
+
+from ..api import Gradebook, Grade, Comment, MissingEntry
+from ..preprocessors import AssignLatePenalties
+from ..preprocessors.saveautogrades import load_by_cell_name, update_grade
+from .. import utils
+
+
+class ResultJournal(object):
+    """The journal of one process. Records are buffered until the submission
+    they belong to has been converted, and are then written to the file
+    together.
+
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.pid = os.getpid()
+        self._pending = []  # type: typing.List[dict]
+
+    def __deepcopy__(self, memo: dict) -> 'ResultJournal':
+        # copies of the notebook resources should write to the same journal
+        return self
+
+    def record(self, kind: str, **fields: typing.Any) -> None:
+        """Record a result for the current submission."""
+        fields['type'] = kind
+        self._pending.append(fields)
+
+    def commit(self) -> None:
+        """Write the results of the current submission to the journal."""
+        if len(self._pending) == 0:
+            return
+
+        lines = [json.dumps(record) for record in self._pending]
+        lines.append(json.dumps({'type': 'done'}))
+        with open(self.path, 'a') as fh:
+            fh.write('\n'.join(lines) + '\n')
+            fh.flush()
+            os.fsync(fh.fileno())
+        self._pending = []
+
+    def discard(self) -> None:
+        """Forget the results of the current submission."""
+        self._pending = []
+
+
+def read_journal(path: str, log: typing.Optional[logging.Logger] = None) -> typing.List[typing.List[dict]]:
+    """Read the submissions in a journal file, as lists of records.
+    Submissions that were not completely written (e.g. because the process
+    writing them was killed) are skipped.
+
+    """
+    submissions = []
+    pending = []  # type: typing.List[dict]
+    with open(path, 'r') as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # a partially written line can only be the last one
+                break
+            if record['type'] == 'done':
+                submissions.append(pending)
+                pending = []
+            else:
+                pending.append(record)
+
+    if len(pending) > 0 and log is not None:
+        log.warning("Ignoring incomplete results at the end of %s", path)
+    return submissions
+
+
+def _apply_submission(gb: Gradebook, records: typing.List[dict],
+                      late_penalties: typing.Optional[AssignLatePenalties]) -> None:
+    notebooks = {}  # type: typing.Dict[typing.Tuple[str, str, str], typing.Tuple[dict, dict]]
+
+    def load_notebook(record: dict) -> typing.Tuple[dict, dict]:
+        key = (record['notebook'], record['assignment'], record['student'])
+        if key not in notebooks:
+            notebook = gb.find_submission_notebook(*key)
+            notebooks[key] = (
+                load_by_cell_name(gb, Grade, notebook.id),
+                load_by_cell_name(gb, Comment, notebook.id))
+        return notebooks[key]
+
+    for record in records:
+        kind = record['type']
+        assignment_id = record['assignment']
+        student_id = record['student']
+
+        if kind == 'student':
+            try:
+                student = gb.find_student(student_id)
+            except MissingEntry:
+                gb._new_student(student_id, **record['fields'])
+            else:
+                for attr, value in record['fields'].items():
+                    setattr(student, attr, value)
+
+        elif kind == 'submission':
+            try:
+                submission = gb.find_submission(assignment_id, student_id)
+            except MissingEntry:
+                if record['timestamp'] is not None:
+                    gb._new_submission(assignment_id, student_id, timestamp=record['timestamp'])
+                else:
+                    gb._new_submission(assignment_id, student_id)
+            else:
+                if record['timestamp'] is not None:
+                    submission.timestamp = utils.parse_utc(record['timestamp'])
+
+        elif kind == 'missing_notebook':
+            notebook = gb.find_submission_notebook(record['notebook'], assignment_id, student_id)
+            for grade in notebook.grades:
+                grade.auto_score = 0
+                grade.needs_manual_grade = False
+
+        elif kind == 'grade':
+            grades, _ = load_notebook(record)
+            update_grade(grades[record['cell']], record['auto_score'])
+
+        elif kind == 'comment':
+            _, comments = load_notebook(record)
+            comments[record['cell']].auto_comment = record['auto_comment']
+
+        elif kind == 'late_penalty':
+            if late_penalties is not None:
+                late_penalties.assign_late_penalty(
+                    gb, record['notebook'], assignment_id, student_id)
+
+        else:
+            raise ValueError("Unknown journal record type: {}".format(kind))
+
+
+def merge_journal(path: str, gb: Gradebook,
+                  late_penalties: typing.Optional[AssignLatePenalties] = None,
+                  log: typing.Optional[logging.Logger] = None) -> int:
+    """Apply the results in a journal file to the gradebook in a single
+    transaction, and remove the file once they have been committed.
+
+    Parameters
+    ----------
+    path:
+        The journal file
+    gb:
+        The gradebook to write the results to
+    late_penalties:
+        The preprocessor used to assign late penalties, or None to not
+        assign any
+    log:
+        Where to log warnings about incomplete journals
+
+    Returns
+    -------
+    The number of submissions merged
+
+    """
+    submissions = read_journal(path, log)
+    try:
+        for records in submissions:
+            _apply_submission(gb, records, late_penalties)
+        gb.db.commit()
+    except Exception:
+        gb.db.rollback()
+        raise
+
+    os.remove(path)
+    return len(submissions)
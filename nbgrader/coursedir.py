@@ -1,5 +1,10 @@
 import os
 import re
+import stat
+import string
+import threading
+import time
+import typing
 
 from textwrap import dedent
 
@@ -11,6 +16,13 @@ from traitlets.utils.bunch import Bunch
 import datetime
 from typing import Optional
 
+# if a directory (or timestamp file) was modified less than this many seconds
+# before it was scanned, it may change again within the resolution of its
+# mtime without the mtime changing, so it is scanned again next time
+_MTIME_RESOLUTION = 2.0
+
+_snapshot_lock = threading.Lock()
+
 
 class CourseDirectory(LoggingConfigurable):
 
@@ -190,6 +202,125 @@ class CourseDirectory(LoggingConfigurable):
         return "sqlite:///{}".format(
             os.path.abspath(os.path.join(self.root, "gradebook.db")))
 
+    db_sqlite_wal = Bool(
+        False,
+        help=dedent(
+            """
+            Use write-ahead logging (and synchronous=NORMAL) for sqlite
+            databases, so that e.g. the formgrader can keep reading grades
+            while autograde is writing them. The database must be on a local
+            filesystem.
+            """
+        )
+    ).tag(config=True)
+
+    db_busy_timeout = Integer(
+        5000,
+        help=dedent(
+            """
+            How long (in milliseconds) to wait for another process to release
+            its lock on a sqlite database before failing.
+            """
+        )
+    ).tag(config=True)
+
+    db_write_retries = Integer(
+        0,
+        help=dedent(
+            """
+            How many times to retry, with increasing delays, a sqlite
+            statement that failed because the database was locked by another
+            process. Only commits and the first statement of a transaction
+            are retried; a statement in the middle of a transaction fails
+            the whole transaction.
+            """
+        )
+    ).tag(config=True)
+
+    db_pool_size = Integer(
+        None,
+        allow_none=True,
+        help=dedent(
+            """
+            The number of connections to keep open to the database (the
+            SQLAlchemy default if None). Only for database servers, such as
+            PostgreSQL: sqlite files don't pool their connections.
+            """
+        )
+    ).tag(config=True)
+
+    db_max_overflow = Integer(
+        None,
+        allow_none=True,
+        help=dedent(
+            """
+            How many connections can be opened beyond `db_pool_size` when they
+            are all in use (the SQLAlchemy default if None). Only for database
+            servers, such as PostgreSQL.
+            """
+        )
+    ).tag(config=True)
+
+    db_pool_timeout = Integer(
+        None,
+        allow_none=True,
+        help=dedent(
+            """
+            How long (in seconds) to wait for a connection when they are all
+            in use before failing (the SQLAlchemy default if None). Only for
+            database servers, such as PostgreSQL.
+            """
+        )
+    ).tag(config=True)
+
+    db_pool_recycle = Integer(
+        -1,
+        help=dedent(
+            """
+            Reopen database connections that are older than this many seconds,
+            e.g. before the database server closes them. -1 never reopens
+            them.
+            """
+        )
+    ).tag(config=True)
+
+    db_pool_pre_ping = Bool(
+        False,
+        help=dedent(
+            """
+            Check that a database connection is still alive before using it.
+            """
+        )
+    ).tag(config=True)
+
+    db_profile_queries = Bool(
+        False,
+        help=dedent(
+            """
+            Count and time the SQL statements issued by each gradebook method,
+            and log a summary at the end of the command (the formgrader serves
+            it at /formgrader/api/query_stats instead).
+            """
+        )
+    ).tag(config=True)
+
+    @property
+    def db_options(self) -> dict:
+        """The keyword arguments for :class:`~nbgrader.api.Gradebook` that
+        match the database options above."""
+        engine_kwargs = dict(
+            pool_recycle=self.db_pool_recycle,
+            pool_pre_ping=self.db_pool_pre_ping)
+        for name in ("pool_size", "max_overflow", "pool_timeout"):
+            value = getattr(self, "db_" + name)
+            if value is not None:
+                engine_kwargs[name] = value
+        return dict(
+            engine_kwargs=engine_kwargs,
+            sqlite_wal=self.db_sqlite_wal,
+            busy_timeout=self.db_busy_timeout,
+            write_retries=self.db_write_retries,
+            profile_queries=self.db_profile_queries)
 
     root = Unicode(
         '',
@@ -304,3 +435,261 @@ class CourseDirectory(LoggingConfigurable):
                     "Invalid timestamp string: {}".format(timestamp_path))
         else:
             return None
+
+    _snapshot = None  # type: Optional[CourseDirectorySnapshot]
+
+    @property
+    def snapshot(self) -> 'CourseDirectorySnapshot':
+        """The :class:`CourseDirectorySnapshot` of this course directory,
+        shared by everything that uses it."""
+        with _snapshot_lock:
+            if self._snapshot is None:
+                self._snapshot = CourseDirectorySnapshot(self)
+        return self._snapshot
+
+
+class SnapshotEntry(object):
+    """An assignment directory of a course (e.g. ``submitted/foo/ps1``), as
+    of the last time it was scanned."""
+
+    __slots__ = ("path", "notebooks", "timestamp")
+
+    def __init__(self, path: str, notebooks: typing.FrozenSet[str],
+                 timestamp: Optional[datetime.datetime]) -> None:
+        #: The absolute path of the directory
+        self.path = path
+        #: The names (without the .ipynb extension) of its notebooks
+        self.notebooks = notebooks
+        #: The timestamp in its timestamp.txt, or None if there is none
+        self.timestamp = timestamp
+
+
+class CourseDirectorySnapshot(object):
+    """An in-memory index of the assignment directories of a course, for
+    each step (``source``, ``release``, ``submitted``, ``autograded`` or
+    ``feedback``), student and assignment.
+
+    The directories are listed with :func:`os.scandir`, and the index is
+    refreshed by every lookup: a directory (or timestamp.txt) is only listed
+    (or read) again when its mtime has changed, so that a lookup costs one
+    ``stat`` per directory it covers rather than a glob, a stat per notebook
+    and a read per timestamp.
+
+    """
+
+    def __init__(self, coursedir: CourseDirectory) -> None:
+        self.coursedir = coursedir
+        # guards the dictionaries below; it is never held while the file
+        # system is accessed, so lookups from several threads run
+        # concurrently (and may occasionally list a directory twice)
+        self._lock = threading.Lock()
+        # path -> (key, names of the subdirectories)
+        self._listings = {}  # type: typing.Dict[str, typing.Tuple[typing.Any, typing.List[str]]]
+        # path -> (key, entry)
+        self._entries = {}  # type: typing.Dict[str, typing.Tuple[typing.Any, SnapshotEntry]]
+
+    def find(self, step: str, student_id: Optional[str] = None,
+             assignment_id: Optional[str] = None) -> typing.Dict[typing.Tuple[str, str], SnapshotEntry]:
+        """Find the assignment directories of a step.
+
+        Arguments
+        ---------
+        step: string
+            The step, one of ``source``, ``release``, ``submitted``,
+            ``autograded`` or ``feedback``
+        student_id: string
+            (Optional) Only find the directories of this student. The
+            student id of the ``source`` and ``release`` directories is
+            always ``"."``
+        assignment_id: string
+            (Optional) Only find the directories of this assignment
+
+        Returns
+        -------
+        entries: dict
+            The :class:`SnapshotEntry` of every directory, keyed by
+            ``(student_id, assignment_id)``
+
+        """
+        values = dict(nbgrader_step=getattr(self.coursedir, "{}_directory".format(step)))
+        if step in ("source", "release"):
+            student_id = "."
+        if student_id not in (None, "*"):
+            values["student_id"] = student_id
+        if assignment_id not in (None, "*"):
+            values["assignment_id"] = assignment_id
+        base, components = self._compile(values)
+
+        groups = dict((x, values[x]) for x in ("student_id", "assignment_id") if x in values)
+        found = []  # type: typing.List[typing.Tuple[dict, SnapshotEntry]]
+        self._walk(base, components, groups, found, time.time())
+
+        return dict(
+            ((matched.get("student_id"), matched.get("assignment_id")), entry)
+            for matched, entry in found)
+
+    def get(self, step: str, student_id: str, assignment_id: str) -> Optional[SnapshotEntry]:
+        """The :class:`SnapshotEntry` of one assignment directory, or None
+        if it does not exist."""
+        if step in ("source", "release"):
+            student_id = "."
+        entries = self.find(step, student_id=student_id, assignment_id=assignment_id)
+        return entries.get((student_id, assignment_id), None)
+
+    def _compile(self, values: dict) -> typing.Tuple[str, list]:
+        # split the directory structure, like format_path does, into literal
+        # names and patterns matching the names with the unknown ids
+        structure = full_split(self.coursedir.directory_structure)
+        if len(structure) > 0 and structure[0].startswith(os.sep):
+            base, structure = structure[0], structure[1:]
+        else:
+            base = self.coursedir.root
+
+        components = []  # type: typing.List[typing.Union[str, typing.Pattern]]
+        for part in structure:
+            pattern = []
+            literal = True
+            for text, field, _, _ in string.Formatter().parse(part):
+                pattern.append(re.escape(text))
+                if field is None:
+                    continue
+                if field in values:
+                    pattern.append(re.escape(values[field]))
+                elif field in ("student_id", "assignment_id"):
+                    pattern.append("(?P<{}>.+)".format(field))
+                    literal = False
+                else:
+                    raise KeyError(field)
+
+            if not literal:
+                components.append(re.compile("".join(pattern) + r"\Z"))
+            elif part.format(**values) != ".":
+                components.append(part.format(**values))
+
+        return base, components
+
+    def _walk(self, path: str, components: list, groups: dict,
+              found: list, now: float) -> None:
+        if len(components) == 0:
+            entry = self._scan_entry(path, now)
+            if entry is not None:
+                found.append((groups, entry))
+            return
+
+        component, rest = components[0], components[1:]
+        if isinstance(component, str):
+            self._walk(os.path.join(path, component), rest, groups, found, now)
+            return
+
+        for name in self._list(path, now):
+            match = component.match(name)
+            if match is None:
+                continue
+            # an id used more than once in the structure has to match itself
+            matched = dict(groups)
+            if all(matched.setdefault(key, value) == value for key, value in match.groupdict().items()):
+                self._walk(os.path.join(path, name), rest, matched, found, now)
+
+    @staticmethod
+    def _key(now: float, *stats: Optional[os.stat_result]) -> typing.Any:
+        key = []
+        for st in stats:
+            if st is None:
+                key.append(None)
+            elif now - st.st_mtime < _MTIME_RESOLUTION:
+                return None
+            else:
+                key.append((st.st_ino, st.st_mtime_ns))
+        return tuple(key)
+
+    def _list(self, path: str, now: float) -> typing.List[str]:
+        """The names of the (non hidden, like glob) subdirectories of a
+        directory."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISDIR(st.st_mode):
+            with self._lock:
+                if path in self._listings:
+                    self._forget(path)
+            return []
+
+        key = self._key(now, st)
+        with self._lock:
+            cached = self._listings.get(path, None)
+        if key is not None and cached is not None and cached[0] == key:
+            return cached[1]
+
+        try:
+            names = sorted(
+                x.name for x in os.scandir(path)
+                if not x.name.startswith(".") and x.is_dir())
+        except OSError:
+            names = []
+        with self._lock:
+            if cached is not None:
+                for name in set(cached[1]).difference(names):
+                    self._forget(os.path.join(path, name))
+            self._listings[path] = (key, names)
+        return names
+
+    def _scan_entry(self, path: str, now: float) -> Optional[SnapshotEntry]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISDIR(st.st_mode):
+            with self._lock:
+                self._entries.pop(path, None)
+            return None
+
+        timestamp_path = os.path.join(path, "timestamp.txt")
+        try:
+            timestamp_st = os.stat(timestamp_path)  # type: Optional[os.stat_result]
+        except OSError:
+            timestamp_st = None
+
+        key = self._key(now, st, timestamp_st)
+        with self._lock:
+            cached = self._entries.get(path, None)
+        if key is not None and cached is not None and cached[0] == key:
+            return cached[1]
+
+        try:
+            notebooks = frozenset(
+                x.name[:-len(".ipynb")] for x in os.scandir(path)
+                if x.name.endswith(".ipynb") and not x.name.startswith("."))
+        except OSError:
+            notebooks = frozenset()
+        timestamp = None
+        if timestamp_st is not None:
+            timestamp = self._read_timestamp(timestamp_path)
+
+        entry = SnapshotEntry(path, notebooks, timestamp)
+        with self._lock:
+            self._entries[path] = (key, entry)
+        return entry
+
+    def _read_timestamp(self, path: str) -> Optional[datetime.datetime]:
+        try:
+            with open(path, 'r') as fh:
+                timestamp = fh.read().strip()
+        except OSError:
+            return None
+        if not timestamp:
+            self.coursedir.log.warning("Empty timestamp file: {}".format(path))
+            return None
+        try:
+            return parse_utc(timestamp)
+        except ValueError:
+            self.coursedir.log.warning("Invalid timestamp string: {}".format(path))
+            return None
+
+    def _forget(self, path: str) -> None:
+        """Drop a directory, and everything below it, from the index (with
+        the lock held)."""
+        prefix = os.path.join(path, "")
+        for cache in (self._listings, self._entries):
+            for key in [x for x in cache if x == path or x.startswith(prefix)]:
+                del cache[key]
@@ -58,7 +58,7 @@ class ExchangeCollect(Exchange, ABCExchangeCollect):
         records = [self._path_to_record(f) for f in glob.glob(pattern)]
         usergroups = groupby(records, lambda item: item['username'])
 
-        with Gradebook(self.coursedir.db_url, self.coursedir.course_id) as gb:
+        with Gradebook(self.coursedir.db_url, self.coursedir.course_id, **self.coursedir.db_options) as gb:
             try:
                 assignment = gb.find_assignment(self.coursedir.assignment_id)
                 self.duedate = assignment.duedate
@@ -1,9 +1,10 @@
 from .base import BasePlugin
 from .latesubmission import LateSubmissionPlugin
-from .export import ExportPlugin, CsvExportPlugin
+from .export import ExportPlugin, CsvExportPlugin, CellScoresExportPlugin
 from .zipcollect import ExtractorPlugin, FileNameCollectorPlugin
 
 __all__ = [
+    "CellScoresExportPlugin",
     "CsvExportPlugin",
     "ExportPlugin",
     "ExtractorPlugin",
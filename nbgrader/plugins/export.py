@@ -1,7 +1,37 @@
-from traitlets import Unicode, List
+import csv
+import itertools
+import typing
+
+from sqlalchemy import and_, or_, func, select, true, union
+from textwrap import dedent
+from traitlets import Unicode, List, Integer
 
 from .base import BasePlugin
-from ..api import MissingEntry, Gradebook
+from ..api import (Gradebook, Assignment, Notebook, BaseCell, GradeCell,
+                   TaskCell, Student, SubmittedAssignment, SubmittedNotebook,
+                   Grade, Comment, change_log)
+
+
+#: The keys of the records returned by :func:`ExportPlugin.records`, for each
+#: level of detail
+RECORD_KEYS = {
+    "assignment": [
+        "assignment", "duedate", "timestamp", "student_id", "last_name",
+        "first_name", "email", "lms_user_id", "submitted", "raw_score",
+        "late_submission_penalty", "score", "max_score"
+    ],
+    "notebook": [
+        "assignment", "duedate", "notebook", "timestamp", "student_id",
+        "last_name", "first_name", "email", "lms_user_id", "submitted",
+        "raw_score", "late_submission_penalty", "score", "max_score"
+    ],
+    "cell": [
+        "assignment", "duedate", "notebook", "cell", "cell_type", "timestamp",
+        "student_id", "last_name", "first_name", "email", "lms_user_id",
+        "submitted", "auto_score", "manual_score", "extra_credit", "score",
+        "max_score", "needs_manual_grade"
+    ],
+}
 
 
 class ExportPlugin(BasePlugin):
@@ -15,6 +45,17 @@ class ExportPlugin(BasePlugin):
     assignment = List(
         [], help="list of assignments to export").tag(config=True)
 
+    since = Integer(
+        None, allow_none=True,
+        help=dedent(
+            """
+            Only export the submissions that changed after this point in the
+            change log of the database (see Gradebook.changes_since). The
+            latest point is logged after each export.
+            """
+        )
+    ).tag(config=True)
+
     def export(self, gradebook: Gradebook) -> None:
         """Export grades to another format.
 
@@ -31,6 +72,199 @@ class ExportPlugin(BasePlugin):
         """
         raise NotImplementedError
 
+    def records(self, gradebook: Gradebook, level: str = "assignment") -> typing.Iterator[dict]:
+        """Iterate over the grades to export, as flat dictionaries. There is
+        one record for every student and every assignment, notebook or graded
+        cell (depending on ``level``), restricted to the students and
+        assignments given by ``self.student`` and ``self.assignment``.
+
+        The records are computed by a single query and streamed, so this
+        should be preferred over walking through the gradebook's objects.
+        Students who did not submit an assignment have ``submitted`` set to
+        False and scores of zero. See ``RECORD_KEYS`` for the keys of each
+        level.
+
+        Arguments
+        ---------
+        gradebook:
+            An instance of the gradebook
+        level:
+            Either "assignment", "notebook" or "cell"
+
+        """
+        if level == "assignment":
+            query, max_scores = self._assignment_query(gradebook)
+        elif level == "notebook":
+            query, max_scores = self._notebook_query(gradebook)
+        elif level == "cell":
+            query, max_scores = self._cell_query(gradebook)
+        else:
+            raise ValueError("Invalid level: {}".format(level))
+
+        if self.since is not None:
+            query = query.filter(SubmittedAssignment.id.in_(self._changed_submissions()))
+
+        # make sure the student and assignment ids are strings
+        if self.assignment:
+            query = query.filter(Assignment.name.in_([str(x) for x in self.assignment]))
+        if self.student:
+            query = query.filter(Student.id.in_([str(x) for x in self.student]))
+
+        # the first two columns of the query are the max score (or the id of
+        # the item to look it up with) and the id of the submission, if any
+        computed = ["submitted", "max_score"]
+        if level != "cell":
+            computed.append("score")
+        keys = [key for key in RECORD_KEYS[level] if key not in computed]
+
+        for row in query.yield_per(1000):
+            record = dict(zip(keys, row[2:]))
+            record["max_score"] = row[0] if max_scores is None else max_scores[row[0]]
+            record["submitted"] = row[1] is not None
+
+            # students who didn't submit anything get a score of zero
+            if not record["submitted"]:
+                record["timestamp"] = None
+                record["score"] = 0.0
+                if level == "cell":
+                    record["needs_manual_grade"] = False
+                else:
+                    record["raw_score"] = record["late_submission_penalty"] = 0.0
+            elif level != "cell":
+                record["score"] = max(0.0, record["raw_score"] - record["late_submission_penalty"])
+            yield record
+
+    def _changed_submissions(self) -> typing.Any:
+        # the ids of the submitted assignments with changes since self.since
+        def changed(table_name: str) -> typing.Any:
+            return and_(
+                change_log.c.seq > self.since,
+                change_log.c.table_name == table_name)
+
+        return union(
+            select([SubmittedNotebook.assignment_id]).where(and_(
+                changed("grade"),
+                change_log.c.row_id == Grade.id,
+                Grade.notebook_id == SubmittedNotebook.id)),
+            select([SubmittedNotebook.assignment_id]).where(and_(
+                changed("comment"),
+                change_log.c.row_id == Comment.id,
+                Comment.notebook_id == SubmittedNotebook.id)),
+            select([SubmittedNotebook.assignment_id]).where(and_(
+                changed("submitted_notebook"),
+                change_log.c.row_id == SubmittedNotebook.id)),
+            select([change_log.c.row_id]).where(changed("submitted_assignment")))
+
+    def _student_query(self, gradebook: Gradebook, first: typing.List[typing.Any],
+                       last: typing.List[typing.Any], items: typing.Any) -> typing.Any:
+        # every item (assignment, notebook or cell) with every student
+        return gradebook.db.query(
+            *first,
+            Student.id, Student.last_name, Student.first_name, Student.email,
+            Student.lms_user_id,
+            *last
+        ).select_from(items.join(Student.__table__, true()))\
+         .outerjoin(SubmittedAssignment, and_(
+             SubmittedAssignment.assignment_id == Assignment.id,
+             SubmittedAssignment.student_id == Student.id))
+
+    def _assignment_query(self, gradebook: Gradebook) -> typing.Tuple[typing.Any, dict]:
+        # subquery the scores and the late penalties of the submissions
+        scores = gradebook.db.query(
+            SubmittedAssignment.id,
+            func.sum(Grade.score).label("score")
+        ).join(SubmittedNotebook, SubmittedNotebook.assignment_id == SubmittedAssignment.id)\
+         .join(Grade, Grade.notebook_id == SubmittedNotebook.id)\
+         .group_by(SubmittedAssignment.id)\
+         .subquery()
+        penalties = gradebook.db.query(
+            SubmittedAssignment.id,
+            func.sum(SubmittedNotebook.late_submission_penalty).label("penalty")
+        ).join(SubmittedNotebook, SubmittedNotebook.assignment_id == SubmittedAssignment.id)\
+         .group_by(SubmittedAssignment.id)\
+         .subquery()
+
+        # there are few assignments, so their max scores are looked up once
+        max_scores = dict(gradebook.db.query(Assignment.id, Assignment.max_score))
+
+        query = self._student_query(
+            gradebook,
+            [Assignment.id, SubmittedAssignment.id, Assignment.name,
+             Assignment.duedate, SubmittedAssignment.timestamp],
+            [func.coalesce(scores.c.score, 0.0),
+             func.coalesce(penalties.c.penalty, 0.0)],
+            Assignment.__table__)\
+            .outerjoin(scores, scores.c.id == SubmittedAssignment.id)\
+            .outerjoin(penalties, penalties.c.id == SubmittedAssignment.id)\
+            .order_by(
+                Assignment.duedate, Assignment.name,
+                Student.last_name, Student.first_name, Student.id)
+        return query, max_scores
+
+    def _notebook_query(self, gradebook: Gradebook) -> typing.Tuple[typing.Any, dict]:
+        # subquery the scores of the submissions
+        scores = gradebook.db.query(
+            SubmittedNotebook.id,
+            func.sum(Grade.score).label("score")
+        ).join(Grade, Grade.notebook_id == SubmittedNotebook.id)\
+         .group_by(SubmittedNotebook.id)\
+         .subquery()
+
+        # there are few notebooks, so their max scores are looked up once
+        max_scores = dict(gradebook.db.query(Notebook.id, Notebook.max_score))
+
+        items = Assignment.__table__.join(
+            Notebook.__table__, Notebook.assignment_id == Assignment.id)
+        query = self._student_query(
+            gradebook,
+            [Notebook.id, SubmittedNotebook.id, Assignment.name,
+             Assignment.duedate, Notebook.name, SubmittedAssignment.timestamp],
+            [func.coalesce(scores.c.score, 0.0),
+             func.coalesce(SubmittedNotebook.late_submission_penalty, 0.0)],
+            items)\
+            .outerjoin(SubmittedNotebook, and_(
+                SubmittedNotebook.assignment_id == SubmittedAssignment.id,
+                SubmittedNotebook.notebook_id == Notebook.id))\
+            .outerjoin(scores, scores.c.id == SubmittedNotebook.id)\
+            .order_by(
+                Assignment.duedate, Assignment.name, Notebook.name,
+                Student.last_name, Student.first_name, Student.id)
+        return query, max_scores
+
+    def _cell_query(self, gradebook: Gradebook) -> typing.Tuple[typing.Any, None]:
+        grade_cells = GradeCell.__table__
+        task_cells = TaskCell.__table__
+        base_cells = BaseCell.__table__
+
+        # the graded cells of each notebook
+        items = Assignment.__table__\
+            .join(Notebook.__table__, Notebook.assignment_id == Assignment.id)\
+            .join(base_cells, base_cells.c.notebook_id == Notebook.id)\
+            .outerjoin(grade_cells, grade_cells.c.id == base_cells.c.id)\
+            .outerjoin(task_cells, task_cells.c.id == base_cells.c.id)
+        query = self._student_query(
+            gradebook,
+            [func.coalesce(grade_cells.c.max_score, task_cells.c.max_score),
+             Grade.id, Assignment.name, Assignment.duedate, Notebook.name,
+             base_cells.c.name,
+             func.coalesce(grade_cells.c.cell_type, task_cells.c.cell_type),
+             SubmittedAssignment.timestamp],
+            [Grade.auto_score, Grade.manual_score, Grade.extra_credit,
+             Grade.score, Grade.needs_manual_grade],
+            items)\
+            .outerjoin(SubmittedNotebook, and_(
+                SubmittedNotebook.assignment_id == SubmittedAssignment.id,
+                SubmittedNotebook.notebook_id == Notebook.id))\
+            .outerjoin(Grade, and_(
+                Grade.notebook_id == SubmittedNotebook.id,
+                Grade.cell_id == base_cells.c.id))\
+            .filter(or_(grade_cells.c.id != None, task_cells.c.id != None))\
+            .order_by(
+                Assignment.duedate, Assignment.name, Notebook.name,
+                base_cells.c.name, Student.last_name, Student.first_name,
+                Student.id)
+        return query, None
+
 
 class CsvExportPlugin(ExportPlugin):
     """CSV exporter plugin."""
@@ -41,26 +275,13 @@ class CsvExportPlugin(ExportPlugin):
         else:
             dest = self.to
 
-        if len(self.student) == 0:
-            allstudents = []
-        else:
-            # make sure studentID(s) are a list of strings
-            allstudents = [str(item) for item in self.student]
-
-        if len(self.assignment) == 0:
-            allassignments = []
-        else:
-            # make sure assignment(s) are a list of strings
-            allassignments = [str(item) for item in self.assignment]
-
         self.log.info("Exporting grades to %s", dest)
-        if allassignments:
-            self.log.info("Exporting only assignments: %s", allassignments)
+        if self.assignment:
+            self.log.info("Exporting only assignments: %s", [str(x) for x in self.assignment])
 
-        if allstudents:
-            self.log.info("Exporting only students: %s", allstudents)
+        if self.student:
+            self.log.info("Exporting only students: %s", [str(x) for x in self.student])
 
-        fh = open(dest, "w")
         keys = [
             "assignment",
             "duedate",
@@ -74,59 +295,117 @@ class CsvExportPlugin(ExportPlugin):
             "score",
             "max_score"
         ]
-        fh.write(",".join(keys) + "\n")
-        fmt = ",".join(["{" + x + "}" for x in keys]) + "\n"
-
-        # Loop over each assignment in the database
-        for assignment in gradebook.assignments:
-
-            # only continue if assignment is required
-            if allassignments and assignment.name not in allassignments:
-                continue
-
-            # Loop over each student in the database
-            for student in gradebook.students:
-
-                # only continue if student is required
-                if allstudents and student.id not in allstudents:
-                    continue
-
-                # Create a dictionary that will store information 
-                # about this student's submitted assignment
-                score = {}
-                score['assignment'] = assignment.name
-                score['duedate'] = assignment.duedate
-                score['student_id'] = student.id
-                score['last_name'] = student.last_name
-                score['first_name'] = student.first_name
-                score['email'] = student.email
-                score['max_score'] = assignment.max_score
-
-                # Try to find the submission in the database. If it
-                # doesn't exist, the `MissingEntry` exception will be
-                # raised, which means the student didn't submit 
-                # anything, so we assign them a score of zero.
-                try:
-                    submission = gradebook.find_submission(
-                        assignment.name, student.id)
-                except MissingEntry:
-                    score['timestamp'] = ''
-                    score['raw_score'] = 0.0
-                    score['late_submission_penalty'] = 0.0
-                    score['score'] = 0.0
-                else:
-                    penalty = submission.late_submission_penalty
-                    score['timestamp'] = submission.timestamp
-                    score['raw_score'] = submission.score
-                    score['late_submission_penalty'] = penalty
-                    score['score'] = max(0.0, submission.score - penalty)
+        with open(dest, "w", newline="") as fh:
+            writer = csv.DictWriter(fh, keys, extrasaction="ignore", lineterminator="\n")
+            writer.writeheader()
+            for record in self.records(gradebook, "assignment"):
+                writer.writerow(record)
+
+
+class CellScoresExportPlugin(ExportPlugin):
+    """Exporter of the scores of every student in every graded cell, as a
+    wide table with one row per student and one column per cell (named
+    ``assignment/notebook/cell``). Cells of notebooks that a student did not
+    submit are left empty.
+
+    The table is written to a Parquet file if the destination ends with
+    ``.parquet`` (which requires pyarrow), and to a CSV file otherwise.
+
+    """
+
+    batch_size = Integer(
+        1000, help="The number of students written to a Parquet file at once"
+    ).tag(config=True)
+
+    def export(self, gradebook: Gradebook) -> None:
+        if self.to == "":
+            dest = "cell_scores.csv"
+        else:
+            dest = self.to
+
+        self.log.info("Exporting cell scores to %s", dest)
+        cells = self._cells(gradebook)
+        header = ["student_id", "last_name", "first_name", "email"]
+        header.extend("/".join(cell[1:]) for cell in cells)
+        rows = self._rows(gradebook, [cell[0] for cell in cells])
+
+        if dest.endswith(".parquet"):
+            self._write_parquet(dest, header, rows)
+        else:
+            with open(dest, "w", newline="") as fh:
+                writer = csv.writer(fh, lineterminator="\n")
+                writer.writerow(header)
+                writer.writerows(rows)
+
+    def _cells(self, gradebook: Gradebook) -> typing.List[tuple]:
+        # the graded cells, which are the columns of the table
+        grade_cells = GradeCell.__table__
+        task_cells = TaskCell.__table__
+        query = gradebook.db.query(BaseCell.id, Assignment.name, Notebook.name, BaseCell.name)\
+            .join(Notebook, Notebook.id == BaseCell.notebook_id)\
+            .join(Assignment, Assignment.id == Notebook.assignment_id)\
+            .outerjoin(grade_cells, grade_cells.c.id == BaseCell.id)\
+            .outerjoin(task_cells, task_cells.c.id == BaseCell.id)\
+            .filter(or_(grade_cells.c.id != None, task_cells.c.id != None))
+        if self.assignment:
+            query = query.filter(Assignment.name.in_([str(x) for x in self.assignment]))
+        return query.order_by(Assignment.duedate, Assignment.name, Notebook.name, BaseCell.name).all()
+
+    def _rows(self, gradebook: Gradebook, cell_ids: typing.List[str]) -> typing.Iterator[list]:
+        columns = {cell_id: i for i, cell_id in enumerate(cell_ids)}
+
+        grades = gradebook.db.query(
+            SubmittedAssignment.student_id.label("student_id"),
+            Grade.cell_id.label("cell_id"),
+            Grade.score.label("score")
+        ).join(SubmittedNotebook, SubmittedNotebook.id == Grade.notebook_id)\
+         .join(SubmittedAssignment, SubmittedAssignment.id == SubmittedNotebook.assignment_id)\
+         .join(Assignment, Assignment.id == SubmittedAssignment.assignment_id)
+        if self.assignment:
+            grades = grades.filter(Assignment.name.in_([str(x) for x in self.assignment]))
+        grades = grades.subquery()
+
+        # the grades of every student, sorted by student so that the rows of
+        # the table can be built one at a time
+        query = gradebook.db.query(
+            Student.id, Student.last_name, Student.first_name, Student.email,
+            grades.c.cell_id, grades.c.score
+        ).outerjoin(grades, grades.c.student_id == Student.id)
+        if self.student:
+            query = query.filter(Student.id.in_([str(x) for x in self.student]))
+        if self.since is not None:
+            query = query.filter(Student.id.in_(
+                select([SubmittedAssignment.student_id])
+                .where(SubmittedAssignment.id.in_(self._changed_submissions()))))
+        query = query.order_by(Student.id)
+
+        rows = query.yield_per(1000)
+        for student, student_rows in itertools.groupby(rows, key=lambda row: row[:4]):
+            scores = [None] * len(cell_ids)
+            for row in student_rows:
+                if row[4] in columns:
+                    scores[columns[row[4]]] = row[5]
+            yield list(student) + scores
+
+    def _write_parquet(self, dest: str, header: typing.List[str], rows: typing.Iterator[list]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
 
-                for key in score:
-                    if score[key] is None:
-                        score[key] = ''
-                    if not isinstance(score[key], str):
-                        score[key] = str(score[key])
+        schema = pa.schema(
+            [pa.field(name, pa.string()) for name in header[:4]] +
+            [pa.field(name, pa.float64()) for name in header[4:]])
 
-                fh.write(fmt.format(**score))
+        def write_batch(writer: typing.Any, batch: typing.List[list]) -> None:
+            columns = [pa.array(list(column), type=field.type)
+                       for column, field in zip(zip(*batch), schema)]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
 
-        fh.close()
+        with pq.ParquetWriter(dest, schema) as writer:
+            batch = []  # type: typing.List[list]
+            for row in rows:
+                batch.append(row)
+                if len(batch) == self.batch_size:
+                    write_batch(writer, batch)
+                    batch = []
+            if batch:
+                write_batch(writer, batch)
@@ -0,0 +1,126 @@
+"""Fork server used by :class:`nbgrader.preprocessors.zygote.ZygoteKernelManager`.
+
+This file is run as a script by the kernel's Python interpreter, which may
+not have nbgrader installed, so it only depends on the standard library and
+ipykernel.
+
+Usage: python _zygote_server.py SOCKET_PATH [MODULE ...]
+
+"""
+import sys
+
+# this file is run as a script, don't let the other modules in this
+# directory shadow anything the kernels import
+del sys.path[0]
+
+import importlib
+import json
+import os
+import socket
+import traceback
+
+
+def run_kernel(request):
+    """Run an IPython kernel in a freshly forked child. Never returns."""
+    status = 1
+    try:
+        # give the kernel its own process group, like jupyter_client does, so
+        # that interrupting or killing it does not affect the server
+        os.setsid()
+
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+
+        # don't let every kernel share the random state of the template
+        if "numpy.random" in sys.modules:
+            sys.modules["numpy.random"].seed()
+
+        from ipykernel import kernelapp
+        sys.argv = ["ipykernel_launcher"] + request["argv"]
+        kernelapp.launch_new_instance(argv=request["argv"])
+        status = 0
+    except SystemExit as e:
+        status = e.code if isinstance(e.code, int) else 0
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(status)
+
+
+def returncode(status):
+    """Convert a wait status to a return code, like ``Popen.returncode``."""
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def reap(exited, pid=-1):
+    """Reap exited kernels (or only the kernel ``pid``), and record their
+    return codes in ``exited``."""
+    while True:
+        try:
+            child, status = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if child == 0:
+            return
+        exited[child] = returncode(status)
+        if pid != -1:
+            return
+
+
+def main(socket_path, modules):
+    parent = os.getppid()
+
+    for name in modules:
+        importlib.import_module(name)
+    from ipykernel import kernelapp  # noqa: F401
+
+    # the kernels are children of this process, so it reaps them and keeps
+    # their return codes until the client asks for them
+    exited = {}
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(16)
+    server.settimeout(1)
+
+    while os.getppid() == parent:
+        reap(exited)
+        try:
+            conn, _ = server.accept()
+        except socket.timeout:
+            continue
+
+        with conn:
+            conn.settimeout(None)
+            request = json.loads(conn.makefile("rb").readline().decode("utf-8"))
+            if request["command"] == "exit":
+                break
+
+            if request["command"] == "poll":
+                pid = request["pid"]
+                if pid not in exited:
+                    reap(exited, pid)
+                reply = {"returncode": exited.pop(pid, None)}
+
+            else:
+                pid = None
+                if request["command"] == "fork":
+                    pid = os.fork()
+                    if pid == 0:
+                        conn.close()
+                        server.close()
+                        run_kernel(request)
+                reply = {"pid": pid}
+
+            conn.sendall(json.dumps(reply).encode("utf-8") + b"\n")
+
+    server.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], sys.argv[2:])
@@ -1,8 +1,31 @@
+from contextlib import contextmanager
 from nbconvert.preprocessors import Preprocessor
+from nbconvert.exporters.exporter import ResourcesDict
 from traitlets import List, Unicode, Bool
+from typing import Iterator
+
+from ..api import Gradebook
 
 class NbGraderPreprocessor(Preprocessor):
 
     default_language = Unicode('ipython')
     display_data_priority = List(['text/html', 'application/pdf', 'text/latex', 'image/svg+xml', 'image/png', 'image/jpeg', 'text/plain'])
     enabled = Bool(True, help="Whether to use this preprocessor when running nbgrader").tag(config=True)
+
+    @contextmanager
+    def open_gradebook(self, resources: ResourcesDict) -> Iterator[Gradebook]:
+        """Get a gradebook for the notebook being processed.
+
+        If the converter shares a gradebook between preprocessors (in
+        ``resources['nbgrader']['gradebook']``), that gradebook is used and
+        left open. Otherwise a new gradebook is opened for ``db_url`` and
+        closed afterwards.
+
+        """
+        gradebook = resources['nbgrader'].get('gradebook', None)
+        if gradebook is not None:
+            yield gradebook
+        else:
+            db_options = resources['nbgrader'].get('db_options', {})
+            with Gradebook(resources['nbgrader']['db_url'], **db_options) as gradebook:
+                yield gradebook
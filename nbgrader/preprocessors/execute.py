@@ -1,11 +1,15 @@
 from nbconvert.preprocessors import ExecutePreprocessor
-from traitlets import Bool, List, Integer
+from traitlets import Bool, List, Integer, Unicode
 from textwrap import dedent
 
 from . import NbGraderPreprocessor
+from .kernelpool import get_kernel_pool
 from nbconvert.exporters.exporter import ResourcesDict
 from nbformat.notebooknode import NotebookNode
-from typing import Any, Optional, Tuple
+from contextlib import contextmanager
+from jupyter_client import KernelManager
+from jupyter_client.client import KernelClient
+from typing import Any, Iterator, Optional, Tuple
 
 
 class UnresponsiveKernelError(Exception):
@@ -14,6 +18,8 @@ class UnresponsiveKernelError(Exception):
 
 class Execute(NbGraderPreprocessor, ExecutePreprocessor):
 
+    _pooled = False
+
     interrupt_on_timeout = Bool(True)
     allow_errors = Bool(True)
     raise_on_iopub_timeout = Bool(True)
@@ -33,11 +39,67 @@ class Execute(NbGraderPreprocessor, ExecutePreprocessor):
         """)
     ).tag(config=True)
 
+    kernel_pool_size = Integer(0, help=dedent(
+        """
+        The number of kernels to start ahead of time, so that notebooks do not
+        have to wait for their kernel to start up. Each notebook is still
+        executed in a fresh kernel, which is shut down afterwards. Only Python
+        kernels are pooled. Set to 0 (the default) to disable the pool.
+        """)
+    ).tag(config=True)
+
+    kernel_pool_preamble = Unicode('', help=dedent(
+        """
+        Code to run in pooled kernels right after they start, for example
+        ``import numpy, pandas`` to import slow libraries before the kernel is
+        handed to a notebook. Only used when ``kernel_pool_size`` is
+        positive. The preamble does not produce output or affect the
+        execution count of the notebook, and runs in a namespace of its
+        own: modules it imports are loaded, but the names it defines are
+        not visible to the notebook.
+        """)
+    ).tag(config=True)
+
+    def _acquire_pooled_kernel(self, kernel_name: str, resources: ResourcesDict) -> Optional[KernelManager]:
+        pool = get_kernel_pool(
+            kernel_name, self.extra_arguments,
+            kernel_manager_class=self.kernel_manager_class,
+            kernel_config=self.config,
+            size=self.kernel_pool_size,
+            preamble=self.kernel_pool_preamble,
+            startup_timeout=self.startup_timeout,
+            log=self.log)
+        if not pool.supported:
+            return None
+        path = resources.get('metadata', {}).get('path', '') or None
+        return pool.acquire(path)
+
+    @contextmanager
+    def setup_preprocessor(self, nb: NotebookNode, resources: ResourcesDict, km: Optional[KernelManager] = None, **kwargs: Any) -> Iterator[Tuple[NotebookNode, KernelManager, KernelClient]]:
+        # pooled kernels are only used once, so they are shut down here
+        # rather than handed back to the caller
+        try:
+            with super(Execute, self).setup_preprocessor(nb, resources, km=km, **kwargs) as (nb, km, kc):
+                try:
+                    yield nb, km, kc
+                finally:
+                    if self._pooled:
+                        kc.stop_channels()
+        finally:
+            if self._pooled:
+                km.shutdown_kernel(now=self.shutdown_kernel == 'immediate')
+
     def preprocess(self,
                    nb: NotebookNode,
                    resources: ResourcesDict,
                    retries: Optional[Any] = None
                    ) -> Tuple[NotebookNode, ResourcesDict]:
+        # ExecutePreprocessor fills in the kernel name and arguments while
+        # running; restore them afterwards, so that the same instance can
+        # execute several notebooks
+        configured_kernel_name = self.kernel_name
+        configured_extra_arguments = list(self.extra_arguments)
+
         kernel_name = nb.metadata.get('kernelspec', {}).get('name', 'python')
         if self.extra_arguments == [] and kernel_name == "python":
             self.extra_arguments = ["--HistoryManager.hist_file=:memory:"]
@@ -46,12 +108,21 @@ class Execute(NbGraderPreprocessor, ExecutePreprocessor):
             retries = self.execute_retries
 
         try:
-            output = super(Execute, self).preprocess(nb, resources)
+            km = None
+            if self.kernel_pool_size > 0:
+                km = self._acquire_pooled_kernel(self.kernel_name or kernel_name, resources)
+            self._pooled = km is not None
+            output = super(Execute, self).preprocess(nb, resources, km=km)
         except RuntimeError:
             if retries == 0:
                 raise UnresponsiveKernelError()
             else:
                 self.log.warning("Failed to execute notebook, trying again...")
+                self.kernel_name = configured_kernel_name
+                self.extra_arguments = configured_extra_arguments
                 return self.preprocess(nb, resources, retries=retries - 1)
+        finally:
+            self.kernel_name = configured_kernel_name
+            self.extra_arguments = configured_extra_arguments
 
         return output
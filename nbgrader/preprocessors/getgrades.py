@@ -5,7 +5,6 @@ from nbformat.notebooknode import NotebookNode
 from typing import Optional, Any, Tuple
 
 from .. import utils
-from ..api import Gradebook
 from . import NbGraderPreprocessor
 
 
@@ -25,9 +24,7 @@ class GetGrades(NbGraderPreprocessor):
         self.db_url = resources['nbgrader']['db_url']
 
         # connect to the database
-        self.gradebook = Gradebook(self.db_url)
-
-        with self.gradebook:
+        with self.open_gradebook(resources) as self.gradebook:
             # process the cells
             nb, resources = super(GetGrades, self).preprocess(nb, resources)
             notebook = self.gradebook.find_submission_notebook(
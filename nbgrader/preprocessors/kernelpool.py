@@ -0,0 +1,198 @@
+import os
+import multiprocessing.util
+
+from collections import deque
+from queue import Empty
+from time import monotonic
+from textwrap import dedent
+from traitlets import Dict, Float, Instance, Integer, List, Type, Unicode
+from traitlets.config import Config, LoggingConfigurable
+from jupyter_client import KernelManager
+from jupyter_client.client import KernelClient
+from typing import Any, Deque, Dict as TDict, Optional, Tuple
+
+
+# the preamble runs in a namespace of its own, so that the names it defines
+# (e.g. the modules it imports) are not visible to the notebook
+_PREAMBLE_TEMPLATE = "exec(compile(get_ipython().transform_cell({!r}), '<preamble>', 'exec'), {{}})"
+
+
+class _PooledKernel(object):
+    """A kernel that has been launched by a :class:`KernelPool` but not yet
+    handed out."""
+
+    def __init__(self, km: KernelManager, kc: KernelClient, preamble_id: Optional[str]) -> None:
+        self.km = km
+        self.kc = kc
+        self.preamble_id = preamble_id
+
+
+class KernelPool(LoggingConfigurable):
+    """A pool of pre-started kernels for a single kernelspec.
+
+    Kernels are launched ahead of time (and optionally run a warm-up
+    preamble) so that by the time a notebook needs one, the kernel has
+    already finished starting up. Every kernel is used for exactly one
+    notebook: once handed out by :meth:`acquire`, the caller owns it and
+    must shut it down, so no state leaks between submissions.
+
+    Only Python kernels can be pooled, because the kernel's working
+    directory is changed to the notebook's directory when it is handed out.
+
+    """
+
+    kernel_name = Unicode()
+    kernel_manager_class = Type(KernelManager)
+    extra_arguments = List([])
+    kernel_config = Instance(Config, allow_none=True)
+    size = Integer(1)
+    preamble = Unicode('')
+    startup_timeout = Float(60)
+
+    stats = Dict(help=dedent(
+        """
+        Statistics about the pool: the number of ``hits`` (a pre-started
+        kernel was available), ``misses`` (a kernel had to be started on
+        demand), and the total and maximum number of seconds spent waiting
+        for kernels to become ready (``wait_total`` and ``wait_max``).
+        """
+    ))
+
+    def __init__(self, **kwargs: Any) -> None:
+        super(KernelPool, self).__init__(**kwargs)
+        self._idle = deque()  # type: Deque[_PooledKernel]
+        self.stats = {"hits": 0, "misses": 0, "wait_total": 0.0, "wait_max": 0.0}
+        self._supported = None  # type: Optional[bool]
+
+    @property
+    def supported(self) -> bool:
+        """Whether kernels of this kernelspec can be pooled."""
+        if self._supported is None:
+            km = self.kernel_manager_class(kernel_name=self.kernel_name, config=self.kernel_config)
+            self._supported = km.kernel_spec.language.lower() == "python"
+        return self._supported
+
+    def _launch(self) -> _PooledKernel:
+        km = self.kernel_manager_class(kernel_name=self.kernel_name, config=self.kernel_config)
+        km.start_kernel(extra_arguments=self.extra_arguments)
+        kc = km.client()
+        kc.start_channels()
+        kc.allow_stdin = False
+
+        # queue the preamble straight away, so that it runs as soon as the
+        # kernel has started rather than when the kernel is handed out
+        preamble_id = None
+        if self.preamble:
+            preamble_id = kc.execute(
+                _PREAMBLE_TEMPLATE.format(self.preamble), silent=True, store_history=False)
+
+        return _PooledKernel(km, kc, preamble_id)
+
+    def _fill(self) -> None:
+        while len(self._idle) < self.size:
+            self._idle.append(self._launch())
+
+    def _wait_for_reply(self, kc: KernelClient, msg_id: str, deadline: float) -> dict:
+        while True:
+            timeout = deadline - monotonic()
+            if timeout <= 0:
+                raise RuntimeError("Kernel didn't respond in %d seconds" % self.startup_timeout)
+            try:
+                msg = kc.get_shell_msg(timeout=timeout)
+            except Empty:
+                continue
+            if msg['parent_header'].get('msg_id') == msg_id:
+                return msg
+
+    def _prepare(self, kernel: _PooledKernel, path: Optional[str]) -> None:
+        deadline = monotonic() + self.startup_timeout
+        if kernel.preamble_id is not None:
+            reply = self._wait_for_reply(kernel.kc, kernel.preamble_id, deadline)
+            if reply['content']['status'] != 'ok':
+                self.log.warning(
+                    "Kernel preamble failed: %s: %s",
+                    reply['content'].get('ename'), reply['content'].get('evalue'))
+        else:
+            kernel.kc.wait_for_ready(timeout=self.startup_timeout)
+
+        if path:
+            msg_id = kernel.kc.execute(
+                "__import__('os').chdir({!r})".format(os.path.abspath(path)),
+                silent=True, store_history=False)
+            reply = self._wait_for_reply(kernel.kc, msg_id, deadline)
+            if reply['content']['status'] != 'ok':
+                raise RuntimeError("Could not change the kernel's working directory to {}".format(path))
+
+    def acquire(self, path: Optional[str] = None) -> KernelManager:
+        """Return the manager of a started kernel whose working directory
+        is ``path``. The caller is responsible for shutting it down."""
+        if self._idle:
+            self.stats["hits"] += 1
+            kernel = self._idle.popleft()
+        else:
+            self.stats["misses"] += 1
+            kernel = self._launch()
+
+        # replace the kernel we just took, so it can start up while the
+        # current notebook is running
+        self._fill()
+
+        start = monotonic()
+        try:
+            self._prepare(kernel, path)
+        except Exception:
+            kernel.kc.stop_channels()
+            kernel.km.shutdown_kernel(now=True)
+            raise
+        finally:
+            wait = monotonic() - start
+            self.stats["wait_total"] += wait
+            self.stats["wait_max"] = max(self.stats["wait_max"], wait)
+
+        kernel.kc.stop_channels()
+        return kernel.km
+
+    def shutdown(self) -> None:
+        """Shut down all idle kernels."""
+        while self._idle:
+            kernel = self._idle.popleft()
+            kernel.kc.stop_channels()
+            kernel.km.shutdown_kernel(now=True)
+
+        acquired = self.stats["hits"] + self.stats["misses"]
+        if acquired > 0:
+            self.log.info(
+                "Kernel pool '%s': %d hits, %d misses, %.2fs average wait, %.2fs maximum wait",
+                self.kernel_name, self.stats["hits"], self.stats["misses"],
+                self.stats["wait_total"] / acquired, self.stats["wait_max"])
+
+
+# pools are owned by the process that created them; forked children (see
+# BaseConverter.jobs) start with an empty registry
+_pools = {}  # type: TDict[Tuple[str, Tuple[str, ...]], KernelPool]
+_pools_pid = None  # type: Optional[int]
+
+
+def get_kernel_pool(kernel_name: str, extra_arguments: list, **kwargs: Any) -> KernelPool:
+    """Get (creating it if necessary) the kernel pool of the current process
+    for the given kernel name and kernel arguments."""
+    global _pools, _pools_pid
+    if _pools_pid != os.getpid():
+        _pools = {}
+        _pools_pid = os.getpid()
+        # unlike atexit, this also runs when multiprocessing workers exit
+        multiprocessing.util.Finalize(None, shutdown_kernel_pools, exitpriority=10)
+
+    key = (kernel_name, tuple(extra_arguments))
+    if key not in _pools:
+        _pools[key] = KernelPool(kernel_name=kernel_name, extra_arguments=list(extra_arguments), **kwargs)
+    return _pools[key]
+
+
+def shutdown_kernel_pools() -> None:
+    """Shut down the idle kernels of every pool owned by this process."""
+    if _pools_pid != os.getpid():
+        return
+    while _pools:
+        _, pool = _pools.popitem()
+        pool.shutdown()
@@ -36,6 +36,31 @@ class AssignLatePenalties(NbGraderPreprocessor):
 
         return penalty
 
+    def assign_late_penalty(self, gradebook: Gradebook, notebook_id: str, assignment_id: str, student_id: str) -> None:
+        """Assign the late penalty of a submitted notebook, without committing
+        it to the database."""
+        assignment = gradebook.find_submission(assignment_id, student_id)
+        notebook = gradebook.find_submission_notebook(notebook_id, assignment_id, student_id)
+
+        # make sure the score is up to date with any pending grade changes
+        gradebook.db.flush()
+        gradebook.db.expire(notebook)
+
+        # reset to None (zero)
+        notebook.late_submission_penalty = None
+
+        if assignment.total_seconds_late > 0:
+            self.log.warning("{} is {} seconds late".format(
+                assignment, assignment.total_seconds_late))
+
+            late_penalty = self.plugin_inst.late_submission_penalty(
+                student_id, notebook.score, assignment.total_seconds_late)
+            self.log.warning("Late submission penalty: {}".format(late_penalty))
+
+            if late_penalty is not None:
+                late_penalty = self._check_late_penalty(notebook, late_penalty)
+                notebook.late_submission_penalty = late_penalty
+
     def preprocess(self, nb: NotebookNode, resources: ResourcesDict) -> Tuple[NotebookNode, ResourcesDict]:
         # pull information from the resources
         self.notebook_id = resources['nbgrader']['notebook']
@@ -43,35 +68,24 @@ class AssignLatePenalties(NbGraderPreprocessor):
         self.student_id = resources['nbgrader']['student']
         self.db_url = resources['nbgrader']['db_url']
 
+        # in journal mode, the penalty is assigned once the grades have been
+        # written to the database (see nbgrader.converters.journal)
+        journal = resources['nbgrader'].get('journal', None)
+        if journal is not None:
+            journal.record(
+                'late_penalty', assignment=self.assignment_id,
+                student=self.student_id, notebook=self.notebook_id)
+            return nb, resources
+
         # init the plugin
         self.init_plugin()
 
         # connect to the database
-        self.gradebook = Gradebook(self.db_url)
-
-        with self.gradebook:
+        with self.open_gradebook(resources) as self.gradebook:
             # process the late submissions
             nb, resources = super(AssignLatePenalties, self).preprocess(nb, resources)
-            assignment = self.gradebook.find_submission(
-                self.assignment_id, self.student_id)
-            notebook = self.gradebook.find_submission_notebook(
-                self.notebook_id, self.assignment_id, self.student_id)
-
-            # reset to None (zero)
-            notebook.late_submission_penalty = None
-
-            if assignment.total_seconds_late > 0:
-                self.log.warning("{} is {} seconds late".format(
-                    assignment, assignment.total_seconds_late))
-
-                late_penalty = self.plugin_inst.late_submission_penalty(
-                    self.student_id, notebook.score, assignment.total_seconds_late)
-                self.log.warning("Late submission penalty: {}".format(late_penalty))
-
-                if late_penalty is not None:
-                    late_penalty = self._check_late_penalty(notebook, late_penalty)
-                    notebook.late_submission_penalty = late_penalty
-
+            self.assign_late_penalty(
+                self.gradebook, self.notebook_id, self.assignment_id, self.student_id)
             self.gradebook.db.commit()
 
         return nb, resources
@@ -1,7 +1,7 @@
 from nbformat.v4.nbbase import validate
 
 from .. import utils
-from ..api import Gradebook, MissingEntry
+from ..api import MissingEntry
 from . import NbGraderPreprocessor
 from nbconvert.exporters.exporter import ResourcesDict
 from nbformat.notebooknode import NotebookNode
@@ -18,9 +18,7 @@ class OverwriteCells(NbGraderPreprocessor):
         self.db_url = resources['nbgrader']['db_url']
 
         # connect to the database
-        self.gradebook = Gradebook(self.db_url)
-
-        with self.gradebook:
+        with self.open_gradebook(resources) as self.gradebook:
             nb, resources = super(OverwriteCells, self).preprocess(nb, resources)
 
         return nb, resources
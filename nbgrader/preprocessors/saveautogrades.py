@@ -1,9 +1,34 @@
 from .. import utils
-from ..api import Gradebook
+from ..api import BaseCell, Grade, Comment, Gradebook, MissingEntry
 from . import NbGraderPreprocessor
 from nbconvert.exporters.exporter import ResourcesDict
 from nbformat.notebooknode import NotebookNode
-from typing import Tuple
+from typing import Dict, Optional, Tuple
+
+
+def load_by_cell_name(gradebook: Gradebook, model: type, notebook_id: str) -> Dict[str, object]:
+    """Load all the grades or comments (depending on ``model``) of a submitted
+    notebook in one query, keyed by the name of their cell."""
+    rows = gradebook.db.query(BaseCell.name, model)\
+        .join(BaseCell, BaseCell.id == model.cell_id)\
+        .filter(model.notebook_id == notebook_id)\
+        .all()
+    return {name: obj for name, obj in rows}
+
+
+def update_grade(grade: Grade, auto_score: Optional[float]) -> None:
+    """Set the autograder score of a grade. This does NOT override the manual
+    score, which might have been provided by a grader.
+
+    """
+    grade.auto_score = auto_score
+
+    # if there was previously a manual grade, or if there is no autograder
+    # score, then we should mark this as needing review
+    if (grade.manual_score is not None) or (grade.auto_score is None):
+        grade.needs_manual_grade = True
+    else:
+        grade.needs_manual_grade = False
 
 
 class SaveAutoGrades(NbGraderPreprocessor):
@@ -16,12 +41,24 @@ class SaveAutoGrades(NbGraderPreprocessor):
         self.student_id = resources['nbgrader']['student']
         self.db_url = resources['nbgrader']['db_url']
 
-        # connect to the database
-        self.gradebook = Gradebook(self.db_url)
+        # in journal mode, the grades are written to the database later on
+        # (see nbgrader.converters.journal)
+        self.journal = resources['nbgrader'].get('journal', None)
+        if self.journal is not None:
+            return super(SaveAutoGrades, self).preprocess(nb, resources)
 
-        with self.gradebook:
-            # process the cells
+        # connect to the database
+        with self.open_gradebook(resources) as self.gradebook:
+            # load all the grades and comments of the submitted notebook up
+            # front, rather than looking them up cell by cell
+            notebook = self.gradebook.find_submission_notebook(
+                self.notebook_id, self.assignment_id, self.student_id)
+            self.grades = load_by_cell_name(self.gradebook, Grade, notebook.id)
+            self.comments = load_by_cell_name(self.gradebook, Comment, notebook.id)
+
+            # process the cells, and save all the changes at once
             nb, resources = super(SaveAutoGrades, self).preprocess(nb, resources)
+            self.gradebook.db.commit()
 
         return nb, resources
 
@@ -35,37 +72,44 @@ class SaveAutoGrades(NbGraderPreprocessor):
         """
         # these are the fields by which we will identify the score
         # information
-        grade = self.gradebook.find_grade(
-            cell.metadata['nbgrader']['grade_id'],
-            self.notebook_id,
-            self.assignment_id,
-            self.student_id)
+        grade_id = cell.metadata['nbgrader']['grade_id']
 
         # determine what the grade is
         auto_score, _ = utils.determine_grade(cell, self.log)
-        grade.auto_score = auto_score
 
-        # if there was previously a manual grade, or if there is no autograder
-        # score, then we should mark this as needing review
-        if (grade.manual_score is not None) or (grade.auto_score is None):
-            grade.needs_manual_grade = True
-        else:
-            grade.needs_manual_grade = False
+        if self.journal is not None:
+            self.journal.record(
+                'grade', assignment=self.assignment_id, student=self.student_id,
+                notebook=self.notebook_id, cell=grade_id, auto_score=auto_score)
+            return
 
-        self.gradebook.db.commit()
+        try:
+            grade = self.grades[grade_id]
+        except KeyError:
+            raise MissingEntry("No such grade: {}/{}/{} for {}".format(
+                self.assignment_id, self.notebook_id, grade_id, self.student_id))
+
+        update_grade(grade, auto_score)
 
     def _add_comment(self, cell: NotebookNode, resources: ResourcesDict) -> None:
-        comment = self.gradebook.find_comment(
-            cell.metadata['nbgrader']['grade_id'],
-            self.notebook_id,
-            self.assignment_id,
-            self.student_id)
+        grade_id = cell.metadata['nbgrader']['grade_id']
         if cell.metadata.nbgrader.get("checksum", None) == utils.compute_checksum(cell) and not utils.is_task(cell):
-            comment.auto_comment = "No response."
+            auto_comment = "No response."
         else:
-            comment.auto_comment = None
-
-        self.gradebook.db.commit()
+            auto_comment = None
+
+        if self.journal is not None:
+            self.journal.record(
+                'comment', assignment=self.assignment_id, student=self.student_id,
+                notebook=self.notebook_id, cell=grade_id, auto_comment=auto_comment)
+            return
+
+        try:
+            comment = self.comments[grade_id]
+        except KeyError:
+            raise MissingEntry("No such comment: {}/{}/{} for {}".format(
+                self.assignment_id, self.notebook_id, grade_id, self.student_id))
+        comment.auto_comment = auto_comment
 
     def preprocess_cell(self,
                         cell: NotebookNode,
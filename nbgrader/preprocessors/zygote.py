@@ -0,0 +1,213 @@
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import socket
+import tempfile
+import subprocess
+import multiprocessing.util
+
+from textwrap import dedent
+from traitlets import Float, List, Unicode
+from traitlets.config import LoggingConfigurable
+from jupyter_client import KernelManager
+from typing import Any, Dict, List as TList, Optional, Tuple
+
+_SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_zygote_server.py")
+
+
+class ForkedKernel(object):
+    """A minimal ``Popen``-like handle for a kernel forked by a
+    :class:`KernelZygote`.
+
+    The kernel is a child of the zygote rather than of this process, so the
+    zygote reaps it, and its return code is asked from the zygote.
+
+    """
+
+    def __init__(self, pid: int, zygote: 'KernelZygote') -> None:
+        self.pid = pid
+        self.zygote = zygote
+        self.returncode = None  # type: Optional[int]
+
+    def poll(self) -> Optional[int]:
+        if self.returncode is None:
+            try:
+                self.returncode = self.zygote._request({"command": "poll", "pid": self.pid})["returncode"]
+            except OSError:
+                # the zygote is gone and the kernel was reparented, so its
+                # return code is lost; report it as killed once it exits
+                try:
+                    os.kill(self.pid, 0)
+                except ProcessLookupError:
+                    self.returncode = -signal.SIGKILL
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() > deadline:
+                raise subprocess.TimeoutExpired(str(self.pid), timeout)
+            time.sleep(0.01)
+        return self.returncode
+
+    def send_signal(self, signum: int) -> None:
+        if self.poll() is None:
+            os.kill(self.pid, signum)
+
+    def terminate(self) -> None:
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        self.send_signal(signal.SIGKILL)
+
+
+class KernelZygote(LoggingConfigurable):
+    """A template Python process that has imported a list of modules once,
+    and forks a new IPython kernel from itself on request."""
+
+    python = Unicode()
+    preload_modules = List(Unicode())
+    startup_timeout = Float(60)
+
+    _process = None  # type: Optional[subprocess.Popen]
+
+    def start(self) -> None:
+        self._tempdir = tempfile.mkdtemp(prefix="nbgrader-zygote-")
+        self.socket_path = os.path.join(self._tempdir, "zygote.sock")
+
+        self.log.info("Starting kernel template, preloading: %s", ", ".join(self.preload_modules) or "nothing")
+        env = os.environ.copy()
+        env["JPY_PARENT_PID"] = str(os.getpid())
+        self._process = subprocess.Popen(
+            [self.python, _SERVER_SCRIPT, self.socket_path] + list(self.preload_modules),
+            stdin=subprocess.DEVNULL, cwd=self._tempdir, env=env,
+            # don't let a Ctrl-C meant for nbgrader take down the zygote
+            # (and with it the return codes of the kernels)
+            start_new_session=True)
+
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            if self._process.poll() is not None:
+                self.stop()
+                raise RuntimeError("The kernel template exited while starting up")
+            try:
+                self._request({"command": "ping"})
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError("The kernel template didn't start in %d seconds" % self.startup_timeout)
+                time.sleep(0.05)
+            else:
+                break
+
+    def _request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.socket_path)
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            if request["command"] == "exit":
+                return {}
+            return json.loads(sock.makefile("rb").readline().decode("utf-8"))
+
+    def fork(self, argv: TList[str], env: Dict[str, str], cwd: str) -> ForkedKernel:
+        """Fork a new kernel, started with the ipykernel command line
+        arguments ``argv``, environment ``env`` and working directory ``cwd``."""
+        env = dict(env)
+        env["JPY_PARENT_PID"] = str(os.getpid())
+        reply = self._request({"command": "fork", "argv": argv, "env": env, "cwd": cwd})
+        return ForkedKernel(reply["pid"], self)
+
+    def stop(self) -> None:
+        if self._process is not None:
+            if self._process.poll() is None:
+                try:
+                    self._request({"command": "exit"})
+                    self._process.wait(timeout=5)
+                except (OSError, subprocess.TimeoutExpired):
+                    self._process.kill()
+                    self._process.wait()
+            self._process = None
+        shutil.rmtree(self._tempdir, ignore_errors=True)
+
+
+# zygotes are owned by the process that started them; forked children (see
+# BaseConverter.jobs) start with an empty registry
+_zygotes = {}  # type: Dict[Tuple[str, Tuple[str, ...]], KernelZygote]
+_zygotes_pid = None  # type: Optional[int]
+
+
+def get_zygote(python: str, preload_modules: TList[str], **kwargs: Any) -> KernelZygote:
+    """Get (starting it if necessary) the zygote of the current process for
+    the given interpreter and list of preloaded modules."""
+    global _zygotes, _zygotes_pid
+    if _zygotes_pid != os.getpid():
+        _zygotes = {}
+        _zygotes_pid = os.getpid()
+        # unlike atexit, this also runs when multiprocessing workers exit
+        multiprocessing.util.Finalize(None, shutdown_zygotes, exitpriority=5)
+
+    key = (python, tuple(preload_modules))
+    if key not in _zygotes:
+        zygote = KernelZygote(python=python, preload_modules=list(preload_modules), **kwargs)
+        zygote.start()
+        _zygotes[key] = zygote
+    return _zygotes[key]
+
+
+def shutdown_zygotes() -> None:
+    """Stop every zygote owned by this process."""
+    if _zygotes_pid != os.getpid():
+        return
+    while _zygotes:
+        _, zygote = _zygotes.popitem()
+        zygote.stop()
+
+
+class ZygoteKernelManager(KernelManager):
+    """A kernel manager that forks IPython kernels from a template process
+    instead of starting each of them from scratch.
+
+    The template imports ``preload_modules`` once, so kernels forked from it
+    start with those modules already loaded. Each kernel is still a separate
+    process with its own session and namespace, and can be interrupted and
+    killed like a regular kernel. To use it for autograding, add the
+    following to ``nbgrader_config.py``::
+
+        c.Execute.kernel_manager_class = 'nbgrader.preprocessors.zygote.ZygoteKernelManager'
+        c.ZygoteKernelManager.preload_modules = ['numpy', 'pandas']
+
+    Forking is only supported on Linux, and only for kernels started with
+    ``python -m ipykernel_launcher``; other kernels are started normally.
+
+    """
+
+    preload_modules = List(Unicode(), help=dedent(
+        """
+        Modules to import in the template process that kernels are forked
+        from. Modules that start threads when they are imported should not be
+        listed here, as threads do not survive a fork.
+        """)
+    ).tag(config=True)
+
+    template_startup_timeout = Float(60, help=dedent(
+        """
+        The number of seconds to wait for the template process to start up
+        and import ``preload_modules``.
+        """)
+    ).tag(config=True)
+
+    def _can_fork(self, kernel_cmd: TList[str]) -> bool:
+        return sys.platform.startswith("linux") and kernel_cmd[1:3] == ["-m", "ipykernel_launcher"]
+
+    def _launch_kernel(self, kernel_cmd: TList[str], **kw: Any) -> Any:
+        if not self._can_fork(kernel_cmd):
+            self.log.warning("Cannot fork kernel %s, starting it normally", kernel_cmd)
+            return super(ZygoteKernelManager, self)._launch_kernel(kernel_cmd, **kw)
+
+        zygote = get_zygote(
+            kernel_cmd[0], self.preload_modules,
+            startup_timeout=self.template_startup_timeout,
+            log=self.log)
+        return zygote.fork(kernel_cmd[3:], kw.get("env", os.environ), kw.get("cwd") or os.getcwd())
@@ -0,0 +1,164 @@
+"""Statistics about the SQL statements issued by the gradebook.
+
+When a :class:`~nbgrader.api.Gradebook` is created with
+``profile_queries=True``, every statement executed on its engine is counted,
+and timed, against the public gradebook method (e.g. ``find_grade`` or
+``submission_dicts``) that the current thread is running. Statements issued
+outside of these methods (e.g. when loading a relationship of an object) are
+counted against ``<other>``. The statistics are collected for the whole
+process in :data:`query_stats`.
+
+"""
+
+import contextlib
+import functools
+import threading
+import time
+import typing
+
+from sqlalchemy import event
+
+#: The name statements issued outside of a gradebook method are counted against
+OTHER = "<other>"
+
+
+class QueryStats(object):
+    """Number of calls, number of statements, time spent executing
+    statements, and total time, per gradebook method."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats = {}  # type: typing.Dict[str, typing.List[float]]
+
+    def _add(self, name: str, calls: int, queries: int, query_time: float, total_time: float) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(name, [0, 0, 0.0, 0.0])
+            stats[0] += calls
+            stats[1] += queries
+            stats[2] += query_time
+            stats[3] += total_time
+
+    def summary(self) -> typing.List[dict]:
+        """The statistics of every method, the most expensive first."""
+        with self._lock:
+            rows = [
+                {"method": name, "calls": int(calls), "queries": int(queries),
+                 "query_time": query_time, "total_time": total_time}
+                for name, (calls, queries, query_time, total_time) in self._stats.items()]
+        return sorted(rows, key=lambda x: (-x["query_time"], x["method"]))
+
+    def format_table(self) -> str:
+        """The statistics of every method, as a table to print."""
+        lines = ["{:<36} {:>8} {:>8} {:>14} {:>14}".format(
+            "method", "calls", "queries", "query time (s)", "total time (s)")]
+        for row in self.summary():
+            lines.append("{method:<36} {calls:>8} {queries:>8} {query_time:>14.3f} {total_time:>14.3f}".format(**row))
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """Forget all the statistics collected so far."""
+        with self._lock:
+            self._stats = {}
+
+
+#: The statistics of every gradebook created with ``profile_queries=True``
+#: in this process
+query_stats = QueryStats()
+
+# the gradebook method each thread is running, and how many statements it has
+# issued so far
+_current = threading.local()
+
+
+def _before_execute(conn: typing.Any, cursor: typing.Any, statement: str,
+                    parameters: typing.Any, context: typing.Any, executemany: bool) -> None:
+    conn.info.setdefault("query_start", []).append(time.time())
+
+
+def _after_execute(conn: typing.Any, cursor: typing.Any, statement: str,
+                   parameters: typing.Any, context: typing.Any, executemany: bool) -> None:
+    elapsed = time.time() - conn.info["query_start"].pop()
+    method = getattr(_current, "method", None)
+    if method is None:
+        query_stats._add(OTHER, 0, 1, elapsed, 0.0)
+    else:
+        _current.queries += 1
+        _current.query_time += elapsed
+
+
+def _instrument_engine(engine: typing.Any) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_execute):
+        event.listen(engine, "before_cursor_execute", _before_execute)
+        event.listen(engine, "after_cursor_execute", _after_execute)
+
+
+def _profiled(name: str, method: typing.Callable) -> typing.Callable:
+    @functools.wraps(method)
+    def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        # statements are only counted against the outermost method, e.g.
+        # remove_student rather than the find_student it calls
+        if getattr(_current, "method", None) is not None:
+            return method(*args, **kwargs)
+
+        _current.method = name
+        _current.queries = 0
+        _current.query_time = 0.0
+        start = time.time()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            query_stats._add(name, 1, _current.queries, _current.query_time, time.time() - start)
+            _current.method = None
+
+    return wrapper
+
+
+def instrument_gradebook(gradebook: typing.Any) -> None:
+    """Count the statements issued by the public methods of a gradebook in
+    :data:`query_stats`."""
+    _instrument_engine(gradebook.engine)
+    for name in dir(type(gradebook)):
+        if name.startswith("_") or not callable(getattr(type(gradebook), name)):
+            continue
+        setattr(gradebook, name, _profiled(name, getattr(gradebook, name)))
+
+
+class QueryCounter(object):
+    """Records the statements executed on an engine while it is active::
+
+        with QueryCounter(gradebook.engine) as counter:
+            gradebook.submission_dicts("ps1")
+        print(counter.count, counter.statements)
+
+    """
+
+    def __init__(self, engine: typing.Any) -> None:
+        self.engine = engine
+        self.statements = []  # type: typing.List[str]
+
+    @property
+    def count(self) -> int:
+        """The number of statements executed."""
+        return len(self.statements)
+
+    def _record(self, conn: typing.Any, cursor: typing.Any, statement: str,
+                parameters: typing.Any, context: typing.Any, executemany: bool) -> None:
+        self.statements.append(statement)
+
+    def __enter__(self) -> 'QueryCounter':
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+
+@contextlib.contextmanager
+def query_budget(engine: typing.Any, max_queries: int) -> typing.Iterator[QueryCounter]:
+    """Fail with an AssertionError if more than ``max_queries`` statements
+    are executed on ``engine`` within the block."""
+    with QueryCounter(engine) as counter:
+        yield counter
+    if counter.count > max_queries:
+        raise AssertionError("{} queries executed, the budget is {}:\n{}".format(
+            counter.count, max_queries, "\n".join(counter.statements)))
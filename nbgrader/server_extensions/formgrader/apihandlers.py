@@ -1,10 +1,11 @@
 import json
 import os
 
-from tornado import web
+from tornado import gen, web
 
 from .base import BaseApiHandler, check_xsrf, check_notebook_dir
 from ...api import MissingEntry
+from ...querystats import query_stats
 
 
 class StatusHandler(BaseApiHandler):
@@ -15,93 +16,116 @@ class StatusHandler(BaseApiHandler):
 
 
 class GradeCollectionHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def get(self):
         submission_id = self.get_argument("submission_id")
+        grades = yield self.run_in_thread(self._get_grades, submission_id)
+        self.write(json.dumps(grades))
+
+    def _get_grades(self, submission_id):
         try:
             notebook = self.gradebook.find_submission_notebook_by_id(submission_id)
         except MissingEntry:
             raise web.HTTPError(404)
-        self.write(json.dumps([g.to_dict() for g in notebook.grades]))
+        return [g.to_dict() for g in notebook.grades]
 
 
 class CommentCollectionHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def get(self):
         submission_id = self.get_argument("submission_id")
+        comments = yield self.run_in_thread(self._get_comments, submission_id)
+        self.write(json.dumps(comments))
+
+    def _get_comments(self, submission_id):
         try:
             notebook = self.gradebook.find_submission_notebook_by_id(submission_id)
         except MissingEntry:
             raise web.HTTPError(404)
-        self.write(json.dumps([c.to_dict() for c in notebook.comments]))
+        return [c.to_dict() for c in notebook.comments]
 
 
 class GradeHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def get(self, grade_id):
-        try:
-            grade = self.gradebook.find_grade_by_id(grade_id)
-        except MissingEntry:
-            raise web.HTTPError(404)
-        self.write(json.dumps(grade.to_dict()))
+        grade = yield self.run_in_thread(self._update_grade, grade_id, None)
+        self.write(json.dumps(grade))
 
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def put(self, grade_id):
+        data = self.get_json_body()
+        grade = yield self.run_in_thread(self._update_grade, grade_id, data)
+        self.write(json.dumps(grade))
+
+    def _update_grade(self, grade_id, data):
         try:
             grade = self.gradebook.find_grade_by_id(grade_id)
         except MissingEntry:
             raise web.HTTPError(404)
 
-        data = self.get_json_body()
-        grade.manual_score = data.get("manual_score", None)
-        grade.extra_credit = data.get("extra_credit", None)
-        if grade.manual_score is None and grade.auto_score is None:
-            grade.needs_manual_grade = True
-        else:
-            grade.needs_manual_grade = False
-        self.gradebook.db.commit()
-        self.write(json.dumps(grade.to_dict()))
+        if data is not None:
+            grade.manual_score = data.get("manual_score", None)
+            grade.extra_credit = data.get("extra_credit", None)
+            if grade.manual_score is None and grade.auto_score is None:
+                grade.needs_manual_grade = True
+            else:
+                grade.needs_manual_grade = False
+            self.gradebook.db.commit()
+        return grade.to_dict()
 
 
 class CommentHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def get(self, grade_id):
-        try:
-            comment = self.gradebook.find_comment_by_id(grade_id)
-        except MissingEntry:
-            raise web.HTTPError(404)
-        self.write(json.dumps(comment.to_dict()))
+        comment = yield self.run_in_thread(self._update_comment, grade_id, None)
+        self.write(json.dumps(comment))
 
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def put(self, grade_id):
+        data = self.get_json_body()
+        comment = yield self.run_in_thread(self._update_comment, grade_id, data)
+        self.write(json.dumps(comment))
+
+    def _update_comment(self, grade_id, data):
         try:
             comment = self.gradebook.find_comment_by_id(grade_id)
         except MissingEntry:
             raise web.HTTPError(404)
 
-        data = self.get_json_body()
-        comment.manual_comment = data.get("manual_comment", None)
-        self.gradebook.db.commit()
-        self.write(json.dumps(comment.to_dict()))
+        if data is not None:
+            comment.manual_comment = data.get("manual_comment", None)
+            self.gradebook.db.commit()
+        return comment.to_dict()
 
 
 class FlagSubmissionHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def post(self, submission_id):
+        submission = yield self.run_in_thread(self._flag_submission, submission_id)
+        self.write(json.dumps(submission))
+
+    def _flag_submission(self, submission_id):
         try:
             submission = self.gradebook.find_submission_notebook_by_id(submission_id)
         except MissingEntry:
@@ -109,28 +133,31 @@ class FlagSubmissionHandler(BaseApiHandler):
 
         submission.flagged = not submission.flagged
         self.gradebook.db.commit()
-        self.write(json.dumps(submission.to_dict()))
+        return submission.to_dict()
 
 
 class AssignmentCollectionHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def get(self):
-        assignments = self.api.get_assignments()
+        assignments = yield self.call_api("get_assignments")
         self.write(json.dumps(assignments))
 
 
 class AssignmentHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def get(self, assignment_id):
-        assignment = self.api.get_assignment(assignment_id)
+        assignment = yield self.call_api("get_assignment", assignment_id)
         if assignment is None:
             raise web.HTTPError(404)
         self.write(json.dumps(assignment))
 
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
@@ -142,70 +169,104 @@ class AssignmentHandler(BaseApiHandler):
             duedate = duedate + " " + timezone
         assignment = {"duedate": duedate}
         assignment_id = assignment_id.strip()
+        assignment = yield self.run_in_thread(self._update_assignment, assignment_id, assignment)
+        self.write(json.dumps(assignment))
+
+    def _update_assignment(self, assignment_id, assignment):
         self.gradebook.update_or_create_assignment(assignment_id, **assignment)
         sourcedir = os.path.abspath(self.coursedir.format_path(self.coursedir.source_directory, '.', assignment_id))
         if not os.path.isdir(sourcedir):
             os.makedirs(sourcedir)
-        self.write(json.dumps(self.api.get_assignment(assignment_id)))
+        return self.api.get_assignment(assignment_id)
 
 
 class NotebookCollectionHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def get(self, assignment_id):
-        notebooks = self.api.get_notebooks(assignment_id)
+        notebooks = yield self.call_api("get_notebooks", assignment_id)
         self.write(json.dumps(notebooks))
 
 
 class SubmissionCollectionHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def get(self, assignment_id):
-        submissions = self.api.get_submissions(assignment_id)
-        self.write(json.dumps(submissions))
+        page = self.get_page_arguments()
+        next_page = {}
+        try:
+            submissions = yield self.call_api(
+                "get_submissions", assignment_id, next_page=next_page, **page)
+        except ValueError as e:
+            raise web.HTTPError(400, str(e))
+        self.write_page(submissions, next_page)
 
 
 class SubmissionHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def get(self, assignment_id, student_id):
-        submission = self.api.get_submission(assignment_id, student_id)
+        submission = yield self.call_api("get_submission", assignment_id, student_id)
         if submission is None:
             raise web.HTTPError(404)
         self.write(json.dumps(submission))
 
 
 class SubmittedNotebookCollectionHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def get(self, assignment_id, notebook_id):
-        submissions = self.api.get_notebook_submissions(assignment_id, notebook_id)
-        self.write(json.dumps(submissions))
+        page = self.get_page_arguments()
+        next_page = {}
+        try:
+            submissions = yield self.run_in_thread(
+                self._get_notebook_submissions, assignment_id, notebook_id,
+                next_page=next_page, **page)
+        except ValueError as e:
+            raise web.HTTPError(400, str(e))
+        self.write_page(submissions, next_page)
+
+    def _get_notebook_submissions(self, assignment_id, notebook_id, **kwargs):
+        # number the submissions like the submission pages do
+        order = self.get_submission_order(assignment_id, notebook_id)
+        return self.api.get_notebook_submissions(assignment_id, notebook_id, order=order, **kwargs)
 
 
 class StudentCollectionHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def get(self):
-        students = self.api.get_students()
-        self.write(json.dumps(students))
+        page = self.get_page_arguments(needs_manual_grade=False)
+        next_page = {}
+        try:
+            students = yield self.call_api("get_students", next_page=next_page, **page)
+        except ValueError as e:
+            raise web.HTTPError(400, str(e))
+        self.write_page(students, next_page)
 
 
 class StudentHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def get(self, student_id):
-        student = self.api.get_student(student_id)
+        student = yield self.call_api("get_student", student_id)
         if student is None:
             raise web.HTTPError(404)
         self.write(json.dumps(student))
 
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
@@ -217,102 +278,141 @@ class StudentHandler(BaseApiHandler):
             "email": data.get("email", None),
         }
         student_id = student_id.strip()
+        student = yield self.run_in_thread(self._update_student, student_id, student)
+        self.write(json.dumps(student))
+
+    def _update_student(self, student_id, student):
         self.gradebook.update_or_create_student(student_id, **student)
-        self.write(json.dumps(self.api.get_student(student_id)))
+        return self.api.get_student(student_id)
 
 
 class StudentSubmissionCollectionHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def get(self, student_id):
-        submissions = self.api.get_student_submissions(student_id)
+        submissions = yield self.call_api("get_student_submissions", student_id)
         self.write(json.dumps(submissions))
 
 
 class StudentNotebookSubmissionCollectionHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def get(self, student_id, assignment_id):
-        submissions = self.api.get_student_notebook_submissions(student_id, assignment_id)
+        submissions = yield self.call_api("get_student_notebook_submissions", student_id, assignment_id)
         self.write(json.dumps(submissions))
 
 
 class AssignHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def post(self, assignment_id):
-        self.write(json.dumps(self.api.generate_assignment(assignment_id)))
+        result = yield self.call_api_exclusive("generate_assignment", assignment_id)
+        self.write(json.dumps(result))
 
 
 class UnReleaseHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def post(self, assignment_id):
-        self.write(json.dumps(self.api.unrelease(assignment_id)))
+        result = yield self.call_api_exclusive("unrelease", assignment_id)
+        self.write(json.dumps(result))
 
 
 class ReleaseHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def post(self, assignment_id):
-        self.write(json.dumps(self.api.release_assignment(assignment_id)))
+        result = yield self.call_api_exclusive("release_assignment", assignment_id)
+        self.write(json.dumps(result))
 
 
 class CollectHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def post(self, assignment_id):
-        self.write(json.dumps(self.api.collect(assignment_id)))
+        result = yield self.call_api_exclusive("collect", assignment_id)
+        self.write(json.dumps(result))
 
 
 class AutogradeHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def post(self, assignment_id, student_id):
-        self.write(json.dumps(self.api.autograde(assignment_id, student_id)))
+        result = yield self.call_api_exclusive("autograde", assignment_id, student_id)
+        self.submission_order.invalidate(assignment_id)
+        self.write(json.dumps(result))
 
 
 class GenerateAllFeedbackHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def post(self, assignment_id):
-        self.write(json.dumps(self.api.generate_feedback(assignment_id)))
+        result = yield self.call_api_exclusive("generate_feedback", assignment_id)
+        self.write(json.dumps(result))
 
 
 class ReleaseAllFeedbackHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def post(self, assignment_id):
-        self.write(json.dumps(self.api.release_feedback(assignment_id)))
+        result = yield self.call_api_exclusive("release_feedback", assignment_id)
+        self.write(json.dumps(result))
 
 
 class GenerateFeedbackHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def post(self, assignment_id, student_id):
-        self.write(json.dumps(self.api.generate_feedback(assignment_id, student_id)))
+        result = yield self.call_api_exclusive("generate_feedback", assignment_id, student_id)
+        self.write(json.dumps(result))
 
 
 class ReleaseFeedbackHandler(BaseApiHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def post(self, assignment_id, student_id):
-        self.write(json.dumps(self.api.release_feedback(assignment_id, student_id)))
+        result = yield self.call_api_exclusive("release_feedback", assignment_id, student_id)
+        self.write(json.dumps(result))
+
+
+class QueryStatsHandler(BaseApiHandler):
+    @web.authenticated
+    @check_xsrf
+    def get(self):
+        self.write(json.dumps(query_stats.summary()))
+
+    @web.authenticated
+    @check_xsrf
+    def delete(self):
+        query_stats.reset()
+        self.write({"status": True})
 
 
 default_handlers = [
     (r"/formgrader/api/status", StatusHandler),
+    (r"/formgrader/api/query_stats", QueryStatsHandler),
 
     (r"/formgrader/api/assignments", AssignmentCollectionHandler),
     (r"/formgrader/api/assignment/([^/]+)", AssignmentHandler),
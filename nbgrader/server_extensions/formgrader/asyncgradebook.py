@@ -0,0 +1,70 @@
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ...api import Gradebook
+
+
+class AsyncGradebook(object):
+    """Runs the blocking calls of the formgrader (queries of the gradebook,
+    and methods of :class:`~nbgrader.apps.api.NbGraderAPI` which also scan
+    the course directory) on a bounded pool of threads, so that a slow call
+    does not block the IOLoop of the notebook server, nor the requests of
+    other graders.
+
+    The calls share one gradebook, whose session is local to the thread
+    using it and is removed at the end of every call, so that each request
+    works with a session of its own. Exclusive calls (see
+    :meth:`run_exclusive`) run one at a time on a thread of their own, so
+    that they never take up the threads of the other calls.
+
+    """
+
+    def __init__(self, db_url, course_id, db_options, max_workers=4):
+        self.db_url = db_url
+        self.course_id = course_id
+        self.db_options = db_options
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.exclusive_executor = ThreadPoolExecutor(max_workers=1)
+        self._gradebook = None
+        self._lock = threading.Lock()
+
+    @property
+    def gradebook(self):
+        """The gradebook shared by all the calls."""
+        with self._lock:
+            if self._gradebook is None:
+                self._gradebook = Gradebook(self.db_url, self.course_id, **self.db_options)
+        return self._gradebook
+
+    def run(self, func, *args, **kwargs):
+        """Call ``func(*args, **kwargs)`` on the thread pool.
+
+        Returns
+        -------
+        future : concurrent.futures.Future
+            The result of the call, to be yielded by a coroutine
+
+        """
+        return self.executor.submit(self._call, func, args, kwargs)
+
+    def run_exclusive(self, func, *args, **kwargs):
+        """Like :meth:`run`, but never at the same time as another exclusive
+        call. This is for the calls that run nbgrader commands (e.g.
+        autograding), which temporarily change the shared configuration."""
+        return self.exclusive_executor.submit(self._call, func, args, kwargs)
+
+    def _call(self, func, args, kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if self._gradebook is not None:
+                self._gradebook.db.remove()
+
+    def close(self):
+        """Stop the threads (once they are done) and close the gradebook."""
+        self.executor.shutdown(wait=True)
+        self.exclusive_executor.shutdown(wait=True)
+        if self._gradebook is not None:
+            self._gradebook.close()
+            self._gradebook = None
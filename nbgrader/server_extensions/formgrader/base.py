@@ -1,12 +1,15 @@
 import os
 import json
 import functools
+import threading
 
 from tornado import web
 from notebook.base.handlers import IPythonHandler
-from ...api import Gradebook
 from ...apps.api import NbGraderAPI
 
+# the API is created by whichever request needs it first
+_api_lock = threading.Lock()
+
 
 class BaseHandler(IPythonHandler):
 
@@ -30,14 +33,13 @@ class BaseHandler(IPythonHandler):
     def authenticator(self):
         return self.settings['nbgrader_authenticator']
 
+    @property
+    def async_gradebook(self):
+        return self.settings['nbgrader_async_gradebook']
+
     @property
     def gradebook(self):
-        gb = self.settings['nbgrader_gradebook']
-        if gb is None:
-            self.log.debug("creating gradebook")
-            gb = Gradebook(self.db_url, self.coursedir.course_id)
-            self.settings['nbgrader_gradebook'] = gb
-        return gb
+        return self.async_gradebook.gradebook
 
     @property
     def mathjax_url(self):
@@ -49,12 +51,40 @@ class BaseHandler(IPythonHandler):
 
     @property
     def api(self):
-        level = self.log.level
-        api = NbGraderAPI(
-            self.coursedir, self.authenticator, parent=self.coursedir.parent)
-        api.log_level = level
+        with _api_lock:
+            api = self.settings['nbgrader_api']
+            if api is None:
+                api = NbGraderAPI(
+                    self.coursedir, self.authenticator, gradebook=self.gradebook,
+                    parent=self.coursedir.parent)
+                api.log_level = self.log.level
+                self.settings['nbgrader_api'] = api
         return api
 
+    @property
+    def submission_order(self):
+        return self.settings['nbgrader_submission_order']
+
+    def get_submission_order(self, assignment_id, notebook_id):
+        """Get the :class:`~.submissionorder.SubmissionOrder` of the
+        submissions of a notebook (this is blocking)."""
+        return self.submission_order.get(self.api, self.gradebook, assignment_id, notebook_id)
+
+    def run_in_thread(self, func, *args, **kwargs):
+        """Run a blocking function (e.g. one querying the gradebook) on the
+        formgrader's thread pool, and return a future to yield."""
+        return self.async_gradebook.run(func, *args, **kwargs)
+
+    def call_api(self, name, *args, **kwargs):
+        """Call the method ``name`` of :attr:`api` on the formgrader's
+        thread pool, and return a future to yield."""
+        return self.run_in_thread(lambda: getattr(self.api, name)(*args, **kwargs))
+
+    def call_api_exclusive(self, name, *args, **kwargs):
+        """Like :meth:`call_api`, for the methods that run nbgrader commands,
+        which must not run concurrently."""
+        return self.async_gradebook.run_exclusive(lambda: getattr(self.api, name)(*args, **kwargs))
+
     def render(self, name, **ns):
         template = self.settings['nbgrader_jinja2_env'].get_template(name)
         return template.render(**ns)
@@ -100,6 +130,41 @@ class BaseApiHandler(BaseHandler):
             raise web.HTTPError(400, 'Invalid JSON in body of request')
         return model
 
+    def get_page_arguments(self, needs_manual_grade=True):
+        """Return the arguments for getting one page of a listing, from the
+        ``limit``, ``after``, ``sort``, ``name_prefix`` and (optionally)
+        ``needs_manual_grade`` query parameters. ``after`` is the JSON
+        encoded ``[sort value, id]`` of the last item of the previous page.
+
+        """
+        page = {}
+        try:
+            limit = self.get_argument("limit", None)
+            if limit is not None:
+                page["limit"] = int(limit)
+            after = self.get_argument("after", None)
+            if after is not None:
+                value, last_id = json.loads(after)
+                page["after"] = (value, last_id)
+        except (ValueError, TypeError):
+            raise web.HTTPError(400, 'Invalid paging arguments')
+
+        page["sort"] = self.get_argument("sort", None)
+        page["name_prefix"] = self.get_argument("name_prefix", None)
+        if needs_manual_grade:
+            value = self.get_argument("needs_manual_grade", None)
+            if value is not None:
+                page["needs_manual_grade"] = value.lower() in ("1", "true")
+        return page
+
+    def write_page(self, items, next_page):
+        """Write one page of a listing as JSON. Unless it is the last page,
+        the JSON encoded ``after`` argument of the next page is sent in the
+        ``X-Next-Page-After`` header."""
+        if next_page.get("after", None) is not None:
+            self.set_header("X-Next-Page-After", json.dumps(next_page["after"]))
+        self.write(json.dumps(items))
+
 
 def check_xsrf(f):
     @functools.wraps(f)
@@ -1,14 +1,18 @@
 # coding: utf-8
 
 import os
+import atexit
 
 from nbconvert.exporters import HTMLExporter
-from traitlets import default
+from textwrap import dedent
+from traitlets import default, Integer
 from tornado import web
 from jinja2 import Environment, FileSystemLoader
 from notebook.utils import url_path_join as ujoin
 
 from . import handlers, apihandlers
+from .asyncgradebook import AsyncGradebook
+from .submissionorder import SubmissionOrderCache
 from ...apps.baseapp import NbGrader
 
 
@@ -17,6 +21,17 @@ class FormgradeExtension(NbGrader):
     name = u'formgrade'
     description = u'Grade a notebook using an HTML form'
 
+    db_threads = Integer(
+        4,
+        help=dedent(
+            """
+            The number of threads on which the formgrader queries the database
+            and the course directory, i.e. how many requests it handles
+            concurrently.
+            """
+        )
+    ).tag(config=True)
+
     @default("classes")
     def _classes_default(self):
         classes = super(FormgradeExtension, self)._classes_default()
@@ -46,13 +61,21 @@ class FormgradeExtension(NbGrader):
         else:
             nbgrader_bad_setup = False
 
+        # the notebook server has no shutdown hook for its extensions
+        async_gradebook = AsyncGradebook(
+            self.coursedir.db_url, self.coursedir.course_id,
+            self.coursedir.db_options, max_workers=self.db_threads)
+        atexit.register(async_gradebook.close)
+
         # Configure the formgrader settings
         tornado_settings = dict(
             nbgrader_url_prefix=os.path.relpath(self.coursedir.root, self.parent.notebook_dir),
             nbgrader_coursedir=self.coursedir,
             nbgrader_authenticator=self.authenticator,
             nbgrader_exporter=HTMLExporter(config=self.config),
-            nbgrader_gradebook=None,
+            nbgrader_async_gradebook=async_gradebook,
+            nbgrader_api=None,
+            nbgrader_submission_order=SubmissionOrderCache(),
             nbgrader_db_url=self.coursedir.db_url,
             nbgrader_jinja2_env=jinja_env,
             nbgrader_bad_setup=nbgrader_bad_setup
@@ -2,17 +2,19 @@ import os
 import re
 import sys
 
-from tornado import web
+from tornado import gen, web
 
 from .base import BaseHandler, check_xsrf, check_notebook_dir
 from ...api import MissingEntry
 
 
 class ManageAssignmentsHandler(BaseHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def get(self):
+        exchange_missing = yield self.run_in_thread(lambda: self.api.exchange_missing)
         html = self.render(
             "manage_assignments.tpl",
             url_prefix=self.url_prefix,
@@ -20,7 +22,7 @@ class ManageAssignmentsHandler(BaseHandler):
             windows=(sys.prefix == 'win32'),
             course_id=self.api.course_id,
             exchange=self.api.exchange_root,
-            exchange_missing=self.api.exchange_missing)
+            exchange_missing=exchange_missing)
         self.write(html)
 
 
@@ -75,17 +77,15 @@ class GradebookNotebookSubmissionsHandler(BaseHandler):
 
 
 class SubmissionHandler(BaseHandler):
+    @gen.coroutine
     @web.authenticated
     @check_xsrf
     @check_notebook_dir
     def get(self, submission_id):
-        try:
-            submission = self.gradebook.find_submission_notebook_by_id(submission_id)
-            assignment_id = submission.assignment.assignment.name
-            notebook_id = submission.notebook.name
-            student_id = submission.student.id
-        except MissingEntry:
-            raise web.HTTPError(404, "Invalid submission: {}".format(submission_id))
+        submission = yield self.run_in_thread(self._get_submission, submission_id)
+        assignment_id = submission['assignment_id']
+        notebook_id = submission['notebook_id']
+        student_id = submission['student']
 
         # redirect if there isn't a trailing slash in the uri
         if os.path.split(self.request.path)[1] == submission_id:
@@ -97,20 +97,22 @@ class SubmissionHandler(BaseHandler):
         filename = os.path.join(os.path.abspath(self.coursedir.format_path(
             self.coursedir.autograded_directory, student_id, assignment_id)), '{}.ipynb'.format(notebook_id))
         relative_path = os.path.relpath(filename, self.coursedir.root)
-        indices = self.api.get_notebook_submission_indices(assignment_id, notebook_id)
-        ix = indices.get(submission.id, -2)
+        order = yield self.run_in_thread(self.get_submission_order, assignment_id, notebook_id)
+        ix = order.index(submission['id'])
+        if ix is None:
+            ix = -2
 
         resources = {
             'assignment_id': assignment_id,
             'notebook_id': notebook_id,
-            'submission_id': submission.id,
+            'submission_id': submission['id'],
             'index': ix,
-            'total': len(indices),
+            'total': len(order.ids),
             'base_url': self.base_url,
             'mathjax_url': self.mathjax_url,
             'student': student_id,
-            'last_name': submission.student.last_name,
-            'first_name': submission.student.first_name,
+            'last_name': submission['last_name'],
+            'first_name': submission['first_name'],
             'notebook_path': self.url_prefix + '/' + relative_path
         }
 
@@ -125,6 +127,20 @@ class SubmissionHandler(BaseHandler):
             html, _ = self.exporter.from_filename(filename, resources=resources)
             self.write(html)
 
+    def _get_submission(self, submission_id):
+        try:
+            submission = self.gradebook.find_submission_notebook_by_id(submission_id)
+            return {
+                'id': submission.id,
+                'assignment_id': submission.assignment.assignment.name,
+                'notebook_id': submission.notebook.name,
+                'student': submission.student.id,
+                'last_name': submission.student.last_name,
+                'first_name': submission.student.first_name,
+            }
+        except MissingEntry:
+            raise web.HTTPError(404, "Invalid submission: {}".format(submission_id))
+
 
 class SubmissionNavigationHandler(BaseHandler):
 
@@ -138,59 +154,33 @@ class SubmissionNavigationHandler(BaseHandler):
         else:
             return url
 
-    def _get_submission_ids(self, assignment_id, notebook_id):
-        notebooks = self.gradebook.notebook_submissions(notebook_id, assignment_id)
-        submissions = self.api._filter_existing_notebooks(assignment_id, notebooks)
-        return sorted([x.id for x in submissions])
-
-    def _get_incorrect_submission_ids(self, assignment_id, notebook_id, submission):
-        notebooks = self.gradebook.notebook_submissions(notebook_id, assignment_id)
-        submissions = self.api._filter_existing_notebooks(assignment_id, notebooks)
-        incorrect_ids = set([x.id for x in submissions if x.failed_tests])
-        incorrect_ids.add(submission.id)
-        incorrect_ids = sorted(incorrect_ids)
-        return incorrect_ids
+    def _navigate_to(self, assignment_id, notebook_id, submission_id):
+        if submission_id is None:
+            return self._assignment_notebook_list_url(assignment_id, notebook_id)
+        else:
+            return self._submission_url(submission_id)
 
     def _next(self, assignment_id, notebook_id, submission):
         # find next submission
-        submission_ids = self._get_submission_ids(assignment_id, notebook_id)
-        ix = submission_ids.index(submission.id)
-        if ix == (len(submission_ids) - 1):
-            return self._assignment_notebook_list_url(assignment_id, notebook_id)
-        else:
-            return self._submission_url(submission_ids[ix + 1])
+        order = self.get_submission_order(assignment_id, notebook_id)
+        return self._navigate_to(assignment_id, notebook_id, order.next(submission.id))
 
     def _prev(self, assignment_id, notebook_id, submission):
         # find previous submission
-        submission_ids = self._get_submission_ids(assignment_id, notebook_id)
-        ix = submission_ids.index(submission.id)
-        if ix == 0:
-            return self._assignment_notebook_list_url(assignment_id, notebook_id)
-        else:
-            return self._submission_url(submission_ids[ix - 1])
+        order = self.get_submission_order(assignment_id, notebook_id)
+        return self._navigate_to(assignment_id, notebook_id, order.prev(submission.id))
 
     def _next_incorrect(self, assignment_id, notebook_id, submission):
         # find next incorrect submission
-        submission_ids = self._get_incorrect_submission_ids(assignment_id, notebook_id, submission)
-        ix_incorrect = submission_ids.index(submission.id)
-        if ix_incorrect == (len(submission_ids) - 1):
-            return self._assignment_notebook_list_url(assignment_id, notebook_id)
-        else:
-            return self._submission_url(submission_ids[ix_incorrect + 1])
+        order = self.get_submission_order(assignment_id, notebook_id)
+        return self._navigate_to(assignment_id, notebook_id, order.next(submission.id, failed=True))
 
     def _prev_incorrect(self, assignment_id, notebook_id, submission):
         # find previous incorrect submission
-        submission_ids = self._get_incorrect_submission_ids(assignment_id, notebook_id, submission)
-        ix_incorrect = submission_ids.index(submission.id)
-        if ix_incorrect == 0:
-            return self._assignment_notebook_list_url(assignment_id, notebook_id)
-        else:
-            return self._submission_url(submission_ids[ix_incorrect - 1])
+        order = self.get_submission_order(assignment_id, notebook_id)
+        return self._navigate_to(assignment_id, notebook_id, order.prev(submission.id, failed=True))
 
-    @web.authenticated
-    @check_xsrf
-    @check_notebook_dir
-    def get(self, submission_id, action):
+    def _navigate(self, submission_id, action):
         try:
             submission = self.gradebook.find_submission_notebook_by_id(submission_id)
             assignment_id = submission.assignment.assignment.name
@@ -199,7 +189,15 @@ class SubmissionNavigationHandler(BaseHandler):
             raise web.HTTPError(404, "Invalid submission: {}".format(submission_id))
 
         handler = getattr(self, '_{}'.format(action))
-        self.redirect(handler(assignment_id, notebook_id, submission), permanent=False)
+        return handler(assignment_id, notebook_id, submission)
+
+    @gen.coroutine
+    @web.authenticated
+    @check_xsrf
+    @check_notebook_dir
+    def get(self, submission_id, action):
+        url = yield self.run_in_thread(self._navigate, submission_id, action)
+        self.redirect(url, permanent=False)
 
 
 class SubmissionFilesHandler(web.StaticFileHandler, BaseHandler):
@@ -169,21 +169,18 @@ var loadSubmittedNotebooks = function () {
     models = new SubmittedNotebooks();
     views = [];
     models.loaded = false;
-    models.fetch({
-        success: function () {
-            tbl.empty();
-            models.each(function (model) {
-                var view = new SubmittedNotebookUI({
-                    "model": model,
-                    "el": insertRow(tbl)
-                });
-                views.push(view);
-            });
-            insertDataTable(tbl.parent());
-            $('span.glyphicon.name-hidden').tooltip({title: "Show student name"});
-            $('span.glyphicon.name-shown').tooltip({title: "Hide student name"});
-            models.loaded = true;
-        }
+    loadPages(models, tbl, function (model) {
+        var row = insertRow(tbl);
+        var view = new SubmittedNotebookUI({
+            "model": model,
+            "el": row
+        });
+        views.push(view);
+        return row;
+    }, function () {
+        $('span.glyphicon.name-hidden').tooltip({title: "Show student name"});
+        $('span.glyphicon.name-shown').tooltip({title: "Hide student name"});
+        models.loaded = true;
     });
 };
 
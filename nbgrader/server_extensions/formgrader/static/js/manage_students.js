@@ -265,19 +265,16 @@ var loadStudents = function () {
     models = new Students();
     views = [];
     models.loaded = false;
-    models.fetch({
-        success: function () {
-            tbl.empty();
-            models.each(function (model) {
-                var view = new StudentUI({
-                    "model": model,
-                    "el": insertRow(tbl)
-                });
-                views.push(view);
-            });
-            insertDataTable(tbl.parent());
-            models.loaded = true;
-        }
+    loadPages(models, tbl, function (model) {
+        var row = insertRow(tbl);
+        var view = new StudentUI({
+            "model": model,
+            "el": row
+        });
+        views.push(view);
+        return row;
+    }, function () {
+        models.loaded = true;
     });
 };
 
@@ -278,19 +278,16 @@ var loadSubmissions = function () {
     models = new Submissions();
     views = [];
     models.loaded = false;
-    models.fetch({
-        success: function () {
-            tbl.empty();
-            models.each(function (model) {
-                var view = new SubmissionUI({
-                    "model": model,
-                    "el": insertRow(tbl)
-                });
-                views.push(view);
-            });
-            insertDataTable(tbl.parent());
-            models.loaded = true;
-        }
+    loadPages(models, tbl, function (model) {
+        var row = insertRow(tbl);
+        var view = new SubmissionUI({
+            "model": model,
+            "el": row
+        });
+        views.push(view);
+        return row;
+    }, function () {
+        models.loaded = true;
     });
 };
 
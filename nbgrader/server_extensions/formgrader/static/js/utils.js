@@ -87,3 +87,55 @@ var insertDataTable = function (tbl) {
         }]
     });
 };
+
+// The number of items requested at a time from the paged listings of the
+// formgrader API
+var PAGE_SIZE = 250;
+
+// Fetch a listing of the formgrader API into a collection, one page at a
+// time. `onPage` is called with the models of each page as it arrives,
+// and `onDone` once the last page has been loaded.
+var fetchPages = function (collection, onPage, onDone) {
+    var fetchPage = function (after) {
+        var data = {"limit": PAGE_SIZE};
+        if (after !== null) {
+            data.after = after;
+        }
+        var start = collection.length;
+        var xhr = collection.fetch({
+            data: data,
+            remove: false,
+            success: function () {
+                onPage(collection.models.slice(start));
+                var next = xhr.getResponseHeader("X-Next-Page-After");
+                if (next) {
+                    fetchPage(next);
+                } else {
+                    onDone();
+                }
+            }
+        });
+    };
+    fetchPage(null);
+};
+
+// Load a listing into a collection with fetchPages, and show it in the
+// table `tbl`. `addRow` is called for each model, and returns the row it
+// inserted in the table for it.
+var loadPages = function (collection, tbl, addRow, onDone) {
+    var first = true;
+    fetchPages(collection, function (models) {
+        if (first) {
+            tbl.empty();
+            _.each(models, addRow);
+            insertDataTable(tbl.parent());
+            first = false;
+        } else {
+            var table = tbl.parent().DataTable();
+            _.each(models, function (model) {
+                table.row.add(addRow(model));
+            });
+            table.draw(false);
+        }
+    }, onDone);
+};
@@ -0,0 +1,150 @@
+import bisect
+import threading
+
+from ...api import Assignment, Grade, Notebook, SubmittedAssignment, SubmittedNotebook
+
+# if more changes than this have been made to the gradebook since an order
+# was built, it is rebuilt rather than updated
+_MAX_CHANGES = 500
+
+
+class SubmissionOrder(object):
+    """The submissions of a notebook, in the order in which the formgrader
+    navigates through them (by id), and which of them fail tests."""
+
+    def __init__(self, ids, failed, cursor):
+        self.ids = sorted(ids)
+        self.positions = dict((x, i) for i, x in enumerate(self.ids))
+        self.failed = sorted(failed)
+        #: the gradebook change (see :meth:`nbgrader.api.Gradebook.last_change`)
+        #: this order is up to date with
+        self.cursor = cursor
+
+    def index(self, submission_id):
+        """The position of a submission, or None if it is not part of the
+        order (e.g. because its notebook file is missing)."""
+        return self.positions.get(submission_id, None)
+
+    def next(self, submission_id, failed=False):
+        """The submission after the given one (that fails tests, if
+        ``failed`` is True), or None if it is the last one."""
+        ids = self.failed if failed else self.ids
+        i = bisect.bisect_right(ids, submission_id)
+        return ids[i] if i < len(ids) else None
+
+    def prev(self, submission_id, failed=False):
+        """The submission before the given one (that fails tests, if
+        ``failed`` is True), or None if it is the first one."""
+        ids = self.failed if failed else self.ids
+        i = bisect.bisect_left(ids, submission_id)
+        return ids[i - 1] if i > 0 else None
+
+    def set_failed(self, submission_id, failed):
+        i = bisect.bisect_left(self.failed, submission_id)
+        present = i < len(self.failed) and self.failed[i] == submission_id
+        if failed and not present:
+            self.failed.insert(i, submission_id)
+        elif present and not failed:
+            del self.failed[i]
+
+
+class SubmissionOrderCache(object):
+    """The :class:`SubmissionOrder` of every notebook graded through the
+    formgrader. An order is built once, by listing the submissions whose
+    files exist, and is then kept up to date from the gradebook's change log:
+    changed grades only update which submissions fail tests, while added or
+    removed submissions (or too many changes) cause it to be rebuilt.
+
+    """
+
+    def __init__(self):
+        self._orders = {}
+        # one lock per notebook, so that building the order of one notebook
+        # does not block the requests for the others
+        self._locks = {}
+        # guards the dictionaries above, and is never held while querying
+        self._lock = threading.Lock()
+        # incremented by invalidate, so that orders that were being built
+        # meanwhile are not stored
+        self._generation = 0
+
+    def get(self, api, gradebook, assignment_id, notebook_id):
+        """Get the up to date order of the submissions of a notebook.
+
+        Arguments
+        ---------
+        api: :class:`~nbgrader.apps.api.NbGraderAPI`
+            The API, to check which notebook files exist
+        gradebook: :class:`~nbgrader.api.Gradebook`
+            The gradebook
+        assignment_id: string
+            The name of the assignment
+        notebook_id: string
+            The name of the notebook
+
+        """
+        key = (assignment_id, notebook_id)
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            with self._lock:
+                order = self._orders.get(key, None)
+                generation = self._generation
+
+            cursor = gradebook.last_change()
+            if order is not None and order.cursor != cursor:
+                if not self._update(gradebook, order, cursor):
+                    order = None
+            if order is None:
+                order = self._build(api, gradebook, assignment_id, notebook_id, cursor)
+                with self._lock:
+                    if self._generation == generation:
+                        self._orders[key] = order
+            return order
+
+    def invalidate(self, assignment_id):
+        """Forget the orders of the notebooks of an assignment, e.g. because
+        it has been autograded and notebook files may have appeared."""
+        with self._lock:
+            for key in list(self._orders.keys()):
+                if key[0] == assignment_id:
+                    del self._orders[key]
+            self._generation += 1
+
+    def _build(self, api, gradebook, assignment_id, notebook_id, cursor):
+        notebooks = gradebook.notebook_submissions(notebook_id, assignment_id)
+        ids = [x.id for x in api._filter_existing_notebooks(assignment_id, notebooks)]
+        failed = set(x for x, in gradebook.db.query(SubmittedNotebook.id)
+                     .join(Notebook, Notebook.id == SubmittedNotebook.notebook_id)
+                     .join(SubmittedAssignment, SubmittedAssignment.id == SubmittedNotebook.assignment_id)
+                     .join(Assignment, Assignment.id == SubmittedAssignment.assignment_id)
+                     .filter(Notebook.name == notebook_id, Assignment.name == assignment_id)
+                     .filter(SubmittedNotebook.failed_tests))
+        return SubmissionOrder(ids, failed.intersection(ids), cursor)
+
+    def _update(self, gradebook, order, cursor):
+        changes = gradebook.changes_since(order.cursor, limit=_MAX_CHANGES + 1, include_data=False)
+        if len(changes) > _MAX_CHANGES:
+            return False
+
+        grade_ids = set()
+        for change in changes:
+            if change["table"] == "submitted_notebook" and change["operation"] != "update":
+                return False
+            if change["table"] == "grade":
+                grade_ids.add(change["id"])
+
+        if len(grade_ids) > 0:
+            notebook_ids = set(x for x, in gradebook.db.query(Grade.notebook_id)
+                               .filter(Grade.id.in_(sorted(grade_ids))))
+            notebook_ids.intersection_update(order.positions)
+            if len(notebook_ids) > 0:
+                failed = set(x for x, in gradebook.db.query(SubmittedNotebook.id)
+                             .filter(SubmittedNotebook.id.in_(sorted(notebook_ids)))
+                             .filter(SubmittedNotebook.failed_tests))
+                for submission_id in notebook_ids:
+                    order.set_failed(submission_id, submission_id in failed)
+
+        order.cursor = cursor
+        return True
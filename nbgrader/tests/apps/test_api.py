@@ -8,8 +8,10 @@ from os.path import join
 from traitlets.config import Config
 from datetime import datetime
 
+from ...api import Gradebook
 from ...apps.api import NbGraderAPI
 from ...coursedir import CourseDirectory
+from ...server_extensions.formgrader.submissionorder import SubmissionOrderCache
 from ...utils import rmtree, get_username, parse_utc
 from .. import run_nbgrader
 from .base import BaseTestApp
@@ -64,6 +66,33 @@ class TestNbGraderAPI(BaseTestApp):
         api.course_id = 'abc101'
         assert api.get_released_assignments() == set([])
 
+    @notwindows
+    def test_exchange_missing(self, api, monkeypatch):
+        starts = []
+        lister = api.exchange.List
+
+        def List(*args, **kwargs):
+            starts.append(1)
+            return lister(*args, **kwargs)
+
+        # the exchange is only listed when needed, and then remembered
+        monkeypatch.setattr(api.exchange, "List", List)
+        assert not api.exchange_missing
+        assert not api.exchange_missing
+        assert len(starts) == 1
+
+        api.exchange_check_interval = 0
+        assert not api.exchange_missing
+        assert len(starts) == 2
+
+    def test_shared_gradebook(self, api, course_dir, db):
+        with Gradebook(db, "abc101") as gb:
+            shared_api = NbGraderAPI(api.coursedir, gradebook=gb, config=api.config)
+            with shared_api.gradebook as shared:
+                assert shared is gb
+            gb.add_student("foo")
+            assert [x["id"] for x in shared_api.get_students()] == ["foo"]
+
     def test_get_submitted_students(self, api, course_dir):
         assert api.get_submitted_students("ps1") == set([])
 
@@ -83,6 +112,53 @@ class TestNbGraderAPI(BaseTestApp):
         self._make_file(join(course_dir, "submitted", "foo", "ps1", "timestamp.txt"), contents=timestamp.isoformat())
         assert api.get_submitted_timestamp("ps1", "foo") == timestamp
 
+    def test_course_directory_snapshot(self, api, course_dir, monkeypatch):
+        snapshot = api.coursedir.snapshot
+        assert snapshot is api.coursedir.snapshot
+
+        self._empty_notebook(join(course_dir, "submitted", "foo", "ps1", "p1.ipynb"))
+        self._empty_notebook(join(course_dir, "submitted", "bar", "ps1", "p2.ipynb"))
+        self._empty_notebook(join(course_dir, "submitted", "bar", "ps2", "p1.ipynb"))
+        # hidden notebooks are skipped, like glob does
+        self._empty_notebook(join(course_dir, "submitted", "bar", "ps1", ".p3.ipynb"))
+        assert sorted(snapshot.find("submitted")) == [("bar", "ps1"), ("bar", "ps2"), ("foo", "ps1")]
+        assert sorted(snapshot.find("submitted", assignment_id="ps1")) == [("bar", "ps1"), ("foo", "ps1")]
+        assert snapshot.get("submitted", "bar", "ps1").notebooks == {"p2"}
+        assert snapshot.get("submitted", "baz", "ps1") is None
+
+        # directories which have not changed since they were scanned are not
+        # listed again
+        for dirpath, _, filenames in os.walk(join(course_dir, "submitted")):
+            for path in [dirpath] + [join(dirpath, x) for x in filenames]:
+                os.utime(path, (0, 0))
+        snapshot.find("submitted")
+        scanned = []
+        scandir = os.scandir
+
+        def listed(path):
+            # the file system is accessed without holding the lock
+            assert snapshot._lock.acquire(blocking=False)
+            snapshot._lock.release()
+            scanned.append(path)
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", listed)
+        assert len(snapshot.find("submitted")) == 3
+        assert scanned == []
+
+        # but changed ones are
+        self._empty_notebook(join(course_dir, "submitted", "foo", "ps1", "p2.ipynb"))
+        assert snapshot.get("submitted", "foo", "ps1").notebooks == {"p1", "p2"}
+        assert scanned == [join(course_dir, "submitted", "foo", "ps1")]
+        monkeypatch.undo()
+
+        rmtree(join(course_dir, "submitted", "bar"))
+        assert sorted(snapshot.find("submitted")) == [("foo", "ps1")]
+
+        api.coursedir.directory_structure = join("{nbgrader_step}", "{assignment_id}-{student_id}")
+        self._empty_notebook(join(course_dir, "submitted", "ps1-foo", "p1.ipynb"))
+        assert api.get_submitted_students("ps1") == {"foo"}
+
     def test_get_autograded_students(self, api, course_dir, db):
         self._empty_notebook(join(course_dir, "source", "ps1", "problem1.ipynb"))
         run_nbgrader(["generate_assignment", "ps1", "--db", db])
@@ -511,6 +587,27 @@ class TestNbGraderAPI(BaseTestApp):
                 notebooks[i]["index"] = i
                 assert s[i] == notebooks[i]
 
+    def test_get_notebook_submissions_ordered(self, api, course_dir, db, monkeypatch):
+        self._copy_file(join("files", "submitted-unchanged.ipynb"), join(course_dir, "source", "ps1", "p1.ipynb"))
+        run_nbgrader(["generate_assignment", "ps1", "--db", db])
+
+        for student in ["foo", "bar", "baz"]:
+            self._copy_file(join("files", "submitted-changed.ipynb"), join(course_dir, "submitted", student, "ps1", "p1.ipynb"))
+        run_nbgrader(["autograde", "ps1", "--no-execute", "--force", "--db", db])
+
+        with api.gradebook as gb:
+            order = SubmissionOrderCache().get(api, gb, "ps1", "p1")
+
+        # the indices of a page are looked up in the order, rather than
+        # listing every submission again
+        def indices(*args):
+            raise AssertionError("the submission indices should not be rebuilt")
+        monkeypatch.setattr(api, "get_notebook_submission_indices", indices)
+
+        s = api.get_notebook_submissions("ps1", "p1", limit=2, sort="-student", order=order)
+        assert [x["student"] for x in s] == ["foo", "baz"]
+        assert [x["index"] for x in s] == [order.index(x["id"]) for x in s]
+
     def test_get_student(self, api, course_dir, db):
         assert api.get_student("foo") is None
 
@@ -591,6 +688,25 @@ class TestNbGraderAPI(BaseTestApp):
         }
         assert api.get_students() == [s1, s2]
 
+    def test_get_students_paged(self, api, course_dir):
+        with api.gradebook as gb:
+            for student_id in ["s1", "s2", "s3", "s4"]:
+                gb.update_or_create_student(student_id)
+            gb.update_or_create_student("s3", last_name="Bar")
+        self._empty_notebook(join(course_dir, "submitted", "zzz", "ps1", "p1.ipynb"))
+
+        for sort in ["id", "last_name", "-last_name"]:
+            pages = []
+            next_page = {"after": None}
+            while True:
+                pages.append(api.get_students(limit=2, sort=sort, after=next_page["after"], next_page=next_page))
+                if next_page["after"] is None:
+                    break
+            # the students who are not in the database come on the last page
+            assert [len(x) for x in pages] == [2, 2, 1]
+            assert sorted(x["id"] for page in pages for x in page) == ["s1", "s2", "s3", "s4", "zzz"]
+            assert pages[-1][-1]["id"] == "zzz"
+
     def test_get_student_submissions(self, api, course_dir, db):
         assert api.get_student_submissions("foo") == []
 
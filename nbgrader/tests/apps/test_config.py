@@ -1,4 +1,5 @@
 from traitlets.config import Config
+from ...api import Gradebook
 from ...coursedir import CourseDirectory
 from .base import BaseTestApp
 from .conftest import notwindows
@@ -15,3 +16,24 @@ class TestCourseDirectory(BaseTestApp):
         # See #1222
         assert coursedir.format_path("submitted", "alice", "HW1") == "/root/submitted/alice/HW1"
         assert coursedir.format_path("/bar/submitted", "alice", "HW1") == "/bar/submitted/alice/HW1"
+
+    def test_db_pool_options(self, tmpdir):
+        config = Config()
+        config.CourseDirectory.root = str(tmpdir)
+        config.CourseDirectory.db_pool_recycle = 3600
+        config.CourseDirectory.db_pool_pre_ping = True
+        coursedir = CourseDirectory(config=config)
+        with Gradebook(coursedir.db_url, **coursedir.db_options) as gb:
+            assert gb.engine.pool._recycle == 3600
+            assert gb.engine.pool._pre_ping
+
+        # the queue options are only passed on when they are set, as
+        # sqlite files don't take them
+        assert "pool_size" not in coursedir.db_options["engine_kwargs"]
+        config.CourseDirectory.db_pool_size = 10
+        config.CourseDirectory.db_max_overflow = 0
+        config.CourseDirectory.db_pool_timeout = 5
+        coursedir = CourseDirectory(config=config)
+        assert coursedir.db_options["engine_kwargs"] == {
+            "pool_recycle": 3600, "pool_pre_ping": True,
+            "pool_size": 10, "max_overflow": 0, "pool_timeout": 5}
@@ -94,6 +94,86 @@ class TestNbGraderAutograde(BaseTestApp):
             assert comment1.comment == None
             assert comment2.comment == None
 
+    def test_grade_parallel(self, db, course_dir):
+        """Can files be graded with several worker processes?"""
+        run_nbgrader(["db", "assignment", "add", "ps1", "--db", db, "--duedate", "2015-02-02 14:58:23.948203 America/Los_Angeles"])
+        run_nbgrader(["db", "student", "add", "foo", "--db", db])
+        run_nbgrader(["db", "student", "add", "bar", "--db", db])
+
+        self._copy_file(join("files", "submitted-unchanged.ipynb"), join(course_dir, "source", "ps1", "p1.ipynb"))
+        run_nbgrader(["generate_assignment", "ps1", "--db", db])
+
+        self._copy_file(join("files", "submitted-unchanged.ipynb"), join(course_dir, "submitted", "foo", "ps1", "p1.ipynb"))
+        self._copy_file(join("files", "submitted-changed.ipynb"), join(course_dir, "submitted", "bar", "ps1", "p1.ipynb"))
+        run_nbgrader(["autograde", "ps1", "--db", db, "--jobs", "2"])
+
+        assert os.path.isfile(join(course_dir, "autograded", "foo", "ps1", "p1.ipynb"))
+        assert os.path.isfile(join(course_dir, "autograded", "bar", "ps1", "p1.ipynb"))
+
+        with Gradebook(db) as gb:
+            notebook = gb.find_submission_notebook("p1", "ps1", "foo")
+            assert notebook.score == 1
+            assert notebook.needs_manual_grade == False
+
+            notebook = gb.find_submission_notebook("p1", "ps1", "bar")
+            assert notebook.score == 2
+            assert notebook.needs_manual_grade == True
+
+    def test_grade_journal(self, db, course_dir):
+        """Are grades written through the journal merged into the database?"""
+        run_nbgrader(["db", "assignment", "add", "ps1", "--db", db, "--duedate",
+                      "2015-02-02 14:58:23.948203 America/Los_Angeles"])
+        run_nbgrader(["db", "student", "add", "foo", "--db", db])
+        run_nbgrader(["db", "student", "add", "bar", "--db", db])
+
+        self._copy_file(join("files", "submitted-unchanged.ipynb"), join(course_dir, "source", "ps1", "p1.ipynb"))
+        run_nbgrader(["generate_assignment", "ps1", "--db", db])
+
+        self._copy_file(join("files", "submitted-unchanged.ipynb"), join(course_dir, "submitted", "foo", "ps1", "p1.ipynb"))
+        self._copy_file(join("files", "submitted-changed.ipynb"), join(course_dir, "submitted", "bar", "ps1", "p1.ipynb"))
+        run_nbgrader(["autograde", "ps1", "--db", db, "--jobs", "2", "--journal"])
+
+        assert os.listdir(join(course_dir, ".autograde_journal")) == []
+
+        with Gradebook(db) as gb:
+            notebook = gb.find_submission_notebook("p1", "ps1", "foo")
+            assert notebook.score == 1
+            assert notebook.needs_manual_grade == False
+
+            notebook = gb.find_submission_notebook("p1", "ps1", "bar")
+            assert notebook.score == 2
+            assert notebook.needs_manual_grade == True
+
+    def test_grade_journal_failed(self, db, course_dir):
+        """Is a journal that can't be merged moved aside, without merging any of it?"""
+        run_nbgrader(["db", "assignment", "add", "ps1", "--db", db, "--duedate",
+                      "2015-02-02 14:58:23.948203 America/Los_Angeles"])
+        run_nbgrader(["db", "student", "add", "foo", "--db", db])
+
+        self._copy_file(join("files", "submitted-unchanged.ipynb"), join(course_dir, "source", "ps1", "p1.ipynb"))
+        run_nbgrader(["generate_assignment", "ps1", "--db", db])
+        self._copy_file(join("files", "submitted-unchanged.ipynb"), join(course_dir, "submitted", "foo", "ps1", "p1.ipynb"))
+
+        records = [
+            {"type": "student", "assignment": "ps1", "student": "bar", "fields": {}},
+            {"type": "bogus", "assignment": "ps1", "student": "bar"},
+            {"type": "done"}
+        ]
+        self._make_file(
+            join(course_dir, ".autograde_journal", "1.jsonl"),
+            "\n".join(json.dumps(record) for record in records) + "\n")
+
+        run_nbgrader(["autograde", "ps1", "--db", db, "--journal"])
+
+        assert os.listdir(join(course_dir, ".autograde_journal")) == ["1.jsonl.failed"]
+
+        with Gradebook(db) as gb:
+            with pytest.raises(MissingEntry):
+                gb.find_student("bar")
+
+            notebook = gb.find_submission_notebook("p1", "ps1", "foo")
+            assert notebook.score == 1
+
     def test_student_id_exclude(self, db, course_dir):
         """Does --CourseDirectory.student_id_exclude=X exclude students?"""
         run_nbgrader(["db", "assignment", "add", "ps1", "--db", db, "--duedate",
@@ -555,6 +635,67 @@ class TestNbGraderAutograde(BaseTestApp):
         assert os.path.isfile(join(course_dir, "autograded", "foo", "ps1", "side-effect.txt"))
         assert not os.path.isfile(join(course_dir, "submitted", "foo", "ps1", "side-effect.txt"))
 
+    def test_kernel_pool(self, db: str, course_dir: str) -> None:
+        run_nbgrader(["db", "assignment", "add", "ps1", "--db", db, "--duedate",
+                      "2015-02-02 14:58:23.948203 America/Los_Angeles"])
+        run_nbgrader(["db", "student", "add", "foo", "--db", db])
+        run_nbgrader(["db", "student", "add", "bar", "--db", db])
+
+        self._copy_file(join("files", "submitted-unchanged.ipynb"), join(course_dir, "source", "ps1", "p1.ipynb"))
+        self._copy_file(join("files", "side-effects.ipynb"), join(course_dir, "source", "ps1", "p2.ipynb"))
+        run_nbgrader(["generate_assignment", "ps1", "--db", db])
+
+        for student in ["foo", "bar"]:
+            self._copy_file(join("files", "submitted-unchanged.ipynb"), join(course_dir, "submitted", student, "ps1", "p1.ipynb"))
+            self._copy_file(join("files", "side-effects.ipynb"), join(course_dir, "submitted", student, "ps1", "p2.ipynb"))
+        run_nbgrader([
+            "autograde", "ps1", "--db", db,
+            "--Execute.kernel_pool_size=2",
+            "--Execute.kernel_pool_preamble=import os"
+        ])
+
+        for student in ["foo", "bar"]:
+            # pooled kernels run in the directory of the notebook
+            assert os.path.isfile(join(course_dir, "autograded", student, "ps1", "side-effect.txt"))
+
+            # the preamble does not count as an execution
+            with io.open(join(course_dir, "autograded", student, "ps1", "p1.ipynb"), mode="r", encoding="utf-8") as fh:
+                nb = json.load(fh)
+            counts = [cell["execution_count"] for cell in nb["cells"] if cell["cell_type"] == "code"]
+            assert counts == list(range(1, len(counts) + 1))
+
+        with Gradebook(db) as gb:
+            assert gb.find_submission_notebook("p1", "ps1", "foo").score == 1
+            assert gb.find_submission_notebook("p1", "ps1", "bar").score == 1
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="kernels can only be forked on Linux")
+    def test_zygote_kernels(self, db: str, course_dir: str) -> None:
+        run_nbgrader(["db", "assignment", "add", "ps1", "--db", db, "--duedate",
+                      "2015-02-02 14:58:23.948203 America/Los_Angeles"])
+        run_nbgrader(["db", "student", "add", "foo", "--db", db])
+        run_nbgrader(["db", "student", "add", "bar", "--db", db])
+        with open("nbgrader_config.py", "a") as fh:
+            fh.write(dedent(
+                """
+                c.Execute.kernel_manager_class = 'nbgrader.preprocessors.zygote.ZygoteKernelManager'
+                c.ZygoteKernelManager.preload_modules = ['json']
+                c.ExecutePreprocessor.timeout = 1
+                """
+            ))
+
+        self._copy_file(join("files", "side-effects.ipynb"), join(course_dir, "source", "ps1", "p1.ipynb"))
+        self._copy_file(join("files", "infinite-loop.ipynb"), join(course_dir, "source", "ps1", "p2.ipynb"))
+        run_nbgrader(["generate_assignment", "ps1", "--db", db])
+
+        for student in ["foo", "bar"]:
+            self._copy_file(join("files", "side-effects.ipynb"), join(course_dir, "submitted", student, "ps1", "p1.ipynb"))
+            self._copy_file(join("files", "infinite-loop.ipynb"), join(course_dir, "submitted", student, "ps1", "p2.ipynb"))
+        run_nbgrader(["autograde", "ps1", "--db", db])
+
+        for student in ["foo", "bar"]:
+            assert os.path.isfile(join(course_dir, "autograded", student, "ps1", "side-effect.txt"))
+            assert os.path.isfile(join(course_dir, "autograded", student, "ps1", "p2.ipynb"))
+
     def test_skip_extra_notebooks(self, db, course_dir):
         run_nbgrader(["db", "assignment", "add", "ps1", "--db", db, "--duedate",
                       "2015-02-02 14:58:23.948203 America/Los_Angeles"])
@@ -801,6 +942,26 @@ class TestNbGraderAutograde(BaseTestApp):
         assert not os.path.exists(join(course_dir, "autograded", "bar", "ps1"))
         assert os.path.exists(join(course_dir, "autograded", "foo", "ps1"))
 
+    def test_handle_failure_parallel(self, course_dir):
+        run_nbgrader(["db", "assignment", "add", "ps1", "--duedate",
+                      "2015-02-02 14:58:23.948203 America/Los_Angeles"])
+        run_nbgrader(["db", "student", "add", "foo"])
+        run_nbgrader(["db", "student", "add", "bar"])
+
+        self._empty_notebook(join(course_dir, "source", "ps1", "p1.ipynb"))
+        self._empty_notebook(join(course_dir, "source", "ps1", "p2.ipynb"))
+        run_nbgrader(["generate_assignment", "ps1"])
+
+        self._empty_notebook(join(course_dir, "submitted", "bar", "ps1", "p1.ipynb"))
+        self._copy_file(join("files", "test.ipynb"), join(course_dir, "submitted", "bar", "ps1", "p2.ipynb"))
+        self._empty_notebook(join(course_dir, "submitted", "foo", "ps1", "p1.ipynb"))
+        self._empty_notebook(join(course_dir, "submitted", "foo", "ps1", "p2.ipynb"))
+        output = run_nbgrader(["autograde", "ps1", "--jobs", "2"], retcode=1)
+
+        assert "There was an error processing assignment 'ps1' for student 'bar'" in output
+        assert not os.path.exists(join(course_dir, "autograded", "bar", "ps1"))
+        assert os.path.exists(join(course_dir, "autograded", "foo", "ps1"))
+
     def test_handle_failure_single_notebook(self, course_dir):
         run_nbgrader(["db", "assignment", "add", "ps1", "--duedate",
                       "2015-02-02 14:58:23.948203 America/Los_Angeles"])
@@ -203,6 +203,36 @@ class TestNbGraderDb(BaseTestApp):
             assert student.email is None
 
 
+    def test_profile_queries(self, db):
+        output = run_nbgrader(["db", "student", "add", "foo", "--db", db,
+                               "--CourseDirectory.db_profile_queries=True"])
+        assert "Database queries by gradebook method" in output
+        assert "update_or_create_student" in output
+
+    def test_student_import_chunks(self, db, temp_cwd):
+        with Gradebook(db) as gb:
+            gb.add_student("s1", first_name="abc")
+            gb.add_student("s2")
+
+        with open("students.csv", "w") as fh:
+            fh.write("id,first_name\n")
+            for i in range(1, 11):
+                fh.write("s{},abc\n".format(i))
+
+        run_nbgrader(["db", "student", "import", "students.csv", "--db", db,
+                      "--DbStudentImportApp.chunk_size=3"])
+        with Gradebook(db) as gb:
+            assert len(gb.students) == 10
+            assert all(student.first_name == "abc" for student in gb.students)
+
+    def test_student_import_missing_id(self, db, temp_cwd):
+        with open("students.csv", "w") as fh:
+            fh.write("id,first_name\na,abc\n,xyz\n")
+
+        run_nbgrader(["db", "student", "import", "students.csv", "--db", db], retcode=1)
+        with Gradebook(db) as gb:
+            assert gb.students == []
+
     def test_student_import_csv_spaces(self, db, temp_cwd):
         with open("students.csv", "w") as fh:
             fh.write(dedent(
@@ -421,3 +451,13 @@ class TestNbGraderDb(BaseTestApp):
 
         # check that nbgrader generate_assignment passes
         run_nbgrader(["generate_assignment", "ps1"])
+
+    def test_rebuild_summaries(self, db):
+        run_nbgrader(["db", "student", "add", "foo", "--db", db])
+        with Gradebook(db) as gb:
+            assert not gb.use_summaries
+
+        run_nbgrader(["db", "rebuild-summaries", "--db", db])
+        with Gradebook(db) as gb:
+            assert gb.use_summaries
+            assert gb.student_dicts()[0]["score"] == 0
@@ -1,6 +1,9 @@
+import csv
 import os
 
 from os.path import join
+from ...api import Gradebook
+from ...plugins.export import ExportPlugin, RECORD_KEYS
 from ...utils import remove
 from .. import run_nbgrader
 from .base import BaseTestApp
@@ -63,3 +66,127 @@ class TestNbGraderExport(BaseTestApp):
         with open("grades.csv", "r") as fh:
             contents = fh.readlines()
         assert len(contents) == 2
+
+    def test_export_values(self, db, course_dir):
+        run_nbgrader(["db", "assignment", "add", "ps1", "--db", db, "--duedate",
+                      "2015-02-02 14:58:23.948203 America/Los_Angeles"])
+        run_nbgrader(["db", "student", "add", "foo", "--db", db, "--last-name", "Foo, Jr."])
+        run_nbgrader(["db", "student", "add", "bar", "--db", db])
+
+        self._copy_file(join("files", "submitted-unchanged.ipynb"), join(course_dir, "source", "ps1", "p1.ipynb"))
+        run_nbgrader(["generate_assignment", "ps1", "--db", db])
+        self._copy_file(join("files", "submitted-changed.ipynb"), join(course_dir, "submitted", "bar", "ps1", "p1.ipynb"))
+        run_nbgrader(["autograde", "ps1", "--db", db])
+
+        run_nbgrader(["export", "--db", db])
+        with open("grades.csv", "r") as fh:
+            rows = {row["student_id"]: row for row in csv.DictReader(fh)}
+
+        with Gradebook(db) as gb:
+            submission = gb.find_submission("ps1", "bar")
+            assert float(rows["bar"]["raw_score"]) == submission.score
+            assert float(rows["bar"]["score"]) == submission.score
+            assert float(rows["bar"]["max_score"]) == submission.max_score
+            if submission.timestamp is None:
+                assert rows["bar"]["timestamp"] == ""
+            else:
+                assert rows["bar"]["timestamp"] == str(submission.timestamp)
+
+        assert rows["foo"]["last_name"] == "Foo, Jr."
+        assert rows["foo"]["timestamp"] == ""
+        assert float(rows["foo"]["score"]) == 0.0
+        assert rows["foo"]["max_score"] == rows["bar"]["max_score"]
+
+    def test_export_records(self, db, course_dir):
+        run_nbgrader(["db", "assignment", "add", "ps1", "--db", db])
+        run_nbgrader(["db", "student", "add", "foo", "--db", db])
+        run_nbgrader(["db", "student", "add", "bar", "--db", db])
+
+        self._copy_file(join("files", "submitted-unchanged.ipynb"), join(course_dir, "source", "ps1", "p1.ipynb"))
+        run_nbgrader(["generate_assignment", "ps1", "--db", db])
+        self._copy_file(join("files", "submitted-changed.ipynb"), join(course_dir, "submitted", "bar", "ps1", "p1.ipynb"))
+        run_nbgrader(["autograde", "ps1", "--db", db])
+
+        plugin = ExportPlugin()
+        with Gradebook(db) as gb:
+            submission = gb.find_submission("ps1", "bar")
+            num_cells = len(submission.notebooks[0].grades)
+
+            assignments = list(plugin.records(gb, "assignment"))
+            notebooks = list(plugin.records(gb, "notebook"))
+            cells = list(plugin.records(gb, "cell"))
+            assert len(assignments) == 2
+            assert len(notebooks) == 2
+            assert len(cells) == 2 * num_cells
+            for level, records in [("assignment", assignments), ("notebook", notebooks), ("cell", cells)]:
+                assert all(sorted(x.keys()) == sorted(RECORD_KEYS[level]) for x in records)
+
+            for records in [assignments, notebooks, cells]:
+                bar = [x for x in records if x["student_id"] == "bar"]
+                foo = [x for x in records if x["student_id"] == "foo"]
+                assert all(x["submitted"] for x in bar)
+                assert not any(x["submitted"] for x in foo)
+                assert sum(x["score"] for x in bar) == submission.score
+                assert sum(x["score"] for x in foo) == 0
+                assert sum(x["max_score"] for x in bar) == submission.max_score
+
+            plugin.student = ["foo"]
+            assert [x["student_id"] for x in plugin.records(gb, "cell")] == ["foo"] * num_cells
+            plugin.assignment = ["ps2"]
+            assert list(plugin.records(gb)) == []
+
+    def test_export_cell_scores(self, db, course_dir):
+        run_nbgrader(["db", "assignment", "add", "ps1", "--db", db])
+        run_nbgrader(["db", "student", "add", "foo", "--db", db])
+        run_nbgrader(["db", "student", "add", "bar", "--db", db])
+
+        self._copy_file(join("files", "submitted-unchanged.ipynb"), join(course_dir, "source", "ps1", "p1.ipynb"))
+        run_nbgrader(["generate_assignment", "ps1", "--db", db])
+        self._copy_file(join("files", "submitted-changed.ipynb"), join(course_dir, "submitted", "bar", "ps1", "p1.ipynb"))
+        run_nbgrader(["autograde", "ps1", "--db", db])
+
+        run_nbgrader(["export", "--db", db, "--exporter", "nbgrader.plugins.CellScoresExportPlugin"])
+        assert os.path.isfile("cell_scores.csv")
+        with open("cell_scores.csv", "r") as fh:
+            rows = list(csv.reader(fh))
+
+        with Gradebook(db) as gb:
+            submission = gb.find_submission("ps1", "bar")
+            grades = submission.notebooks[0].grades
+            header = rows[0]
+            assert header[:4] == ["student_id", "last_name", "first_name", "email"]
+            assert sorted(header[4:]) == sorted("ps1/p1/" + grade.cell.name for grade in grades)
+            assert [row[0] for row in rows[1:]] == ["bar", "foo"]
+            assert sum(float(x) for x in rows[1][4:]) == submission.score
+            assert rows[2][4:] == [""] * len(grades)
+
+        run_nbgrader(["export", "--db", db, "--exporter", "nbgrader.plugins.CellScoresExportPlugin",
+                      "--student", "['foo']", "--to", "foo.csv"])
+        with open("foo.csv", "r") as fh:
+            assert len(fh.readlines()) == 2
+
+    def test_export_since(self, db, course_dir):
+        run_nbgrader(["db", "assignment", "add", "ps1", "--db", db])
+        run_nbgrader(["db", "student", "add", "foo", "--db", db])
+        run_nbgrader(["db", "student", "add", "bar", "--db", db])
+
+        self._copy_file(join("files", "submitted-unchanged.ipynb"), join(course_dir, "source", "ps1", "p1.ipynb"))
+        run_nbgrader(["generate_assignment", "ps1", "--db", db])
+        self._copy_file(join("files", "submitted-changed.ipynb"), join(course_dir, "submitted", "bar", "ps1", "p1.ipynb"))
+        self._copy_file(join("files", "submitted-changed.ipynb"), join(course_dir, "submitted", "foo", "ps1", "p1.ipynb"))
+        run_nbgrader(["autograde", "ps1", "--db", db])
+
+        run_nbgrader(["export", "--db", db, "--since", "0"])
+        with open("grades.csv", "r") as fh:
+            assert len(fh.readlines()) == 3
+
+        with Gradebook(db) as gb:
+            cursor = gb.last_change()
+            grade = gb.find_submission_notebook("p1", "ps1", "foo").grades[0]
+            grade.manual_score = 0
+            gb.db.commit()
+
+        run_nbgrader(["export", "--db", db, "--since", str(cursor)])
+        with open("grades.csv", "r") as fh:
+            rows = list(csv.DictReader(fh))
+        assert [row["student_id"] for row in rows] == ["foo"]
@@ -0,0 +1,44 @@
+import pytest
+
+from ...preprocessors.kernelpool import KernelPool
+
+
+@pytest.fixture
+def pool(request):
+    pool = KernelPool(kernel_name="python3", size=1, preamble="import json\nx = 1")
+
+    def fin():
+        pool.shutdown()
+    request.addfinalizer(fin)
+    return pool
+
+
+def _evaluate(km, expressions):
+    kc = km.client()
+    kc.start_channels()
+    try:
+        msg_id = kc.execute("", silent=True, user_expressions=expressions)
+        while True:
+            reply = kc.get_shell_msg(timeout=30)
+            if reply["parent_header"].get("msg_id") == msg_id:
+                break
+    finally:
+        kc.stop_channels()
+    return dict((name, value["data"]["text/plain"]) for name, value in reply["content"]["user_expressions"].items())
+
+
+class TestKernelPool(object):
+
+    def test_preamble_namespace(self, pool):
+        km = pool.acquire()
+        try:
+            values = _evaluate(km, {
+                "loaded": "'json' in __import__('sys').modules",
+                "visible": "'json' in globals() or 'x' in globals()"
+            })
+        finally:
+            km.shutdown_kernel(now=True)
+
+        # the preamble's imports are loaded, but its names don't leak into
+        # the notebook
+        assert values == {"loaded": "True", "visible": "False"}
@@ -214,3 +214,24 @@ class TestSaveAutoGrades(BaseTestPreprocessor):
 
         gradebook.db.refresh(comment)
         assert comment.auto_comment is None
+
+    def test_grade_multiple_cells(self, preprocessors, gradebook, resources):
+        """Are the grades and comments of every cell in the notebook saved?"""
+        cell1 = create_grade_cell("hello", "code", "foo", 1)
+        cell1.metadata.nbgrader['checksum'] = compute_checksum(cell1)
+        cell2 = create_solution_cell("hello", "code", "bar")
+        cell2.metadata.nbgrader['checksum'] = compute_checksum(cell2)
+        nb = new_notebook()
+        nb.cells.extend([cell1, cell2])
+        preprocessors[0].preprocess(nb, resources)
+        gradebook.add_submission("ps0", "bar")
+
+        nb.cells[-1].source = 'goodbye'
+        preprocessors[1].preprocess(nb, resources)
+
+        grade_cell = gradebook.find_grade("foo", "test", "ps0", "bar")
+        assert grade_cell.auto_score == 1
+        assert not grade_cell.needs_manual_grade
+
+        comment = gradebook.find_comment("bar", "test", "ps0", "bar")
+        assert comment.auto_comment is None
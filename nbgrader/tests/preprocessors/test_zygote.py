@@ -0,0 +1,50 @@
+import os
+import sys
+import signal
+import pytest
+
+from ...preprocessors.zygote import ForkedKernel, ZygoteKernelManager, shutdown_zygotes
+
+
+def _ppid(pid):
+    with open("/proc/{}/stat".format(pid), "r") as fh:
+        # the command name is in parentheses and may contain spaces
+        return int(fh.read().rsplit(")", 1)[1].split()[1])
+
+
+@pytest.fixture
+def kernel_manager(request):
+    km = ZygoteKernelManager(kernel_name="python3", preload_modules=["json"])
+
+    def fin():
+        if km.has_kernel:
+            km.shutdown_kernel(now=True)
+        shutdown_zygotes()
+    request.addfinalizer(fin)
+    return km
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="kernels can only be forked on Linux")
+class TestZygoteKernelManager(object):
+
+    def test_forked_from_zygote(self, kernel_manager):
+        kernel_manager.start_kernel()
+        kernel = kernel_manager.kernel
+        assert isinstance(kernel, ForkedKernel)
+        assert _ppid(kernel.pid) == kernel.zygote._process.pid
+        assert kernel.poll() is None
+
+    def test_returncode(self, kernel_manager):
+        kernel_manager.start_kernel()
+        kernel = kernel_manager.kernel
+        kernel.kill()
+        assert kernel.wait(timeout=10) == -signal.SIGKILL
+
+        # the zygote reaped the kernel
+        with pytest.raises(ProcessLookupError):
+            os.kill(kernel.pid, 0)
+
+    def test_zygote_session(self, kernel_manager):
+        kernel_manager.start_kernel()
+        zygote = kernel_manager.kernel.zygote._process.pid
+        assert os.getsid(zygote) == zygote
@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+from tornado import gen
+from tornado.ioloop import IOLoop
+
+from ..server_extensions.formgrader.asyncgradebook import AsyncGradebook
+
+
+@pytest.fixture
+def async_gradebook(request, tmpdir):
+    db_url = "sqlite:///{}".format(tmpdir.join("gradebook.db"))
+    async_gb = AsyncGradebook(db_url, "course101", {}, max_workers=2)
+
+    def fin():
+        async_gb.close()
+    request.addfinalizer(fin)
+    return async_gb
+
+
+def test_slow_call_does_not_block(async_gradebook):
+    release = threading.Event()
+
+    def slow_query():
+        release.wait(10)
+        return [x.id for x in async_gradebook.gradebook.students]
+
+    def add_student():
+        return async_gradebook.gradebook.add_student("foo").to_dict()["id"]
+
+    @gen.coroutine
+    def requests():
+        slow = async_gradebook.run(slow_query)
+
+        # other requests are handled, and the IOLoop keeps running, while
+        # the slow query is still going on
+        student_id = yield async_gradebook.run(add_student)
+        yield gen.sleep(0.01)
+        assert not slow.done()
+
+        release.set()
+        students = yield slow
+        raise gen.Return((student_id, students))
+
+    student_id, students = IOLoop.current().run_sync(requests, timeout=30)
+    assert student_id == "foo"
+    assert students == ["foo"]
+
+
+def test_exclusive_calls(async_gradebook):
+    running = []
+    overlapped = []
+
+    def command():
+        running.append(1)
+        if len(running) > 1:
+            overlapped.append(1)
+        threading.Event().wait(0.05)
+        running.pop()
+
+    @gen.coroutine
+    def requests():
+        for future in [async_gradebook.run_exclusive(command) for _ in range(4)]:
+            yield future
+
+    IOLoop.current().run_sync(requests, timeout=30)
+    assert overlapped == []
+
+
+def test_exclusive_calls_do_not_block(async_gradebook):
+    release = threading.Event()
+
+    def command():
+        release.wait(10)
+
+    def count_students():
+        return len(async_gradebook.gradebook.students)
+
+    @gen.coroutine
+    def requests():
+        # more commands than there are threads in the pool
+        commands = [async_gradebook.run_exclusive(command) for _ in range(4)]
+        num_students = yield async_gradebook.run(count_students)
+        assert not any(x.done() for x in commands)
+
+        release.set()
+        for future in commands:
+            yield future
+        raise gen.Return(num_students)
+
+    assert IOLoop.current().run_sync(requests, timeout=30) == 0
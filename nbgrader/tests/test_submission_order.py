@@ -0,0 +1,97 @@
+import pytest
+
+from ..api import Gradebook
+from ..server_extensions.formgrader.submissionorder import SubmissionOrderCache
+
+
+class AllNotebooksExist(object):
+    """Stands in for the API, as if every submitted notebook file existed."""
+
+    def _filter_existing_notebooks(self, assignment_id, notebooks):
+        return sorted(notebooks, key=lambda x: x.id)
+
+
+@pytest.fixture
+def gradebook(request):
+    gb = Gradebook("sqlite:///:memory:")
+    gb.add_assignment("ps1")
+    gb.add_notebook("p1", "ps1")
+    gb.add_grade_cell("test1", "p1", "ps1", max_score=1, cell_type="code")
+    for student_id in ["s1", "s2", "s3"]:
+        gb.add_student(student_id)
+        gb.add_submission("ps1", student_id)
+        gb.find_grade("test1", "p1", "ps1", student_id).auto_score = 1
+    gb.db.commit()
+
+    def fin():
+        gb.close()
+    request.addfinalizer(fin)
+    return gb
+
+
+def _submission_id(gb, student_id):
+    return gb.find_submission_notebook("p1", "ps1", student_id).id
+
+
+def test_submission_order(gradebook):
+    cache = SubmissionOrderCache()
+    api = AllNotebooksExist()
+    gradebook.find_grade("test1", "p1", "ps1", "s2").auto_score = 0
+    gradebook.db.commit()
+
+    order = cache.get(api, gradebook, "ps1", "p1")
+    ids = sorted(_submission_id(gradebook, x) for x in ["s1", "s2", "s3"])
+    assert order.ids == ids
+    assert [order.index(x) for x in ids] == [0, 1, 2]
+    assert order.next(ids[0]) == ids[1]
+    assert order.next(ids[2]) is None
+    assert order.prev(ids[0]) is None
+    assert order.failed == [_submission_id(gradebook, "s2")]
+
+    failed = order.failed[0]
+    others = [x for x in ids if x != failed]
+    assert order.next(others[0], failed=True) == (failed if failed > others[0] else None)
+    assert order.prev(others[-1], failed=True) == (failed if failed < others[-1] else None)
+
+    # changed grades update the order in place
+    gradebook.find_grade("test1", "p1", "ps1", "s3").auto_score = 0
+    gradebook.db.commit()
+    assert cache.get(api, gradebook, "ps1", "p1") is order
+    assert order.failed == sorted([failed, _submission_id(gradebook, "s3")])
+
+    gradebook.find_grade("test1", "p1", "ps1", "s3").auto_score = 1
+    gradebook.db.commit()
+    assert cache.get(api, gradebook, "ps1", "p1").failed == [failed]
+
+    # new submissions cause it to be rebuilt
+    gradebook.add_student("s4")
+    gradebook.add_submission("ps1", "s4")
+    order = cache.get(api, gradebook, "ps1", "p1")
+    assert len(order.ids) == 4
+    assert order.index(_submission_id(gradebook, "s4")) is not None
+
+    cache.invalidate("ps1")
+    assert cache.get(api, gradebook, "ps1", "p1") is not order
+
+
+class InvalidatingApi(AllNotebooksExist):
+    """Invalidates the cache while an order is being built."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def _filter_existing_notebooks(self, assignment_id, notebooks):
+        # other notebooks can be looked up meanwhile
+        assert self.cache._lock.acquire(blocking=False)
+        self.cache._lock.release()
+        self.cache.invalidate(assignment_id)
+        return super(InvalidatingApi, self)._filter_existing_notebooks(assignment_id, notebooks)
+
+
+def test_submission_order_invalidated_while_building(gradebook):
+    cache = SubmissionOrderCache()
+    order = cache.get(InvalidatingApi(cache), gradebook, "ps1", "p1")
+    assert len(order.ids) == 3
+
+    # the order was out of date by the time it was built, so it isn't kept
+    assert cache.get(AllNotebooksExist(), gradebook, "ps1", "p1") is not order
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""Time common gradebook lookups on a synthetic course.
+
+Usage:
+
+    python tools/gradebook_benchmark.py [NUM_SUBMISSIONS ...]
+
+For each number of submissions (1000 and 10000 by default), a sqlite
+gradebook is created with one student per submission to a single
+assignment, and the average latency of the lookups used while autograding
+and in the formgrader is printed.
+
+"""
+
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+from nbgrader.api import Gradebook, dispose_engines
+
+NUM_CELLS = 10
+NUM_LOOKUPS = 200
+
+
+def make_gradebook(db_url, num_submissions):
+    with Gradebook(db_url) as gb:
+        gb.add_assignment("ps1")
+        gb.add_notebook("p1", "ps1")
+        for i in range(NUM_CELLS):
+            gb.add_grade_cell("grade{}".format(i), "p1", "ps1", max_score=1, cell_type="code")
+            gb.add_solution_cell("grade{}".format(i), "p1", "ps1")
+        for i in range(num_submissions):
+            student_id = "student{}".format(i)
+            gb.add_student(student_id)
+            gb.add_submission("ps1", student_id)
+
+
+def benchmark(num_submissions):
+    with tempfile.TemporaryDirectory() as tempdir:
+        db_url = "sqlite:///{}".format(os.path.join(tempdir, "gradebook.db"))
+        make_gradebook(db_url, num_submissions)
+
+        students = ["student{}".format(random.randrange(num_submissions)) for _ in range(NUM_LOOKUPS)]
+        cells = ["grade{}".format(random.randrange(NUM_CELLS)) for _ in range(NUM_LOOKUPS)]
+
+        with Gradebook(db_url) as gb:
+            lookups = [
+                ("find_submission", lambda s, c: gb.find_submission("ps1", s)),
+                ("find_submission_notebook", lambda s, c: gb.find_submission_notebook("p1", "ps1", s)),
+                ("find_grade", lambda s, c: gb.find_grade(c, "p1", "ps1", s)),
+                ("find_comment", lambda s, c: gb.find_comment(c, "p1", "ps1", s)),
+                ("submission score", lambda s, c: gb.find_submission("ps1", s).score),
+            ]
+            for name, lookup in lookups:
+                def run():
+                    for student_id, cell_id in zip(students, cells):
+                        lookup(student_id, cell_id)
+                        gb.db.expire_all()
+                elapsed = timeit.timeit(run, number=1)
+                print("{:>8} submissions  {:<26} {:8.3f} ms".format(
+                    num_submissions, name, 1000 * elapsed / NUM_LOOKUPS))
+
+        dispose_engines()
+
+
+if __name__ == "__main__":
+    sizes = [int(x) for x in sys.argv[1:]] or [1000, 10000]
+    for size in sizes:
+        benchmark(size)